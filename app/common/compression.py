@@ -0,0 +1,144 @@
+"""Negotiated response compression."""
+
+import asyncio
+import sys
+
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipResponder, IdentityResponder
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+if sys.version_info >= (3, 14):
+    from compression import zstd
+else:
+    from backports import zstd
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Compress larger bodies on a worker thread rather than the event loop
+THREAD_MINIMUM_SIZE = 128 * 1024
+
+# Encodings offered, in order of preference when the client accepts several
+# with the same quality
+ENCODINGS = ("zstd", "gzip")
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """
+    Choose a content encoding from an Accept-Encoding header.
+
+    Returns:
+        The supported encoding with the highest quality, "identity" if none
+    """
+    qualities = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip()] = quality
+
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = "identity", 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_bound_to_representation(headers: Headers) -> bool:
+    """
+    Check whether response headers refer to the unencoded bytes.
+
+    Byte ranges offered with Accept-Ranges and strong ETags identify exact
+    bytes of the representation (RFC 9110 sections 8.8.1 and 14), so
+    compressing the body would serve other bytes under them.
+    """
+    etag = headers.get("etag", "")
+    return headers.get("accept-ranges", "none").strip().lower() != "none" or (
+        etag != "" and not etag.startswith("W/")
+    )
+
+
+class PassThroughBoundResponder(IdentityResponder):
+    """Send responses bound to their unencoded bytes as they are."""
+
+    passing_through = False
+
+    async def send_with_compression(self, message: Message):
+        if message["type"] == "http.response.start":
+            self.passing_through = is_bound_to_representation(
+                Headers(raw=message["headers"])
+            )
+        if self.passing_through:
+            await self.send(message)
+        else:
+            await super().send_with_compression(message)
+
+
+class GZipPassThroughResponder(PassThroughBoundResponder, GZipResponder):
+    pass
+
+
+class ZstdResponder(PassThroughBoundResponder):
+    content_encoding = "zstd"
+
+    def __init__(self, app: ASGIApp, minimum_size: int):
+        super().__init__(app, minimum_size)
+        self.compressor = zstd.ZstdCompressor(level=ZSTD_LEVEL)
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if len(body) >= THREAD_MINIMUM_SIZE:
+            return await asyncio.to_thread(self._compress_body, body, more_body)
+        return self._compress_body(body, more_body)
+
+    def _compress_body(self, body: bytes, more_body: bool) -> bytes:
+        # Flush each streamed chunk so the client can decode it on arrival
+        mode = (
+            zstd.ZstdCompressor.FLUSH_BLOCK
+            if more_body
+            else zstd.ZstdCompressor.FLUSH_FRAME
+        )
+        return self.compressor.compress(body, mode)
+
+
+class CompressionMiddleware:
+    """
+    Compress responses under a path prefix with zstd or gzip.
+
+    The encoding is negotiated from Accept-Encoding. Bodies below
+    ``minimum_size`` are sent as they are, streamed responses are compressed
+    chunk by chunk, and responses that are already encoded, partial (206),
+    of an incompressible content type, or that offer byte ranges or carry a
+    strong ETag pass through.
+    """
+
+    def __init__(self, app: ASGIApp, path_prefix: str, minimum_size: int):
+        self.app = app
+        self.path_prefix = path_prefix
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "zstd":
+            responder = ZstdResponder(self.app, self.minimum_size)
+        elif encoding == "gzip":
+            responder = GZipPassThroughResponder(
+                self.app,
+                self.minimum_size,
+                compresslevel=GZIP_LEVEL,
+                thread_minimum_size=THREAD_MINIMUM_SIZE,
+            )
+        else:
+            responder = IdentityResponder(self.app, self.minimum_size)
+        await responder(scope, receive, send)
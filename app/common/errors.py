@@ -1,14 +1,16 @@
 from logging import getLogger
 from typing import Optional
 
-from fastapi import HTTPException, Request
+from fastapi import HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.common.exceptions import (
     AppError,
     ConflictError,
+    ForbiddenError,
     NotFoundError,
+    RangeNotSatisfiableError,
     ValidationError,
 )
 
@@ -30,26 +32,58 @@ class ErrorResponse:
         return result
 
 
-class ErrorHandlerMiddleware(BaseHTTPMiddleware):
-    """Middleware to handle exceptions and return standardized error responses."""
+class ErrorHandlerMiddleware:
+    """
+    Middleware to handle exceptions and return standardized error responses.
+
+    Plain ASGI middleware, so responses, including streamed ones, pass
+    through without being wrapped. Errors raised once a response has started
+    can no longer be turned into an error response and are re-raised.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
 
-    async def dispatch(self, request: Request, call_next):
         try:
-            return await call_next(request)
+            await self.app(scope, receive, send_wrapper)
         except AppError as e:
+            if response_started:
+                raise
             logger.warning("Application error: %s", e.message, exc_info=True)
             status_code = self._get_status_code(e)
             error_response = ErrorResponse(e.message, e.code)
-            return JSONResponse(
-                status_code=status_code, content=error_response.to_dict()
+            headers = None
+            if isinstance(e, RangeNotSatisfiableError):
+                headers = {"Content-Range": f"bytes */{e.size}"}
+            response = JSONResponse(
+                status_code=status_code,
+                content=error_response.to_dict(),
+                headers=headers,
             )
-        except HTTPException as e:
+            await response(scope, receive, send)
+        except HTTPException:
             # Let FastAPI handle HTTP exceptions
-            raise e
+            raise
         except Exception as e:
+            if response_started:
+                raise
             logger.exception("Unexpected error: %s", str(e))
             error_response = ErrorResponse("Internal server error")
-            return JSONResponse(status_code=500, content=error_response.to_dict())
+            response = JSONResponse(status_code=500, content=error_response.to_dict())
+            await response(scope, receive, send)
 
     def _get_status_code(self, exception: AppError) -> int:
         """Map exception types to HTTP status codes."""
@@ -59,4 +93,8 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
             return 400
         if isinstance(exception, ConflictError):
             return 409
+        if isinstance(exception, ForbiddenError):
+            return 403
+        if isinstance(exception, RangeNotSatisfiableError):
+            return 416
         return 500
@@ -22,6 +22,20 @@ class ConflictError(AppError):
     """Raised when there is a conflict with the current state."""
 
 
+class ForbiddenError(AppError):
+    """Raised when the caller is not allowed to perform an operation."""
+
+
+class RangeNotSatisfiableError(AppError):
+    """Raised when a requested byte range lies outside the resource."""
+
+    def __init__(self, size: int):
+        super().__init__(
+            f"Range not satisfiable, resource is {size} bytes", "RANGE_NOT_SATISFIABLE"
+        )
+        self.size = size
+
+
 class UnsupportedFileTypeError(ValidationError):
     """Raised when an unsupported file type is uploaded."""
 
@@ -0,0 +1,70 @@
+"""Single byte range and conditional requests (RFC 9110 sections 13 and 14)."""
+
+from typing import Optional
+
+from app.common.exceptions import RangeNotSatisfiableError
+
+
+def parse_range(range_header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a Range header for a resource of ``size`` bytes.
+
+    Only a single byte range is served. Headers in another unit, with several
+    ranges or that cannot be parsed are ignored, so the whole resource is sent.
+
+    Returns:
+        (start, end) with end inclusive, or None to send the whole resource
+
+    Raises:
+        RangeNotSatisfiableError: If the range starts beyond the resource
+    """
+    if not range_header:
+        return None
+    unit, _, ranges = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in ranges:
+        return None
+
+    first, sep, last = ranges.strip().partition("-")
+    if not sep or not (first or last) or not (first + last).isdigit():
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise RangeNotSatisfiableError(size)
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError(size)
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def content_range(start: int, end: int, size: int) -> str:
+    return f"bytes {start}-{end}/{size}"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag, by weak comparison."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in tags
+
+
+def if_range_matches(if_range: Optional[str], etag: str) -> bool:
+    """
+    Check whether a Range header applies under an If-Range header.
+
+    If-Range needs a strong match of the current ETag. A weak ETag or a date
+    never matches, as no Last-Modified is sent, so the whole resource is sent.
+    """
+    if not if_range:
+        return True
+    if_range = if_range.strip()
+    return not etag.startswith("W/") and if_range == etag
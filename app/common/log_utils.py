@@ -1,27 +1,56 @@
 import logging
+import logging.handlers
+import queue
+from collections.abc import Mapping
+from typing import Optional
 
 from app.common.tracing import ctx_request, ctx_response, ctx_trace_id
 
+# State keys holding whole transcripts, left out of debug state summaries
+LARGE_STATE_KEYS = frozenset({"transcripts", "transcripts_pii_cleaned"})
+
 
 # Adds additional ECS fields to the logger.
+# The fields only change with the request, so they are built once per request
+# context and the same dicts are attached to every record logged within it.
 class ExtraFieldsFilter(logging.Filter):
+    def __init__(self, name=""):
+        super().__init__(name)
+        self._cached: Optional[tuple] = None
+
     def filter(self, record):
         trace_id = ctx_trace_id.get("")
         req = ctx_request.get(None)
         resp = ctx_response.get(None)
 
+        cached = self._cached
+        if (
+            cached is None
+            or cached[0] != trace_id
+            or cached[1] is not req
+            or cached[2] is not resp
+        ):
+            cached = (trace_id, req, resp, self._fields(trace_id, req, resp))
+            self._cached = cached
+
+        record.__dict__.update(cached[3])
+        return True
+
+    @staticmethod
+    def _fields(trace_id, req, resp) -> dict:
+        fields = {}
         if trace_id:
-            record.trace = {"id": trace_id}
+            fields["trace"] = {"id": trace_id}
 
         http = {}
         if req:
-            record.url = {"full": req.get("url", None)}
+            fields["url"] = {"full": req.get("url", None)}
             http["request"] = {"method": req.get("method", None)}
         if resp:
             http["response"] = resp
         if http:
-            record.http = http
-        return True
+            fields["http"] = http
+        return fields
 
 
 class EndpointFilter(logging.Filter):
@@ -31,3 +60,56 @@ class EndpointFilter(logging.Filter):
 
     def filter(self, record):
         return record.getMessage().find(self._path) == -1
+
+
+class QueueStreamHandler(logging.handlers.QueueHandler):
+    """
+    Write records to a stream from a background listener thread.
+
+    Logging on the event loop only renders the message and puts the record on
+    a queue; formatting (the formatter set on this handler, such as the ECS
+    formatter) and the blocking write happen on the listener thread. Filters
+    still run on the logging thread, so they see its context variables.
+    Closing the handler, which ``logging.shutdown`` does at exit, drains the
+    queue.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.target = logging.StreamHandler(stream)
+        self.listener = logging.handlers.QueueListener(self.queue, self.target)
+        self.listener.start()
+
+    def setFormatter(self, fmt):  # noqa: N802
+        self.target.setFormatter(fmt)
+
+    def prepare(self, record):
+        # Render the message now, while its arguments still hold the values
+        # at logging time, but leave formatting and exc_info to the formatter
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def close(self):
+        if self.listener._thread is not None:  # noqa: SLF001
+            self.listener.stop()
+        self.target.close()
+        super().close()
+
+
+class StateSummary:
+    """
+    Workflow state for debug logs, without the transcripts.
+
+    The summary is only rendered when a record is emitted, so passing one to
+    ``logger.debug`` costs nothing while debug logging is off.
+    """
+
+    __slots__ = ("state",)
+
+    def __init__(self, state: Mapping):
+        self.state = state
+
+    def __str__(self):
+        return str({k: v for k, v in self.state.items() if k not in LARGE_STATE_KEYS})
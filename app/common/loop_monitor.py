@@ -0,0 +1,126 @@
+"""Event loop lag sampling and blocking call detection."""
+
+import asyncio
+import contextlib
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from logging import getLogger
+from typing import Optional
+
+from app.common.metrics import counter, gauge, histogram, metrics_enabled
+from app.config import config
+
+logger = getLogger(__name__)
+
+
+class EventLoopMonitor:
+    """
+    Watch the event loop for lag and for callbacks blocking it.
+
+    A task sleeps for ``interval`` seconds at a time and records how late it
+    wakes up as the loop lag. A watchdog thread notices when that task has
+    not run for ``block_threshold`` seconds past its wake-up time, and logs
+    the stack of the loop thread to show the blocking call. The loop counts
+    as saturated while the mean lag of the last ``window`` samples reaches
+    ``saturation_lag``.
+    """
+
+    def __init__(
+        self,
+        interval: float,
+        block_threshold: float,
+        saturation_lag: float,
+        window: int = 10,
+    ):
+        self.interval = interval
+        self.block_threshold = block_threshold
+        self.saturation_lag = saturation_lag
+        self.lags: deque[float] = deque(maxlen=window)
+        self.blocked_calls = 0
+        self._beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def mean_lag(self) -> float:
+        return sum(self.lags) / len(self.lags) if self.lags else 0.0
+
+    @property
+    def saturated(self) -> bool:
+        return self._task is not None and self.mean_lag >= self.saturation_lag
+
+    def start(self):
+        """Start monitoring the running event loop."""
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._sample_lag())
+        self._watchdog = threading.Thread(
+            target=self._watch, name="event-loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=self.block_threshold)
+            self._watchdog = None
+
+    async def _sample_lag(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self._beat = time.monotonic()
+            lag = max(0.0, self._beat - start - self.interval)
+            self.lags.append(lag)
+            if metrics_enabled():
+                histogram("EventLoopLagMilliseconds", lag * 1000)
+                gauge("EventLoopSaturated", int(self.saturated))
+
+    def _watch(self):
+        reported = False
+        while not self._stopped.wait(self.block_threshold / 2):
+            stalled = time.monotonic() - self._beat - self.interval
+            if stalled < self.block_threshold:
+                reported = False
+            elif not reported:
+                # Report each stall once, while the loop is still inside it
+                reported = True
+                self._report_block(stalled)
+
+    def _report_block(self, stalled: float):
+        self.blocked_calls += 1
+        frame = sys._current_frames().get(self._loop_thread_id)  # noqa: SLF001
+        stack = "".join(traceback.format_stack(frame)) if frame else ""
+        logger.warning(
+            "Event loop blocked for %.0fms, loop thread stack:\n%s",
+            stalled * 1000,
+            stack,
+        )
+        if metrics_enabled():
+            counter("EventLoopBlocked", 1)
+
+
+_monitor: Optional[EventLoopMonitor] = None
+
+
+def get_loop_monitor() -> EventLoopMonitor:
+    """Get the process-wide event loop monitor."""
+    global _monitor
+    if _monitor is None:
+        _monitor = EventLoopMonitor(
+            interval=config.loop_monitor_interval_seconds,
+            block_threshold=config.loop_block_threshold_ms / 1000,
+            saturation_lag=config.loop_saturation_lag_ms / 1000,
+        )
+    return _monitor
@@ -1,25 +1,244 @@
+"""
+In-process metrics registry.
+
+Counters, gauges and histograms are aggregated in memory, so recording a
+metric on the request path or in the workflow only updates a dict. A
+background task flushes the aggregates once per interval as CloudWatch
+embedded metric format (EMF) documents, one per set of dimensions, and
+``/metrics`` can expose them in the Prometheus text format.
+
+Updates take no locks. They run on the event loop thread, and the flush only
+reads and swaps whole dicts, so an increment from a worker thread racing a
+flush lands in the next interval at worst.
+"""
+
+import asyncio
+import contextlib
+import random
+import re
+from bisect import bisect_left
 from logging import getLogger
+from typing import Optional
 
-from aws_embedded_metrics import metric_scope
+from aws_embedded_metrics.logger.metrics_logger_factory import create_metrics_logger
 from aws_embedded_metrics.storage_resolution import StorageResolution
 
+from app.config import config
+
 logger = getLogger(__name__)
 
+# Histogram bucket upper bounds, suited to latencies in milliseconds
+DEFAULT_BUCKETS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+# EMF accepts at most 100 values per metric in a document
+EMF_MAX_VALUES = 100
+
+_INVALID_PROMETHEUS_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+# Counter dimensions as sorted (name, value) pairs, so they can key a dict
+Dimensions = tuple[tuple[str, str], ...]
+
+
+class Histogram:
+    """Bucketed distribution, with a uniform sample of the current interval."""
+
+    def __init__(self, unit: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.unit = unit
+        self.buckets = buckets
+        self.bucket_counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.sample: list[float] = []
+        self._interval_count = 0
+
+    def observe(self, value: float):
+        self.bucket_counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        # Reservoir sampling keeps the interval sample unbiased and bounded
+        self._interval_count += 1
+        if len(self.sample) < EMF_MAX_VALUES:
+            self.sample.append(value)
+        else:
+            index = random.randrange(self._interval_count)  # noqa: S311
+            if index < EMF_MAX_VALUES:
+                self.sample[index] = value
+
+    def take_sample(self) -> list[float]:
+        """Return the interval sample and start a new interval."""
+        sample, self.sample = self.sample, []
+        self._interval_count = 0
+        return sample
+
+
+class MetricsRegistry:
+    """
+    Aggregate metrics in memory until they are flushed.
+
+    Counter and histogram totals are cumulative for Prometheus; the EMF flush
+    sends counter deltas and the histogram sample of each interval. Counters
+    are kept per set of dimensions, e.g. one LLMEndpointCalls total for each
+    Endpoint.
+    """
+
+    def __init__(self):
+        self.counters: dict[tuple[str, Dimensions], float] = {}
+        self.gauges: dict[str, float] = {}
+        self.histograms: dict[str, Histogram] = {}
+        self._flushed_counters: dict[tuple[str, Dimensions], float] = {}
+
+    def increment(
+        self,
+        name: str,
+        value: float = 1,
+        dimensions: Optional[dict[str, str]] = None,
+    ):
+        key = (name, tuple(sorted(dimensions.items())) if dimensions else ())
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def observe(self, name: str, value: float, unit: str = "Milliseconds"):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram(unit)
+        histogram.observe(value)
+
+    def collect_interval(self) -> list[tuple[str, Dimensions, list[float], str]]:
+        """
+        Collect the metrics of the interval since the previous collection.
+
+        Returns:
+            (name, dimensions, values, unit) for every metric with data in the
+            interval
+        """
+        counters = dict(self.counters)
+        previous, self._flushed_counters = self._flushed_counters, counters
+        collected = [
+            (name, dimensions, [total - previous.get((name, dimensions), 0)], "Count")
+            for (name, dimensions), total in counters.items()
+            if total != previous.get((name, dimensions), 0)
+        ]
+        collected.extend(
+            (name, (), [value], "None") for name, value in self.gauges.items()
+        )
+        for name, histogram in list(self.histograms.items()):
+            sample = histogram.take_sample()
+            if sample:
+                collected.append((name, (), sample, histogram.unit))
+        return collected
+
+    async def flush(self):
+        """
+        Send the metrics of the current interval as EMF documents.
+
+        Metrics without dimensions share one document, and each set of
+        dimensions gets a document of its own, as EMF applies dimensions to
+        every metric in a document.
+        """
+        documents: dict[Dimensions, list[tuple[str, list[float], str]]] = {}
+        for name, dimensions, values, unit in self.collect_interval():
+            documents.setdefault(dimensions, []).append((name, values, unit))
+        for dimensions, collected in documents.items():
+            try:
+                metrics = create_metrics_logger()
+                if dimensions:
+                    metrics.put_dimensions(dict(dimensions))
+                for name, values, unit in collected:
+                    for value in values:
+                        metrics.put_metric(
+                            name, value, unit, StorageResolution.STANDARD
+                        )
+                await metrics.flush()
+            except Exception as e:
+                logger.error("Error flushing metrics: %s", e)
+
+    async def run_flusher(self, interval: float):
+        """Flush every interval seconds until cancelled, then flush once more."""
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                await self.flush()
+        finally:
+            with contextlib.suppress(Exception):
+                await self.flush()
+
+    def render_prometheus(self) -> str:
+        """Render the cumulative metrics in the Prometheus text format."""
+        lines = []
+        previous_name = None
+        for (name, dimensions), total in sorted(self.counters.items()):
+            metric = f"{_prometheus_name(name)}_total"
+            if name != previous_name:
+                lines.append(f"# TYPE {metric} counter")
+                previous_name = name
+            labels = ",".join(
+                f'{_prometheus_name(key)}="{_prometheus_label(value)}"'
+                for key, value in dimensions
+            )
+            lines.append(
+                f"{metric}{{{labels}}} {total:g}" if labels else f"{metric} {total:g}"
+            )
+        for name, value in sorted(self.gauges.items()):
+            metric = _prometheus_name(name)
+            lines += [f"# TYPE {metric} gauge", f"{metric} {value:g}"]
+        for name, histogram in sorted(self.histograms.items()):
+            metric = _prometheus_name(name)
+            lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            bounds = [f"{bound:g}" for bound in histogram.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, histogram.bucket_counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{le="{bound}"}} {cumulative}')
+            lines.append(f"{metric}_sum {histogram.sum:g}")
+            lines.append(f"{metric}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _prometheus_name(name: str) -> str:
+    return _INVALID_PROMETHEUS_CHARS.sub("_", name)
+
+
+def _prometheus_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry: Optional[MetricsRegistry] = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide metrics registry."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry()
+    return _registry
+
+
+def metrics_enabled() -> bool:
+    """Whether metrics are recorded, for the EMF flush or for ``/metrics``."""
+    return config.enable_metrics or config.metrics_prometheus_enabled
+
+
+# Use these functions in the app, guarded by metrics_enabled. They only update
+# the in-memory registry, the lifespan task started by start_metrics_flusher
+# sends the metrics.
+def counter(
+    metric_name: str, value: float = 1, dimensions: Optional[dict[str, str]] = None
+):
+    get_metrics_registry().increment(metric_name, value, dimensions)
+
+
+def gauge(metric_name: str, value: float):
+    get_metrics_registry().set_gauge(metric_name, value)
+
 
-# This is using the aws_embedded_metrics library, which doesn't seem to be playing nicely with fastapi
-# metrics.put_metric always seems to thrown an exception, even though the metrics are being sent to cloudwatch
-# This is a related issue: https://github.com/awslabs/aws-embedded-metrics-python/issues/52
-# More time needs to be spent on this, but for now, the metrics are being sent to cloudwatch
-@metric_scope
-def __put_metric(metric_name, value, unit, metrics):
-    logger.debug("put metric: %s - %s - %s", metric_name, value, unit)
-    metrics.put_metric(metric_name, value, unit, StorageResolution.STANDARD)
+def histogram(metric_name: str, value: float, unit: str = "Milliseconds"):
+    get_metrics_registry().observe(metric_name, value, unit)
 
 
-# Use this counter function in the app, not the decorated function __put_metric.
-# This wraps __put_metric and handles the exceptions, allows the app to continue running
-def counter(metric_name, value):
-    try:
-        __put_metric(metric_name, value, "Count")
-    except Exception as e:
-        logger.error("Error calling put_metric: %s", e)
+def start_metrics_flusher() -> asyncio.Task:
+    """Start flushing the registry every ``config.metrics_flush_interval_seconds``."""
+    return asyncio.create_task(
+        get_metrics_registry().run_flusher(config.metrics_flush_interval_seconds)
+    )
@@ -0,0 +1,236 @@
+"""Opt-in sampling profiler for single requests and workflow runs."""
+
+import asyncio
+import random
+import secrets
+import sys
+import threading
+import uuid
+import weakref
+from collections import Counter
+from contextvars import ContextVar
+from logging import getLogger
+from types import FrameType
+from typing import Optional
+
+from botocore.exceptions import ClientError
+from fastapi import Header
+from fastapi.responses import PlainTextResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.common.exceptions import ForbiddenError, NotFoundError
+from app.common.s3 import get_file_content, get_s3_client
+from app.config import config
+
+logger = getLogger(__name__)
+
+PROFILE_TOKEN_HEADER = "x-profile-token"  # noqa: S105
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "x-profile-id"
+
+# Profiler following the current task, inherited by the tasks it creates
+ctx_profiler: ContextVar[Optional["SamplingProfiler"]] = ContextVar(
+    "profiler", default=None
+)
+
+
+class SamplingProfiler:
+    """
+    Sample the stack of one thread and count identical stacks.
+
+    The counts are rendered in the folded stack format read by flamegraph.pl,
+    speedscope and inferno. After follow_current_task, only samples taken
+    while the event loop runs the current task, or a task created from it, are
+    counted. That limits a profile to one workflow: it shares the loop with
+    requests and other workflows, and runs its graph nodes in tasks of their
+    own. Work moved to threads is not sampled.
+    """
+
+    def __init__(
+        self, thread_id: Optional[int] = None, interval: Optional[float] = None
+    ):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval or config.profiling_interval_ms / 1000
+        self.stacks: Counter[str] = Counter()
+        self.tasks: weakref.WeakSet[asyncio.Task] = weakref.WeakSet()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopped = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def follow_current_task(self):
+        """Only count samples of the current task and of the tasks it creates."""
+        loop = asyncio.get_running_loop()
+        _track_profiled_tasks(loop)
+        self._loop = loop
+        self.tasks.add(asyncio.current_task())
+        ctx_profiler.set(self)
+
+    def start(self):
+        self._stopped.clear()
+        self._sampler = threading.Thread(
+            target=self._sample, name="sampling-profiler", daemon=True
+        )
+        self._sampler.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._sampler is not None:
+            self._sampler.join()
+            self._sampler = None
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.items())
+
+    def _sample(self):
+        # Jitter keeps samples from locking onto periodic work on the loop
+        while not self._stopped.wait(self.interval * random.uniform(0.5, 1.5)):  # noqa: S311
+            task = self._running_task()
+            if self._loop is not None and task not in self.tasks:
+                continue
+            frame = sys._current_frames().get(self.thread_id)  # noqa: SLF001
+            stack = self._stack(frame)
+            # Dropped if the loop switched tasks while the stack was taken
+            if stack and self._running_task() is task:
+                self.stacks[stack] += 1
+
+    def _running_task(self) -> Optional[asyncio.Task]:
+        return asyncio.current_task(self._loop) if self._loop is not None else None
+
+    def _stack(self, frame: Optional[FrameType]) -> Optional[str]:
+        names = []
+        while frame is not None:
+            module = frame.f_globals.get("__name__", "?")
+            names.append(f"{module}:{frame.f_code.co_qualname}")
+            frame = frame.f_back
+        return ";".join(reversed(names)) if names else None
+
+
+def _track_profiled_tasks(loop: asyncio.AbstractEventLoop):
+    """
+    Install a task factory adding new tasks to the profiler in ctx_profiler.
+
+    Installed on first use only, and chained to any existing task factory.
+    """
+    factory = loop.get_task_factory()
+    if getattr(factory, "tracks_profiled_tasks", False):
+        return
+
+    def task_factory(loop, coro, **kwargs):
+        if factory is None:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        else:
+            task = factory(loop, coro, **kwargs)
+        # The task runs in the given context, or a copy of the current one
+        context = kwargs.get("context")
+        profiler = ctx_profiler.get() if context is None else context.get(ctx_profiler)
+        if profiler is not None:
+            profiler.tasks.add(task)
+        return task
+
+    task_factory.tracks_profiled_tasks = True
+    loop.set_task_factory(task_factory)
+
+
+def is_profiling_authorized(token: Optional[str]) -> bool:
+    """Check a profiling admin token against ``config.profiling_admin_token``."""
+    expected = config.profiling_admin_token
+    if not expected or not token:
+        return False
+    return secrets.compare_digest(token.encode(), expected.encode())
+
+
+def require_profiling_admin(
+    x_profile_token: Optional[str] = Header(default=None),
+):
+    """FastAPI dependency rejecting requests without the profiling admin token."""
+    if not is_profiling_authorized(x_profile_token):
+        msg = "Profiling requires a valid admin token"
+        raise ForbiddenError(msg)
+
+
+def profile_response(profile: str, filename: str) -> PlainTextResponse:
+    """Serve a folded stack profile as a file download."""
+    return PlainTextResponse(
+        profile,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def request_profile_key(profile_id: str) -> str:
+    return f"profiles/requests/{profile_id}.folded"
+
+
+def workflow_profile_key(analysis_id: str) -> str:
+    return f"research/{analysis_id}/profile.folded"
+
+
+def save_profile(key: str, profiler: SamplingProfiler):
+    """Store a profile in S3 in the folded stack format."""
+    get_s3_client().put_object(
+        Bucket=config.s3_bucket_name,
+        Key=key,
+        Body=profiler.folded().encode("utf-8"),
+        ContentType="text/plain",
+    )
+    logger.info("Stored profile %s with %d samples", key, profiler.stacks.total())
+
+
+def load_profile(key: str) -> str:
+    """
+    Load a stored profile from S3.
+
+    Raises:
+        NotFoundError: If no profile is stored under the key
+    """
+    try:
+        return get_file_content(key, get_s3_client())
+    except ClientError as e:
+        if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+            msg = "Profile not found"
+            raise NotFoundError(msg) from e
+        raise
+
+
+# Only added when PROFILING_ADMIN_TOKEN is set, so requests pay nothing
+# for profiling otherwise.
+class ProfilingMiddleware:
+    """
+    Profile requests sent with ``x-profile: request`` and an admin token.
+
+    The profile ID is sent in the ``x-profile-id`` response header, and the
+    profile is stored once the response has been sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        headers = Headers(scope=scope) if scope["type"] == "http" else None
+        if (
+            headers is None
+            or headers.get(PROFILE_HEADER) != "request"
+            or not is_profiling_authorized(headers.get(PROFILE_TOKEN_HEADER))
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[PROFILE_ID_HEADER] = profile_id
+            await send(message)
+
+        profiler = SamplingProfiler()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            try:
+                await asyncio.to_thread(
+                    save_profile, request_profile_key(profile_id), profiler
+                )
+            except Exception as e:
+                logger.error("Failed to store request profile: %s", e)
@@ -1,4 +1,6 @@
+import asyncio
 import uuid
+from collections.abc import AsyncIterator
 from logging import getLogger
 from typing import BinaryIO, Optional
 
@@ -110,6 +112,51 @@ def get_file_content(s3_key: str, s3_client) -> str:
         raise
 
 
+def head_file(s3_key: str, s3_client) -> dict:
+    """
+    Get the metadata of a file in S3 without its content.
+
+    Returns:
+        head_object response, with ContentLength and ETag
+    """
+    return s3_client.head_object(Bucket=config.s3_bucket_name, Key=s3_key)
+
+
+def open_file(
+    s3_key: str,
+    s3_client,
+    byte_range: Optional[tuple[int, int]] = None,
+    etag: Optional[str] = None,
+):
+    """
+    Open the content of a file in S3 for streaming.
+
+    Args:
+        s3_key: S3 key of the file
+        s3_client: S3 client instance
+        byte_range: Inclusive (start, end) byte range to read
+        etag: Only read the file if it still has this ETag
+
+    Returns:
+        The unread body, see iter_file_chunks
+    """
+    params = {"Bucket": config.s3_bucket_name, "Key": s3_key}
+    if byte_range is not None:
+        params["Range"] = f"bytes={byte_range[0]}-{byte_range[1]}"
+    if etag is not None:
+        params["IfMatch"] = etag
+    return s3_client.get_object(**params)["Body"]
+
+
+async def iter_file_chunks(body, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Read an S3 body chunk by chunk off the event loop, closing it at the end."""
+    try:
+        while chunk := await asyncio.to_thread(body.read, chunk_size):
+            yield chunk
+    finally:
+        body.close()
+
+
 def _make_safe_filename(filename: str) -> str:
     """Make filename safe for S3."""
     # Remove directory paths and keep only the filename
@@ -0,0 +1,188 @@
+"""
+Lightweight tracing spans.
+
+Spans follow the OpenTelemetry data model: 32 hex character trace IDs, 16 hex
+character span IDs, nanosecond Unix timestamps and an UNSET/OK/ERROR status.
+Finished spans are handed to every registered exporter, which implement the
+same ``export``/``shutdown`` interface as OpenTelemetry SDK span exporters.
+"""
+
+import contextvars
+import re
+import secrets
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from logging import getLogger
+from typing import Any, Optional, Protocol
+
+logger = getLogger(__name__)
+
+STATUS_UNSET = "UNSET"
+STATUS_OK = "OK"
+STATUS_ERROR = "ERROR"
+
+_TRACE_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    start_time_unix_nano: int = field(default_factory=time.time_ns)
+    end_time_unix_nano: Optional[int] = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    status: str = STATUS_UNSET
+    status_message: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_time_unix_nano is None:
+            return None
+        return (self.end_time_unix_nano - self.start_time_unix_nano) / 1_000_000
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_status(self, status: str, message: Optional[str] = None):
+        self.status = status
+        self.status_message = message
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "attributes": self.attributes,
+            "status": self.status,
+            "status_message": self.status_message,
+        }
+
+
+class SpanExporter(Protocol):
+    def export(self, spans: Sequence[Span]) -> None: ...
+
+    def shutdown(self) -> None: ...
+
+
+class InMemorySpanExporter:
+    """
+    Keep finished spans in memory, for tests and for batching writes.
+
+    Spans are grouped by trace, so popping one trace does not scan the others.
+    With ``max_spans``, the oldest traces, such as traces that are never
+    popped, are dropped once the buffer holds more spans. The latest trace is
+    always kept.
+    """
+
+    def __init__(self, max_spans: Optional[int] = None):
+        self.max_spans = max_spans
+        self._traces: dict[str, list[Span]] = {}
+        self._size = 0
+
+    def export(self, spans: Sequence[Span]):
+        for span in spans:
+            self._traces.setdefault(span.trace_id, []).append(span)
+        self._size += len(spans)
+        if self.max_spans is not None:
+            self._drop_oldest_traces(self.max_spans)
+
+    def shutdown(self):
+        self.clear()
+
+    def get_finished_spans(self) -> list[Span]:
+        return [span for trace in self._traces.values() for span in trace]
+
+    def pop_spans(self, trace_id: str) -> list[Span]:
+        """Remove and return the finished spans of one trace."""
+        popped = self._traces.pop(trace_id, [])
+        self._size -= len(popped)
+        return popped
+
+    def clear(self):
+        self._traces = {}
+        self._size = 0
+
+    def _drop_oldest_traces(self, max_spans: int):
+        # Dicts keep insertion order, so the first trace is the oldest
+        while self._size > max_spans and len(self._traces) > 1:
+            trace_id = next(iter(self._traces))
+            dropped = self.pop_spans(trace_id)
+            logger.warning(
+                "Dropped %d buffered spans of trace %s", len(dropped), trace_id
+            )
+
+
+ctx_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "span", default=None
+)
+
+_exporters: list[SpanExporter] = []
+
+
+def add_span_exporter(exporter: SpanExporter):
+    if exporter not in _exporters:
+        _exporters.append(exporter)
+
+
+def remove_span_exporter(exporter: SpanExporter):
+    if exporter in _exporters:
+        _exporters.remove(exporter)
+
+
+def to_trace_id(request_id: Optional[str]) -> str:
+    """Use a UUID request ID as trace ID, or generate a new trace ID."""
+    candidate = (request_id or "").replace("-", "").lower()
+    return candidate if _TRACE_ID.match(candidate) else secrets.token_hex(16)
+
+
+@contextmanager
+def start_span(
+    name: str, trace_id: Optional[str] = None, **attributes: Any
+) -> Iterator[Span]:
+    """
+    Record a span around a block of sync or async code.
+
+    The span becomes the parent of spans started within the block, including
+    in tasks and threads created from it. A block exiting with an exception
+    ends the span with ERROR status.
+
+    Args:
+        name: Span name
+        trace_id: Trace ID of a new root span, ignored within another span
+        **attributes: Initial span attributes
+    """
+    parent = ctx_span.get()
+    span = Span(
+        name=name,
+        trace_id=parent.trace_id if parent else trace_id or to_trace_id(None),
+        span_id=secrets.token_hex(8),
+        parent_span_id=parent.span_id if parent else None,
+        attributes=attributes,
+    )
+    token = ctx_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.set_status(STATUS_ERROR, str(e) or type(e).__name__)
+        raise
+    finally:
+        span.end_time_unix_nano = time.time_ns()
+        ctx_span.reset(token)
+        _export(span)
+
+
+def _export(span: Span):
+    for exporter in _exporters:
+        try:
+            exporter.export([span])
+        except Exception as e:
+            logger.error("Failed to export span %s: %s", span.name, e)
@@ -0,0 +1,131 @@
+"""Tests for negotiated response compression."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.common.compression import CompressionMiddleware, negotiate_encoding
+
+BODY = "Participant: the form times out when I renew online.\n" * 100
+
+
+def create_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, path_prefix="/api", minimum_size=500)
+
+    @app.get("/api/report")
+    async def report():
+        return PlainTextResponse(BODY)
+
+    @app.get("/api/small")
+    async def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/api/stream")
+    async def stream():
+        async def chunks():
+            for _ in range(3):
+                yield BODY
+
+        return StreamingResponse(chunks(), media_type="text/markdown")
+
+    @app.get("/api/ranged")
+    async def ranged():
+        return PlainTextResponse(BODY, headers={"Accept-Ranges": "bytes"})
+
+    @app.get("/api/strong-etag")
+    async def strong_etag():
+        return PlainTextResponse(BODY, headers={"ETag": '"v1"'})
+
+    @app.get("/api/weak-etag")
+    async def weak_etag():
+        return PlainTextResponse(BODY, headers={"ETag": 'W/"v1"'})
+
+    @app.get("/other")
+    async def other():
+        return PlainTextResponse(BODY)
+
+    return app
+
+
+def get(path: str, accept_encoding: str):
+    # The test client decodes zstd and gzip bodies
+    with TestClient(create_app()) as client:
+        return client.get(path, headers={"Accept-Encoding": accept_encoding})
+
+
+# Test Cases - Negotiation
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected"),
+    [
+        ("gzip, deflate, br, zstd", "zstd"),
+        ("gzip;q=1.0, zstd;q=0.5", "gzip"),
+        ("zstd;q=0, gzip", "gzip"),
+        ("*", "zstd"),
+        ("br", "identity"),
+        ("", "identity"),
+    ],
+)
+def test_negotiates_best_accepted_encoding(accept_encoding, expected):
+    assert negotiate_encoding(accept_encoding) == expected
+
+
+# Test Cases - Middleware
+@pytest.mark.parametrize("encoding", ["zstd", "gzip"])
+def test_compresses_response(encoding):
+    # When
+    response = get("/api/report", f"{encoding}, identity;q=0.1")
+
+    # Then
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(BODY) / 10
+    assert response.text == BODY
+
+
+def test_compresses_streamed_response_per_chunk():
+    # When
+    response = get("/api/stream", "zstd")
+
+    # Then
+    assert response.headers["content-encoding"] == "zstd"
+    assert "content-length" not in response.headers
+    assert response.text == BODY * 3
+
+
+def test_compresses_response_with_weak_etag():
+    # When
+    response = get("/api/weak-etag", "gzip")
+
+    # Then
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"v1"'
+
+
+@pytest.mark.parametrize(
+    ("path", "accept_encoding"),
+    [
+        ("/api/small", "zstd"),
+        ("/other", "zstd"),
+        ("/api/report", "br"),
+        ("/api/ranged", "zstd"),
+        ("/api/ranged", "gzip"),
+        ("/api/strong-etag", "gzip"),
+    ],
+    ids=[
+        "below minimum size",
+        "outside prefix",
+        "no supported encoding",
+        "byte ranges offered (zstd)",
+        "byte ranges offered (gzip)",
+        "strong etag",
+    ],
+)
+def test_leaves_response_uncompressed(path, accept_encoding):
+    # When
+    response = get(path, accept_encoding)
+
+    # Then
+    assert "content-encoding" not in response.headers
+    assert response.text in ("ok", BODY)
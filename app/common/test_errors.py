@@ -0,0 +1,75 @@
+"""Tests for the error handling middleware."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.common.errors import ErrorHandlerMiddleware
+from app.common.exceptions import ForbiddenError, NotFoundError
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+    app.add_middleware(ErrorHandlerMiddleware)
+
+    @app.get("/missing")
+    async def missing():
+        msg = "Analysis 1 not found"
+        raise NotFoundError(msg, "NOT_FOUND")
+
+    @app.get("/forbidden")
+    async def forbidden():
+        msg = "No access"
+        raise ForbiddenError(msg)
+
+    @app.get("/broken")
+    async def broken():
+        msg = "boom"
+        raise RuntimeError(msg)
+
+    @app.get("/stream")
+    async def stream():
+        async def chunks():
+            yield b"first"
+            msg = "stream broke"
+            raise RuntimeError(msg)
+
+        return StreamingResponse(chunks())
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+# Test Cases - Error responses
+@pytest.mark.parametrize(
+    ("path", "status_code", "body"),
+    [
+        (
+            "/missing",
+            404,
+            {
+                "status": "ERROR",
+                "error_message": "Analysis 1 not found",
+                "code": "NOT_FOUND",
+            },
+        ),
+        ("/forbidden", 403, {"status": "ERROR", "error_message": "No access"}),
+        ("/broken", 500, {"status": "ERROR", "error_message": "Internal server error"}),
+    ],
+)
+def test_exceptions_map_to_error_responses(client, path, status_code, body):
+    # Given / When
+    response = client.get(path)
+
+    # Then
+    assert response.status_code == status_code
+    assert response.json() == body
+
+
+def test_error_after_response_started_is_not_rewritten(client):
+    # Given / When
+    response = client.get("/stream")
+
+    # Then: the started response is not followed by a second, 500 response
+    assert response.status_code == 200
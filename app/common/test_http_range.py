@@ -0,0 +1,62 @@
+"""Tests for byte range parsing."""
+
+import pytest
+
+from app.common.exceptions import RangeNotSatisfiableError
+from app.common.http_range import etag_matches, if_range_matches, parse_range
+
+
+# Test Cases - Range parsing
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, None),
+        ("bytes=0-99", (0, 99)),
+        ("bytes=900-2000", (900, 999)),
+        ("bytes=100-", (100, 999)),
+        ("bytes=-100", (900, 999)),
+        ("bytes=-5000", (0, 999)),
+        ("bytes=10-5", None),
+        ("bytes=0-9,20-29", None),
+        ("items=0-9", None),
+        ("bytes=a-b", None),
+    ],
+)
+def test_parses_single_byte_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=1000-", "bytes=1000-1005", "bytes=-0"])
+def test_rejects_range_outside_resource(header):
+    with pytest.raises(RangeNotSatisfiableError, match="1000 bytes"):
+        parse_range(header, 1000)
+
+
+# Test Cases - Conditional requests
+@pytest.mark.parametrize(
+    ("if_none_match", "expected"),
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ("*", True),
+        ('"xyz"', False),
+    ],
+)
+def test_matches_if_none_match_weakly(if_none_match, expected):
+    assert etag_matches(if_none_match, '"abc"') is expected
+
+
+@pytest.mark.parametrize(
+    ("if_range", "expected"),
+    [
+        (None, True),
+        ('"abc"', True),
+        ('"xyz"', False),
+        ('W/"abc"', False),
+        ("Wed, 01 May 2024 10:00:00 GMT", False),
+    ],
+)
+def test_if_range_needs_a_strong_match(if_range, expected):
+    assert if_range_matches(if_range, '"abc"') is expected
@@ -0,0 +1,88 @@
+"""Tests for the logging pipeline."""
+
+import io
+import logging
+import threading
+
+from app.common.log_utils import ExtraFieldsFilter, QueueStreamHandler, StateSummary
+from app.common.tracing import ctx_request, ctx_trace_id
+
+
+def _record(msg="message", args=None) -> logging.LogRecord:
+    return logging.LogRecord("test", logging.INFO, __file__, 1, msg, args, None)
+
+
+class _ThreadRecordingStream(io.StringIO):
+    def write(self, s):
+        self.thread = threading.current_thread()
+        return super().write(s)
+
+
+class _CountingState(dict):
+    items_calls = 0
+
+    def items(self):
+        self.items_calls += 1
+        return super().items()
+
+
+# Test Cases - Queue Handler
+def test_queue_stream_handler_writes_from_listener_thread():
+    # Given
+    stream = _ThreadRecordingStream()
+    handler = QueueStreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+    values = [1, 2]
+
+    # When: arguments are mutated after logging
+    handler.handle(_record("values %s", (values,)))
+    values.append(3)
+    handler.close()
+
+    # Then: the message holds the values at logging time
+    assert stream.getvalue() == "INFO values [1, 2]\n"
+    assert stream.thread is not threading.current_thread()
+
+
+# Test Cases - Extra Fields
+def test_extra_fields_follow_the_request_context():
+    # Given
+    log_filter = ExtraFieldsFilter()
+    trace_token = ctx_trace_id.set("trace-1")
+    request_token = ctx_request.set({"url": "http://test/health", "method": "GET"})
+    first, second, third = _record(), _record(), _record()
+
+    # When
+    log_filter.filter(first)
+    log_filter.filter(second)
+    ctx_trace_id.set("trace-2")
+    log_filter.filter(third)
+    ctx_trace_id.reset(trace_token)
+    ctx_request.reset(request_token)
+
+    # Then
+    assert first.trace == {"id": "trace-1"}
+    assert first.url == {"full": "http://test/health"}
+    assert first.http == {"request": {"method": "GET"}}
+    assert second.trace is first.trace
+    assert third.trace == {"id": "trace-2"}
+
+
+# Test Cases - State Summary
+def test_state_summary_is_rendered_only_when_emitted(caplog):
+    # Given
+    state = _CountingState(
+        analysis_id="a1", transcripts=["long"], transcripts_pii_cleaned=["long"]
+    )
+    logger = logging.getLogger("test.state_summary")
+
+    # When
+    with caplog.at_level(logging.INFO, logger=logger.name):
+        logger.debug("Input state: %s", StateSummary(state))
+    calls_with_debug_off = state.items_calls
+    with caplog.at_level(logging.DEBUG, logger=logger.name):
+        logger.debug("Input state: %s", StateSummary(state))
+
+    # Then
+    assert calls_with_debug_off == 0
+    assert caplog.messages == ["Input state: {'analysis_id': 'a1'}"]
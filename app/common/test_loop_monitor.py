@@ -0,0 +1,74 @@
+"""Tests for the event loop monitor."""
+
+import asyncio
+import logging
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.common import loop_monitor
+from app.common.loop_monitor import EventLoopMonitor
+from app.main import app
+
+
+def make_monitor(**kwargs) -> EventLoopMonitor:
+    options = {"interval": 0.02, "block_threshold": 0.1, "saturation_lag": 0.05}
+    return EventLoopMonitor(**{**options, **kwargs})
+
+
+def block_the_loop(seconds: float):
+    time.sleep(seconds)
+
+
+# Test Cases - Monitoring
+@pytest.mark.asyncio
+async def test_blocking_call_is_reported_with_its_stack(caplog):
+    # Given
+    monitor = make_monitor()
+    monitor.start()
+    await asyncio.sleep(0.05)
+
+    # When
+    with caplog.at_level(logging.WARNING, logger=loop_monitor.__name__):
+        block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    # Then
+    assert monitor.blocked_calls == 1
+    assert "block_the_loop" in caplog.text
+    assert max(monitor.lags) >= 0.25
+
+
+@pytest.mark.asyncio
+async def test_idle_loop_is_not_saturated():
+    # Given
+    monitor = make_monitor()
+    monitor.start()
+
+    # When
+    await asyncio.sleep(0.2)
+    await monitor.stop()
+
+    # Then
+    assert monitor.blocked_calls == 0
+    assert monitor.lags
+    assert monitor.mean_lag < 0.05
+
+
+# Test Cases - Readiness
+def test_ready_fails_while_loop_is_saturated():
+    # Given
+    monitor = make_monitor()
+    monitor._task = object()
+    monitor.lags.extend([0.4, 0.6])
+
+    # When
+    with patch.object(loop_monitor, "_monitor", monitor):
+        response = TestClient(app).get("/health/ready")
+
+    # Then
+    assert response.status_code == 503
+    assert response.json() == {"status": "saturated", "loop_lag_ms": 500}
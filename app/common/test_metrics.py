@@ -0,0 +1,115 @@
+"""Tests for the in-process metrics registry."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.common import metrics
+from app.common.metrics import EMF_MAX_VALUES, MetricsRegistry
+from app.metrics.router import router
+
+
+# Test Cases - Aggregation
+def test_counters_are_flushed_as_interval_deltas():
+    # Given
+    registry = MetricsRegistry()
+    registry.increment("LLMCalls")
+    registry.increment("LLMCalls", 2)
+
+    # When
+    first = registry.collect_interval()
+    registry.increment("LLMCalls")
+    second = registry.collect_interval()
+    third = registry.collect_interval()
+
+    # Then: totals stay cumulative for Prometheus
+    assert first == [("LLMCalls", (), [3], "Count")]
+    assert second == [("LLMCalls", (), [1], "Count")]
+    assert third == []
+    assert registry.counters[("LLMCalls", ())] == 4
+
+
+def test_histogram_sample_is_bounded_per_interval():
+    # Given
+    registry = MetricsRegistry()
+
+    # When
+    for value in range(1000):
+        registry.observe("LLMCallMilliseconds", value)
+    ((name, _, sample, unit),) = registry.collect_interval()
+
+    # Then
+    assert (name, unit) == ("LLMCallMilliseconds", "Milliseconds")
+    assert len(sample) == EMF_MAX_VALUES
+    assert registry.histograms[name].count == 1000
+    assert registry.collect_interval() == []
+
+
+@pytest.mark.asyncio
+async def test_flush_sends_one_emf_document():
+    # Given
+    registry = MetricsRegistry()
+    registry.increment("LLMCalls", 2)
+    registry.set_gauge("LLMActiveCalls", 5)
+    emf_logger = MagicMock(flush=AsyncMock())
+
+    # When
+    with patch.object(metrics, "create_metrics_logger", return_value=emf_logger):
+        await registry.flush()
+
+    # Then
+    metric_names = [call.args[0] for call in emf_logger.put_metric.call_args_list]
+    assert metric_names == ["LLMCalls", "LLMActiveCalls"]
+    emf_logger.flush.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_flush_sends_one_emf_document_per_dimension_set():
+    # Given
+    registry = MetricsRegistry()
+    registry.increment("LLMCalls")
+    registry.increment("LLMEndpointCalls", dimensions={"Endpoint": "eu-west-1"})
+    registry.increment("LLMEndpointErrors", dimensions={"Endpoint": "eu-west-1"})
+    emf_loggers = [MagicMock(flush=AsyncMock()), MagicMock(flush=AsyncMock())]
+
+    # When
+    with patch.object(metrics, "create_metrics_logger", side_effect=emf_loggers):
+        await registry.flush()
+
+    # Then
+    plain, endpoint = emf_loggers
+    plain.put_dimensions.assert_not_called()
+    assert [call.args[0] for call in plain.put_metric.call_args_list] == ["LLMCalls"]
+    endpoint.put_dimensions.assert_called_once_with({"Endpoint": "eu-west-1"})
+    assert [call.args[0] for call in endpoint.put_metric.call_args_list] == [
+        "LLMEndpointCalls",
+        "LLMEndpointErrors",
+    ]
+
+
+# Test Cases - Prometheus
+def test_prometheus_exposition():
+    # Given
+    registry = MetricsRegistry()
+    registry.increment("LLMEndpointCalls", 3, {"Endpoint": "eu-west-1"})
+    registry.increment("LLMEndpointCalls", 1, {"Endpoint": "eu-central-1"})
+    registry.observe("LLMCallMilliseconds", 7)
+    registry.observe("LLMCallMilliseconds", 70000)
+
+    # When
+    app = FastAPI()
+    app.include_router(router)
+    with patch.object(metrics, "_registry", registry):
+        response = TestClient(app).get("/metrics")
+
+    # Then
+    text = response.text
+    assert response.headers["content-type"].startswith("text/plain")
+    assert text.count("# TYPE LLMEndpointCalls_total counter") == 1
+    assert 'LLMEndpointCalls_total{Endpoint="eu-west-1"} 3' in text
+    assert 'LLMEndpointCalls_total{Endpoint="eu-central-1"} 1' in text
+    assert 'LLMCallMilliseconds_bucket{le="10"} 1' in text
+    assert 'LLMCallMilliseconds_bucket{le="+Inf"} 2' in text
+    assert "LLMCallMilliseconds_count 2" in text
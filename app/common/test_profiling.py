@@ -0,0 +1,136 @@
+"""Tests for the opt-in sampling profiler."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.common import profiling
+from app.common.errors import ErrorHandlerMiddleware
+from app.common.profiling import (
+    ProfilingMiddleware,
+    SamplingProfiler,
+    is_profiling_authorized,
+)
+
+TOKEN = "admin-token"  # noqa: S105
+
+
+def spin(seconds: float):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        pass
+
+
+async def busy_coroutine(seconds: float):
+    for _ in range(int(seconds / 0.01)):
+        spin(0.01)
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def app():
+    app = FastAPI()
+    app.add_middleware(ErrorHandlerMiddleware)
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get("/work")
+    async def work():
+        spin(0.1)
+        return {"status": "ok"}
+
+    return app
+
+
+# Test Cases - Sampling
+def test_profile_is_folded_stacks_of_the_thread():
+    # Given
+    profiler = SamplingProfiler(interval=0.005)
+
+    # When
+    profiler.start()
+    spin(0.1)
+    profiler.stop()
+
+    # Then
+    lines = profiler.folded().splitlines()
+    assert any("test_profiling:spin " in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert ";" in stack
+    assert int(count) > 0
+
+
+@pytest.mark.asyncio
+async def test_following_a_task_includes_its_child_tasks_only():
+    # Given
+    async def child():
+        await busy_coroutine(0.1)
+
+    async def profiled():
+        profiler = SamplingProfiler(interval=0.005)
+        profiler.follow_current_task()
+        profiler.start()
+        await asyncio.create_task(child())
+        profiler.stop()
+        return profiler
+
+    async def other():
+        await busy_coroutine(0.1)
+
+    # When
+    profiler, _ = await asyncio.gather(profiled(), other())
+
+    # Then: the child task runs outside the profiled coroutine's frame
+    folded = profiler.folded()
+    assert (
+        "test_following_a_task_includes_its_child_tasks_only.<locals>.child" in folded
+    )
+    assert "other" not in folded
+
+
+# Test Cases - Admin guard
+def test_profiling_needs_configured_token():
+    # Given / When / Then
+    with patch.object(profiling.config, "profiling_admin_token", None):
+        assert not is_profiling_authorized(TOKEN)
+    with patch.object(profiling.config, "profiling_admin_token", TOKEN):
+        assert is_profiling_authorized(TOKEN)
+        assert not is_profiling_authorized("wrong")
+        assert not is_profiling_authorized(None)
+
+
+def test_request_is_profiled_with_admin_token(app):
+    # Given
+    headers = {"x-profile": "request", "x-profile-token": TOKEN}
+
+    # When
+    with (
+        patch.object(profiling.config, "profiling_admin_token", TOKEN),
+        patch.object(profiling, "save_profile") as save_profile,
+    ):
+        response = TestClient(app).get("/work", headers=headers)
+
+    # Then
+    profile_id = response.headers["x-profile-id"]
+    key, profiler = save_profile.call_args.args
+    assert key == f"profiles/requests/{profile_id}.folded"
+    assert "test_profiling:spin" in profiler.folded()
+
+
+def test_request_without_token_is_not_profiled(app):
+    # Given
+    headers = {"x-profile": "request", "x-profile-token": "wrong"}
+
+    # When
+    with (
+        patch.object(profiling.config, "profiling_admin_token", TOKEN),
+        patch.object(profiling, "save_profile") as save_profile,
+    ):
+        response = TestClient(app).get("/work", headers=headers)
+
+    # Then
+    assert "x-profile-id" not in response.headers
+    save_profile.assert_not_called()
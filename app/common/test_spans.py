@@ -0,0 +1,106 @@
+"""Tests for tracing spans."""
+
+import asyncio
+
+import pytest
+
+from app.common.spans import (
+    STATUS_ERROR,
+    InMemorySpanExporter,
+    add_span_exporter,
+    remove_span_exporter,
+    start_span,
+    to_trace_id,
+)
+
+
+@pytest.fixture
+def exporter():
+    exporter = InMemorySpanExporter()
+    add_span_exporter(exporter)
+    yield exporter
+    remove_span_exporter(exporter)
+
+
+# Test Cases - Spans
+@pytest.mark.asyncio
+async def test_spans_nest_across_tasks_and_threads(exporter):
+    # Given
+    def read_file():
+        with start_span("thread"):
+            pass
+
+    async def child():
+        with start_span("task"):
+            await asyncio.to_thread(read_file)
+
+    # When
+    with start_span("root") as root:
+        await asyncio.create_task(child())
+
+    # Then
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert spans["task"].parent_span_id == root.span_id
+    assert spans["thread"].parent_span_id == spans["task"].span_id
+    assert spans["thread"].trace_id == root.trace_id
+    assert spans["root"].parent_span_id is None
+    assert spans["root"].duration_ms >= 0
+
+
+def test_exception_ends_span_with_error(exporter):
+    # Given / When
+    msg = "boom"
+    with pytest.raises(ValueError, match=msg), start_span("failing"):
+        raise ValueError(msg)
+
+    # Then
+    (span,) = exporter.get_finished_spans()
+    assert span.status == STATUS_ERROR
+    assert span.status_message == "boom"
+    assert span.end_time_unix_nano is not None
+
+
+def test_uuid_request_id_becomes_trace_id():
+    # Given / When / Then
+    assert to_trace_id("0F8FAD5B-D9CB-469F-A165-70867728950E") == (
+        "0f8fad5bd9cb469fa16570867728950e"
+    )
+    assert len(to_trace_id("not-a-uuid")) == 32
+
+
+def test_pop_spans_only_returns_the_trace(exporter):
+    # Given
+    with start_span("first") as first:
+        pass
+    with start_span("second"):
+        pass
+
+    # When
+    popped = exporter.pop_spans(first.trace_id)
+
+    # Then
+    assert [span.name for span in popped] == ["first"]
+    assert [span.name for span in exporter.get_finished_spans()] == ["second"]
+
+
+def test_buffer_drops_the_oldest_traces_past_its_cap():
+    # Given
+    exporter = InMemorySpanExporter(max_spans=3)
+    add_span_exporter(exporter)
+    try:
+        with start_span("abandoned") as abandoned, start_span("abandoned child"):
+            pass
+
+        # When
+        with start_span("latest") as latest, start_span("latest child"):
+            pass
+    finally:
+        remove_span_exporter(exporter)
+
+    # Then
+    assert exporter.pop_spans(abandoned.trace_id) == []
+    assert [span.name for span in exporter.pop_spans(latest.trace_id)] == [
+        "latest child",
+        "latest",
+    ]
+    assert exporter.get_finished_spans() == []
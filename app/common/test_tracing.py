@@ -0,0 +1,56 @@
+"""Tests for the trace ID middleware."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.common.tracing import (
+    TraceIdMiddleware,
+    ctx_request,
+    ctx_response,
+    ctx_trace_id,
+)
+
+seen = {}
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(TraceIdMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        seen["trace_id"] = ctx_trace_id.get("")
+        seen["request"] = ctx_request.get(None)
+        return {"id": item_id}
+
+    return TestClient(app)
+
+
+# Test Cases - Context
+def test_trace_id_and_request_reach_the_endpoint():
+    # Given
+    client = make_client()
+
+    # When
+    response = client.get("/items/1?a=b", headers={"x-cdp-request-id": "abc-123"})
+
+    # Then
+    assert response.status_code == 200
+    assert seen["trace_id"] == "abc-123"
+    assert seen["request"] == {"url": "http://testserver/items/1?a=b", "method": "GET"}
+
+
+def test_response_status_is_recorded():
+    # Given
+    statuses = []
+    app = FastAPI()
+
+    async def outer(scope, receive, send):
+        await TraceIdMiddleware(app)(scope, receive, send)
+        statuses.append(ctx_response.get(None))
+
+    # When
+    TestClient(outer).get("/unknown")
+
+    # Then
+    assert statuses == [{"status_code": 404}]
@@ -2,7 +2,7 @@ import contextvars
 from logging import getLogger
 
 from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.config import config
 
@@ -17,14 +17,27 @@ ctx_response = contextvars.ContextVar("response")
 # This can be used to follow a single request across multiple services.
 # TraceIdMiddleware handles extracting the tracing header and persisting it
 # for the duration of the request in the ContextVar `ctx_trace_id`.
-class TraceIdMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
+# It is plain ASGI middleware, so the request runs in the task and context of
+# the server rather than in a task of its own.
+class TraceIdMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
         req_trace_id = request.headers.get(config.tracing_header, None)
         if req_trace_id:
             ctx_trace_id.set(req_trace_id)
 
         ctx_request.set({"url": str(request.url), "method": request.method})
 
-        response = await call_next(request)
-        ctx_response.set({"status_code": response.status_code})
-        return response
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start":
+                ctx_response.set({"status_code": message["status"]})
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -1,9 +1,44 @@
 from typing import Optional
 
-from pydantic import HttpUrl
+from pydantic import BaseModel, Field, HttpUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+class LLMProfile(BaseModel):
+    """Model and generation parameters for one workflow node's LLM calls."""
+
+    model_id: Optional[str] = None  # Defaults to bedrock_model_id
+    max_tokens: int = 4000
+    temperature: float = 0
+    timeout: Optional[float] = None  # Read timeout, defaults to bedrock_read_timeout
+    # On-demand prices in USD, used for cost accounting only
+    input_cost_per_1k_tokens: float = 0.003
+    output_cost_per_1k_tokens: float = 0.015
+
+
+class BedrockEndpoint(BaseModel):
+    """A Bedrock region (and optionally model id) calls can be routed to."""
+
+    region: str
+    model_id: Optional[str] = None  # e.g. a region-specific inference profile
+    weight: float = 1
+
+    @property
+    def name(self) -> str:
+        return f"{self.region}/{self.model_id}" if self.model_id else self.region
+
+
+def default_llm_profiles() -> dict[str, LLMProfile]:
+    return {
+        "default": LLMProfile(),
+        "remove_pii": LLMProfile(),
+        # YES/NO verdict with a short issue list
+        "validate_pii": LLMProfile(max_tokens=300, timeout=60),
+        "affinity_mapping": LLMProfile(),
+        "findings_section": LLMProfile(),
+    }
+
+
 class AppConfig(BaseSettings):
     model_config = SettingsConfigDict()
     port: int = 8085
@@ -12,7 +47,27 @@ class AppConfig(BaseSettings):
     mongo_truststore: str = "TRUSTSTORE_CDP_ROOT_CA"
     http_proxy: Optional[HttpUrl] = None
     enable_metrics: bool = False
+    metrics_flush_interval_seconds: float = 60
+    metrics_prometheus_enabled: bool = False
+
+    # Event loop lag sampling and blocking call detection. The readiness
+    # check fails while the mean lag reaches loop_saturation_lag_ms.
+    loop_monitor_enabled: bool = True
+    loop_monitor_interval_seconds: float = 0.5
+    loop_block_threshold_ms: float = 250
+    loop_saturation_lag_ms: float = 500
+
+    # Sampling profiler for single requests and workflow runs, only available
+    # with an admin token sent in the x-profile-token header
+    profiling_admin_token: Optional[str] = None
+    profiling_interval_ms: float = 10
+
+    # Negotiated zstd/gzip compression of research analysis responses
+    compression_enabled: bool = True
+    compression_minimum_size: int = 1024
     tracing_header: str = "x-cdp-request-id"
+    # Finished spans buffered until their analysis node stores them
+    span_buffer_max_spans: int = 10_000
 
     # S3 Configuration
     s3_bucket_name: str = "research-analysis-bucket"
@@ -24,6 +79,104 @@ class AppConfig(BaseSettings):
     # AWS Bedrock Configuration
     bedrock_model_id: str = "anthropic.claude-3-5-sonnet-20240620-v1:0"
     bedrock_region: str = "eu-central-1"
+    bedrock_endpoint_url: Optional[str] = None
+    bedrock_max_connections: int = 64
+    bedrock_executor_workers: int = 64
+    bedrock_read_timeout: float = 300
+
+    # Weighted endpoints to balance calls over, e.g. BEDROCK_ENDPOINTS=
+    # '[{"region": "eu-central-1", "weight": 3}, {"region": "eu-west-1"}]'.
+    # Defaults to bedrock_region only.
+    bedrock_endpoints: list[BedrockEndpoint] = Field(default_factory=list)
+    bedrock_endpoint_failure_threshold: int = 3
+    bedrock_endpoint_cooldown_seconds: float = 30
+
+    # Per-node LLM profiles, e.g. LLM_PROFILES='{"validate_pii": {"model_id":
+    # "anthropic.claude-3-haiku-20240307-v1:0", "max_tokens": 300}}'.
+    # Nodes without a profile use "default".
+    llm_profiles: dict[str, LLMProfile] = Field(default_factory=default_llm_profiles)
+
+    # Circuit breaker around Bedrock: opens on a high error or slow-call rate
+    # over the last calls; workflows wait (up to max wait) while it is open
+    llm_circuit_breaker_enabled: bool = True
+    llm_circuit_window: int = 20
+    llm_circuit_min_calls: int = 10
+    llm_circuit_failure_rate: float = 0.5
+    llm_circuit_slow_call_seconds: float = 120
+    llm_circuit_slow_call_rate: float = 0.8
+    llm_circuit_open_seconds: float = 30
+    llm_circuit_half_open_calls: int = 3
+    llm_circuit_max_wait_seconds: float = 900
+
+    # Fair-share scheduling of Bedrock calls between analyses. Analyses with
+    # at most llm_priority_max_transcripts transcripts use the priority lane,
+    # which multiplies their fair-share weight by llm_priority_weight.
+    llm_scheduler_enabled: bool = True
+    llm_max_concurrent_calls: int = 64
+    llm_priority_max_transcripts: int = 3
+    llm_priority_weight: float = 4
+
+    # How often running workflows check for cancellation made on other replicas
+    workflow_cancel_poll_seconds: float = 5
+
+    # Time limits of workflow nodes and of the whole workflow. Node timeouts
+    # are keyed by node name; findings section branches use "findings_section".
+    node_timeouts: dict[str, float] = Field(
+        default_factory=lambda: {
+            "transcript_loader": 300,
+            "findings_section": 1800,
+            "findings_report": 60,
+        }
+    )
+    node_default_timeout_seconds: float = 3600
+    workflow_deadline_seconds: float = 4 * 60 * 60
+
+    # Hedged LLM requests: duplicate non-streaming calls slower than the given
+    # latency percentile, adding at most budget_ratio extra calls
+    llm_hedging_enabled: bool = False
+    llm_hedging_percentile: float = 95
+    llm_hedging_min_samples: int = 20
+    llm_hedging_window: int = 200
+    llm_hedging_budget_ratio: float = 0.1
+
+    # Batch small transcripts into shared PII removal calls. The budget covers
+    # the input transcripts; the redacted output is of similar size and has to
+    # fit the output token limit too.
+    pii_batch_enabled: bool = True
+    pii_batch_token_budget: int = 3000
+    pii_batch_small_transcript_tokens: int = 1000
+
+    # Start affinity mapping while PII validation is still running
+    speculative_affinity_mapping: bool = True
+
+    # Streaming generation with throttled progress writes
+    llm_streaming_enabled: bool = True
+    llm_stream_flush_chunks: int = 50
+    llm_stream_flush_interval_ms: int = 1000
+
+    # LLM response cache (Bedrock calls are deterministic at temperature 0)
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 7 * 24 * 60 * 60
+    llm_cache_max_bytes: int = 500_000_000
+    llm_cache_evict_every: int = 100
+    llm_cache_memory_max_entries: int = 256
+    llm_cache_memory_max_bytes: int = 50_000_000
+
+    # Local PII pre-pass (regex/checksum detection before the LLM)
+    pii_prepass_enabled: bool = True
+    pii_prepass_pool_min_bytes: int = 5_000_000
+    pii_prepass_max_workers: Optional[int] = None
+
+    def get_llm_profile(self, name: str) -> LLMProfile:
+        """Get the LLM profile for a node, falling back to the default profile."""
+        profile = self.llm_profiles.get(name) or self.llm_profiles.get("default")
+        return profile or LLMProfile()
+
+    def get_node_timeout(self, name: str) -> float:
+        """Get the timeout of a workflow node, falling back to the default."""
+        if name.startswith("findings_") and name not in self.node_timeouts:
+            name = "findings_section"
+        return self.node_timeouts.get(name, self.node_default_timeout_seconds)
 
 
 config = AppConfig()
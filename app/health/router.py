@@ -1,4 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from app.common.loop_monitor import get_loop_monitor
 
 router = APIRouter()
 
@@ -7,3 +10,18 @@ router = APIRouter()
 @router.get("/health")
 async def health():
     return {"status": "ok"}
+
+
+# Readiness for load balancers: fails while the event loop is saturated
+@router.get("/health/ready")
+async def ready():
+    monitor = get_loop_monitor()
+    if monitor.saturated:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "status": "saturated",
+                "loop_lag_ms": round(monitor.mean_lag * 1000),
+            },
+        )
+    return {"status": "ok"}
@@ -1,12 +1,28 @@
+import asyncio
+import contextlib
 from contextlib import asynccontextmanager
 from logging import getLogger
 
 from fastapi import FastAPI
 
+from app.common.compression import CompressionMiddleware
 from app.common.errors import ErrorHandlerMiddleware
+from app.common.loop_monitor import get_loop_monitor
+from app.common.metrics import start_metrics_flusher
 from app.common.mongo import get_mongo_client
+from app.common.profiling import ProfilingMiddleware
 from app.common.tracing import TraceIdMiddleware
+from app.config import config
 from app.health.router import router as health_router
+from app.metrics.router import router as metrics_router
+from app.profiling.router import router as profiling_router
+from app.research_analysis.llm.endpoints import get_endpoint_pool
+from app.research_analysis.llm.response_cache import get_response_cache
+from app.research_analysis.llm.transport import get_bedrock_transport
+from app.research_analysis.pii.detector import (
+    shutdown_process_pool,
+    start_process_pool,
+)
 from app.research_analysis.repository import ResearchAnalysisRepository
 from app.research_analysis.router import router as research_analysis_router
 
@@ -25,9 +41,35 @@ async def lifespan(_: FastAPI):
     db = await get_db(client)
     repository = ResearchAnalysisRepository(db)
     await repository.ensure_indexes()
+    await get_response_cache().init_collection(db)
+
+    # Size and warm the Bedrock connection pool and executor
+    transport = get_bedrock_transport()
+    transport.start()
+    for state in get_endpoint_pool().endpoints:
+        transport.warm(state.endpoint.region)
+
+    # Create the PII pre-pass process pool while no request is running
+    if config.pii_prepass_enabled:
+        start_process_pool()
+
+    # Flush metrics aggregated in memory in the background
+    flusher = start_metrics_flusher() if config.enable_metrics else None
+
+    # Watch for event loop lag and blocking calls, see /health/ready
+    if config.loop_monitor_enabled:
+        get_loop_monitor().start()
 
     yield
     # Shutdown
+    if config.loop_monitor_enabled:
+        await get_loop_monitor().stop()
+    if flusher:
+        flusher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await flusher
+    transport.close()
+    shutdown_process_pool()
     if client:
         await client.close()
         logger.info("MongoDB client closed")
@@ -41,9 +83,21 @@ app = FastAPI(
 )
 
 # Setup middleware
+if config.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        path_prefix=research_analysis_router.prefix,
+        minimum_size=config.compression_minimum_size,
+    )
 app.add_middleware(ErrorHandlerMiddleware)
 app.add_middleware(TraceIdMiddleware)
+if config.profiling_admin_token:
+    app.add_middleware(ProfilingMiddleware)
 
 # Setup Routes
 app.include_router(health_router)
 app.include_router(research_analysis_router)
+if config.metrics_prometheus_enabled:
+    app.include_router(metrics_router)
+if config.profiling_admin_token:
+    app.include_router(profiling_router)
@@ -0,0 +1,17 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.common.metrics import get_metrics_registry
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# Scraped by Prometheus when METRICS_PROMETHEUS_ENABLED is set
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(
+        get_metrics_registry().render_prometheus(),
+        media_type=PROMETHEUS_CONTENT_TYPE,
+    )
@@ -0,0 +1,28 @@
+import asyncio
+
+from fastapi import APIRouter, Depends, Path
+
+from app.common.profiling import (
+    load_profile,
+    profile_response,
+    request_profile_key,
+    require_profiling_admin,
+)
+
+router = APIRouter(
+    prefix="/admin/profiles",
+    tags=["admin"],
+    dependencies=[Depends(require_profiling_admin)],
+)
+
+
+@router.get("/{profile_id}")
+async def get_request_profile(profile_id: str = Path(pattern="^[0-9a-f]{32}$")):
+    """
+    Retrieve Request Profile
+
+    Get the profile of a request sent with the `x-profile: request` header, in
+    the folded stack format read by flamegraph tools.
+    """
+    profile = await asyncio.to_thread(load_profile, request_profile_key(profile_id))
+    return profile_response(profile, f"request-{profile_id}.folded")
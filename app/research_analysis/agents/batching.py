@@ -0,0 +1,99 @@
+"""Packing of small transcripts into shared LLM requests."""
+
+import re
+from logging import getLogger
+
+logger = getLogger(__name__)
+
+# Rough English average; only used to decide what fits into a request
+CHARS_PER_TOKEN = 4
+
+# A cleaned transcript shorter than this fraction of its input is treated as
+# truncated or mangled rather than redacted
+MIN_CLEANED_LENGTH_RATIO = 0.3
+
+_SECTION_RE = re.compile(
+    r"<<<TRANSCRIPT (\d+)>>>\s*\n(.*?)\n?\s*<<<END TRANSCRIPT \1>>>", re.DOTALL
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a text without calling a tokenizer."""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def pack_transcripts(
+    transcripts: list[str], token_budget: int, small_transcript_tokens: int
+) -> list[list[int]]:
+    """
+    Bin-pack small transcripts into batches that fit a token budget.
+
+    Transcripts above small_transcript_tokens are always sent on their own.
+    Small ones are packed first-fit decreasing, which keeps the number of
+    requests close to the minimum.
+
+    Args:
+        transcripts: Transcript texts
+        token_budget: Maximum estimated tokens per batch
+        small_transcript_tokens: Largest transcript eligible for batching
+
+    Returns:
+        Batches of transcript indices, each batch sorted by index
+    """
+    sizes = [estimate_tokens(transcript) for transcript in transcripts]
+    limit = min(small_transcript_tokens, token_budget)
+
+    batches = [[i] for i, size in enumerate(sizes) if size > limit]
+    bins: list[tuple[int, list[int]]] = []
+    small = sorted(
+        (i for i, size in enumerate(sizes) if size <= limit), key=lambda i: -sizes[i]
+    )
+    for i in small:
+        for b, (used, members) in enumerate(bins):
+            if used + sizes[i] <= token_budget:
+                bins[b] = (used + sizes[i], [*members, i])
+                break
+        else:
+            bins.append((sizes[i], [i]))
+
+    batches.extend(sorted(members) for _, members in bins)
+    batches.sort(key=lambda batch: batch[0])
+    return batches
+
+
+def split_batched_response(response: str, originals: list[str]) -> list[str]:
+    """
+    Split a batched LLM response back into one text per transcript.
+
+    Args:
+        response: Raw response containing delimited transcripts
+        originals: Transcripts that were sent, in batch order
+
+    Returns:
+        Cleaned transcripts in batch order
+
+    Raises:
+        ValueError: If any transcript is missing, duplicated or truncated
+    """
+    sections: dict[int, str] = {}
+    for match in _SECTION_RE.finditer(response):
+        number = int(match.group(1))
+        if number in sections:
+            msg = f"Transcript {number} appears more than once in batched response"
+            raise ValueError(msg)
+        sections[number] = match.group(2).strip()
+
+    expected = set(range(1, len(originals) + 1))
+    if set(sections) != expected:
+        msg = (
+            f"Batched response contained transcripts {sorted(sections)}, "
+            f"expected {sorted(expected)}"
+        )
+        raise ValueError(msg)
+
+    cleaned = [sections[number] for number in sorted(expected)]
+    for number, (text, original) in enumerate(zip(cleaned, originals), start=1):
+        if len(text) < len(original.strip()) * MIN_CLEANED_LENGTH_RATIO:
+            msg = f"Transcript {number} in batched response looks truncated"
+            raise ValueError(msg)
+    return cleaned
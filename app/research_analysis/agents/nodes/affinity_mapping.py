@@ -1,13 +1,17 @@
 """Affinity mapping node for LangGraph workflow."""
 
+import asyncio
 from logging import getLogger
+from typing import Optional
 
+from app.common.log_utils import StateSummary
+from app.research_analysis.agents.progress import create_progress_writer
 from app.research_analysis.agents.prompts.affinity_mapping import (
     AFFINITY_MAPPING_SYSTEM_PROMPT,
     create_affinity_mapping_prompt,
 )
 from app.research_analysis.agents.state import WorkflowState
-from app.research_analysis.llm.bedrock_client import chat_with_bedrock
+from app.research_analysis.llm.bedrock_client import stream_chat_with_bedrock
 from app.research_analysis.models import AgentStatus
 from app.research_analysis.repository import ResearchAnalysisRepository
 
@@ -15,7 +19,9 @@ logger = getLogger(__name__)
 
 
 async def affinity_mapping_node(
-    state: WorkflowState, _repository: ResearchAnalysisRepository
+    state: WorkflowState,
+    repository: ResearchAnalysisRepository,
+    progress_gate: Optional[asyncio.Event] = None,
 ) -> WorkflowState:
     """
     Generate affinity map from cleaned transcripts using Bedrock.
@@ -23,19 +29,13 @@ async def affinity_mapping_node(
     Args:
         state: Current workflow state
         repository: Repository for data access
+        progress_gate: If given, partial output is only persisted once it is set
 
     Returns:
         Updated state with affinity map
     """
     logger.info("Starting affinity mapping for analysis %s", state["analysis_id"])
-    logger.debug(
-        "Input state: %s",
-        {
-            k: v
-            for k, v in state.items()
-            if k != "transcripts" and k != "transcripts_pii_cleaned"
-        },
-    )
+    logger.debug("Input state: %s", StateSummary(state))
 
     try:
         cleaned_transcripts = state.get("transcripts_pii_cleaned", [])
@@ -50,8 +50,22 @@ async def affinity_mapping_node(
 
         # Generate affinity map using Bedrock
         user_prompt = create_affinity_mapping_prompt(cleaned_transcripts)
-        affinity_map = await chat_with_bedrock(
-            AFFINITY_MAPPING_SYSTEM_PROMPT, user_prompt
+        write_progress = create_progress_writer(
+            repository,
+            state["analysis_id"],
+            "affinity_map",
+            AgentStatus.GENERATING_AFFINITY_MAP,
+        )
+
+        async def on_progress(partial: str) -> None:
+            if progress_gate is None or progress_gate.is_set():
+                await write_progress(partial)
+
+        affinity_map = await stream_chat_with_bedrock(
+            AFFINITY_MAPPING_SYSTEM_PROMPT,
+            user_prompt,
+            on_progress=on_progress,
+            profile="affinity_mapping",
         )
 
         logger.info(
@@ -65,14 +79,7 @@ async def affinity_mapping_node(
             "affinity_map": affinity_map,
             "status": AgentStatus.GENERATING_AFFINITY_MAP,
         }
-        logger.debug(
-            "Output state: %s",
-            {
-                k: v
-                for k, v in updated_state.items()
-                if k != "transcripts" and k != "transcripts_pii_cleaned"
-            },
-        )
+        logger.debug("Output state: %s", StateSummary(updated_state))
         return updated_state
 
     except Exception as e:
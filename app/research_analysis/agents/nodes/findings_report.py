@@ -1,101 +1,147 @@
-"""Findings report node for LangGraph workflow."""
+"""Findings report nodes for LangGraph workflow.
+
+The report is generated as one parallel branch per section, all grounded on
+the affinity map, and joined locally by ``assemble_findings_node``.
+"""
 
 from logging import getLogger
 
+from app.research_analysis.agents.progress import create_progress_writer
 from app.research_analysis.agents.prompts.findings_report import (
-    FINDINGS_REPORT_SYSTEM_PROMPT,
+    FINDINGS_SECTIONS,
     create_findings_report_prompt,
+    create_findings_section_system_prompt,
 )
 from app.research_analysis.agents.state import WorkflowState
-from app.research_analysis.llm.bedrock_client import chat_with_bedrock
+from app.research_analysis.llm.bedrock_client import stream_chat_with_bedrock
 from app.research_analysis.models import AgentStatus
 from app.research_analysis.repository import ResearchAnalysisRepository
 
 logger = getLogger(__name__)
 
 
-async def findings_report_node(
-    state: WorkflowState, _repository: ResearchAnalysisRepository
-) -> WorkflowState:
+async def findings_section_node(
+    state: WorkflowState, repository: ResearchAnalysisRepository, section: str
+) -> dict:
     """
-    Generate findings report from affinity map and transcripts using Bedrock.
+    Generate one findings report section using Bedrock.
+
+    Section nodes run in parallel, so they return only their own section (or
+    error) as a partial state update rather than the full state.
 
     Args:
         state: Current workflow state
         repository: Repository for data access
+        section: Key of the section in FINDINGS_SECTIONS
 
     Returns:
-        Updated state with findings report
+        Partial state update with the generated section
     """
     logger.info(
-        "Starting findings report generation for analysis %s", state["analysis_id"]
-    )
-    logger.debug(
-        "Input state: %s",
-        {
-            k: v
-            for k, v in state.items()
-            if k != "transcripts" and k != "transcripts_pii_cleaned"
-        },
+        "Starting findings section %s for analysis %s", section, state["analysis_id"]
     )
 
     try:
         affinity_map = state.get("affinity_map")
-        cleaned_transcripts = state.get("transcripts_pii_cleaned", [])
 
         if not affinity_map:
             error_msg = "No affinity map available for findings report generation"
             logger.error(error_msg)
-            return {
-                **state,
-                "status": AgentStatus.FAILED,
-                "error_message": error_msg,
-            }
-
-        if not cleaned_transcripts:
-            error_msg = (
-                "No cleaned transcripts available for findings report generation"
-            )
-            logger.error(error_msg)
-            return {
-                **state,
-                "status": AgentStatus.FAILED,
-                "error_message": error_msg,
-            }
-
-        # Generate findings report using Bedrock
-        user_prompt = create_findings_report_prompt(affinity_map, cleaned_transcripts)
-        findings_report = await chat_with_bedrock(
-            FINDINGS_REPORT_SYSTEM_PROMPT, user_prompt
+            return {"findings_section_errors": {section: error_msg}}
+
+        # Generate the section using Bedrock with its own token budget
+        user_prompt = create_findings_report_prompt(affinity_map)
+        write_progress = create_progress_writer(
+            repository,
+            state["analysis_id"],
+            f"findings_sections.{section}",
+            AgentStatus.GENERATING_FINDINGS,
+        )
+        section_text = await stream_chat_with_bedrock(
+            create_findings_section_system_prompt(section),
+            user_prompt,
+            on_progress=write_progress,
+            profile="findings_section",
         )
+        await write_progress(section_text)
 
         logger.info(
-            "Generated findings report for analysis %s, length: %d",
+            "Generated findings section %s for analysis %s, length: %d",
+            section,
             state["analysis_id"],
-            len(findings_report),
+            len(section_text),
         )
+        return {"findings_sections": {section: section_text}}
+
+    except Exception as e:
+        error_msg = str(e)
+        logger.error("Failed to generate findings section %s: %s", section, error_msg)
+        return {"findings_section_errors": {section: error_msg}}
+
+
+def _with_heading(section: str, text: str) -> str:
+    """Ensure a generated section starts with its markdown heading."""
+    title, _ = FINDINGS_SECTIONS[section]
+    text = text.strip()
+    if text.lstrip("# ").lower().startswith(title.lower()):
+        return text
+    return f"## {title}\n\n{text}"
+
+
+async def findings_report_node(
+    state: WorkflowState, _repository: ResearchAnalysisRepository
+) -> WorkflowState:
+    """
+    Assemble the findings report from the generated sections.
 
-        updated_state = {
+    Args:
+        state: Current workflow state
+        repository: Repository for data access
+
+    Returns:
+        Updated state with findings report
+    """
+    logger.info("Assembling findings report for analysis %s", state["analysis_id"])
+
+    section_errors = state.get("findings_section_errors") or {}
+    if section_errors:
+        details = "; ".join(
+            f"{FINDINGS_SECTIONS[section][0]}: {error}"
+            for section, error in section_errors.items()
+        )
+        error_msg = f"Failed to generate findings report: {details}"
+        logger.error(error_msg)
+        # Section branches cannot set the status themselves, so a timed out
+        # section is reported here
+        timed_out = state.get("timed_out_nodes") or {}
+        return {
             **state,
-            "findings_report": findings_report,
-            "status": AgentStatus.FINISHED,
+            "status": AgentStatus.TIMED_OUT if timed_out else AgentStatus.FAILED,
+            "error_message": error_msg,
         }
-        logger.debug(
-            "Output state: %s",
-            {
-                k: v
-                for k, v in updated_state.items()
-                if k != "transcripts" and k != "transcripts_pii_cleaned"
-            },
-        )
-        return updated_state
 
-    except Exception as e:
-        error_msg = f"Failed to generate findings report: {str(e)}"
+    sections = state.get("findings_sections") or {}
+    missing = [section for section in FINDINGS_SECTIONS if not sections.get(section)]
+    if missing:
+        error_msg = f"Findings report sections missing: {', '.join(missing)}"
         logger.error(error_msg)
-
         return {
             **state,
             "status": AgentStatus.FAILED,
             "error_message": error_msg,
         }
+
+    findings_report = "\n\n".join(
+        _with_heading(section, sections[section]) for section in FINDINGS_SECTIONS
+    )
+    logger.info(
+        "Assembled findings report for analysis %s, length: %d",
+        state["analysis_id"],
+        len(findings_report),
+    )
+
+    return {
+        **state,
+        "findings_report": findings_report,
+        "status": AgentStatus.FINISHED,
+    }
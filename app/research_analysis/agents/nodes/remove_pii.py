@@ -3,18 +3,73 @@
 import asyncio
 from logging import getLogger
 
+from app.common.log_utils import StateSummary
+from app.config import config
+from app.research_analysis.agents.batching import (
+    pack_transcripts,
+    split_batched_response,
+)
 from app.research_analysis.agents.prompts.pii_removal import (
+    BATCHED_PII_REMOVAL_SYSTEM_PROMPT,
     PII_REMOVAL_SYSTEM_PROMPT,
+    create_batched_pii_removal_prompt,
     create_pii_removal_prompt,
 )
 from app.research_analysis.agents.state import WorkflowState
 from app.research_analysis.llm.bedrock_client import chat_with_bedrock
 from app.research_analysis.models import AgentStatus
+from app.research_analysis.pii.detector import redact_transcripts, summarise_counts
 from app.research_analysis.repository import ResearchAnalysisRepository
 
 logger = getLogger(__name__)
 
 
+async def _clean_transcript(transcript: str) -> str:
+    """Remove PII from a single transcript with Bedrock."""
+    try:
+        user_prompt = create_pii_removal_prompt(transcript)
+        cleaned = await chat_with_bedrock(
+            PII_REMOVAL_SYSTEM_PROMPT, user_prompt, profile="remove_pii"
+        )
+        logger.debug(
+            "Cleaned transcript, original length: %d, cleaned length: %d",
+            len(transcript),
+            len(cleaned),
+        )
+        return cleaned
+    except Exception as e:
+        logger.error("Failed to clean transcript: %s", e)
+        raise
+
+
+async def _clean_batch(transcripts: list[str]) -> list[str]:
+    """
+    Remove PII from several small transcripts in a single Bedrock call.
+
+    Falls back to one call per transcript if the batched response cannot be
+    split back reliably.
+    """
+    if len(transcripts) == 1:
+        return [await _clean_transcript(transcripts[0])]
+
+    user_prompt = create_batched_pii_removal_prompt(transcripts)
+    response = await chat_with_bedrock(
+        BATCHED_PII_REMOVAL_SYSTEM_PROMPT, user_prompt, profile="remove_pii"
+    )
+    try:
+        cleaned = split_batched_response(response, transcripts)
+        logger.debug("Cleaned batch of %d transcripts in one call", len(transcripts))
+        return cleaned
+    except ValueError as e:
+        logger.warning(
+            "Batched PII removal response failed integrity check, "
+            "retrying %d transcripts individually: %s",
+            len(transcripts),
+            e,
+        )
+        return list(await asyncio.gather(*[_clean_transcript(t) for t in transcripts]))
+
+
 async def remove_pii_node(
     state: WorkflowState, _repository: ResearchAnalysisRepository
 ) -> WorkflowState:
@@ -29,14 +84,7 @@ async def remove_pii_node(
         Updated state with PII-cleaned transcripts
     """
     logger.info("Starting PII removal for analysis %s", state["analysis_id"])
-    logger.debug(
-        "Input state: %s",
-        {
-            k: v
-            for k, v in state.items()
-            if k != "transcripts" and k != "transcripts_pii_cleaned"
-        },
-    )
+    logger.debug("Input state: %s", StateSummary(state))
 
     try:
         transcripts = state.get("transcripts", [])
@@ -49,31 +97,42 @@ async def remove_pii_node(
                 "error_message": error_msg,
             }
 
-        # Process each transcript with Bedrock concurrently
-        async def clean_transcript(transcript: str) -> str:
-            try:
-                user_prompt = create_pii_removal_prompt(transcript)
-                cleaned = await chat_with_bedrock(
-                    PII_REMOVAL_SYSTEM_PROMPT, user_prompt
-                )
-                logger.debug(
-                    "Cleaned transcript, original length: %d, cleaned length: %d",
-                    len(transcript),
-                    len(cleaned),
-                )
-                return cleaned
-            except Exception as e:
-                logger.error("Failed to clean transcript: %s", e)
-                raise
-
-        # Clean all transcripts concurrently
-        cleaned_transcripts = await asyncio.gather(
-            *[clean_transcript(transcript) for transcript in transcripts]
+        # Replace structured PII locally so the LLM only has to handle the rest
+        if config.pii_prepass_enabled:
+            prepass_results = await asyncio.to_thread(redact_transcripts, transcripts)
+            transcripts = [result.text for result in prepass_results]
+            for i, result in enumerate(prepass_results):
+                if result.counts:
+                    logger.info(
+                        "Local PII pre-pass redacted transcript %d for analysis %s: %s",
+                        i + 1,
+                        state["analysis_id"],
+                        summarise_counts(result.counts),
+                    )
+
+        # Pack small transcripts together to save per-call overhead
+        if config.pii_batch_enabled:
+            batches = pack_transcripts(
+                transcripts,
+                config.pii_batch_token_budget,
+                config.pii_batch_small_transcript_tokens,
+            )
+        else:
+            batches = [[i] for i in range(len(transcripts))]
+
+        # Clean all batches concurrently
+        batch_results = await asyncio.gather(
+            *[_clean_batch([transcripts[i] for i in batch]) for batch in batches]
         )
+        cleaned_transcripts = [""] * len(transcripts)
+        for batch, cleaned_batch in zip(batches, batch_results):
+            for i, cleaned in zip(batch, cleaned_batch):
+                cleaned_transcripts[i] = cleaned
 
         logger.info(
-            "Cleaned %d transcripts for analysis %s",
+            "Cleaned %d transcripts in %d calls for analysis %s",
             len(cleaned_transcripts),
+            len(batches),
             state["analysis_id"],
         )
 
@@ -82,14 +141,7 @@ async def remove_pii_node(
             "transcripts_pii_cleaned": cleaned_transcripts,
             "status": AgentStatus.REMOVING_PII,
         }
-        logger.debug(
-            "Output state: %s",
-            {
-                k: v
-                for k, v in updated_state.items()
-                if k != "transcripts" and k != "transcripts_pii_cleaned"
-            },
-        )
+        logger.debug("Output state: %s", StateSummary(updated_state))
         return updated_state
 
     except Exception as e:
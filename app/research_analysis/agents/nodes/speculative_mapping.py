@@ -0,0 +1,93 @@
+"""Speculative affinity mapping node for LangGraph workflow."""
+
+import asyncio
+import contextlib
+import time
+from logging import getLogger
+from typing import Optional
+
+from app.research_analysis.agents.nodes.affinity_mapping import affinity_mapping_node
+from app.research_analysis.agents.nodes.validate_pii import validate_pii_node
+from app.research_analysis.agents.state import WorkflowState
+from app.research_analysis.llm.bedrock_client import store_deferred_responses
+from app.research_analysis.llm.context import ctx_llm_cache_deferred
+from app.research_analysis.models import AgentStatus
+from app.research_analysis.repository import ResearchAnalysisRepository
+
+logger = getLogger(__name__)
+
+
+async def validate_pii_and_map_node(
+    state: WorkflowState, repository: ResearchAnalysisRepository
+) -> WorkflowState:
+    """
+    Validate PII removal while optimistically generating the affinity map.
+
+    PII validation almost always passes, so affinity mapping is started on the
+    cleaned transcripts at the same time. The speculative affinity map is only
+    committed (and its partial output and cached response only stored) once
+    validation passes. If validation fails the in-flight mapping call is
+    cancelled and discarded.
+
+    Args:
+        state: Current workflow state
+        repository: Repository for data access
+
+    Returns:
+        Updated state with affinity map, or the failed validation state
+    """
+    logger.info(
+        "Starting PII validation with speculative affinity mapping for analysis %s",
+        state["analysis_id"],
+    )
+    start = time.monotonic()
+    validated = asyncio.Event()
+    mapping_duration = 0.0
+    # Responses of transcripts that fail validation must not reach the cache
+    deferred_responses: list[tuple[str, str, Optional[str]]] = []
+
+    async def speculative_mapping() -> WorkflowState:
+        nonlocal mapping_duration
+        # Set within the mapping task only, which runs in a copied context
+        ctx_llm_cache_deferred.set(deferred_responses)
+        try:
+            return await affinity_mapping_node(
+                state, repository, progress_gate=validated
+            )
+        finally:
+            mapping_duration = time.monotonic() - start
+
+    mapping_task = asyncio.create_task(speculative_mapping())
+    try:
+        validated_state = await validate_pii_node(state, repository)
+        validation_duration = time.monotonic() - start
+
+        if validated_state.get("status") == AgentStatus.FAILED:
+            logger.info(
+                "Discarding speculative affinity map for analysis %s",
+                state["analysis_id"],
+            )
+            return validated_state
+
+        validated.set()
+        mapped_state = await mapping_task
+        await store_deferred_responses(deferred_responses)
+    finally:
+        if not mapping_task.done():
+            mapping_task.cancel()
+        # Also retrieves the error of a discarded mapping that failed first
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await mapping_task
+
+    elapsed = time.monotonic() - start
+    saving = validation_duration + mapping_duration - elapsed
+    logger.info(
+        "Speculative affinity mapping for analysis %s saved %.2fs "
+        "(validation %.2fs, mapping %.2fs, wall clock %.2fs)",
+        state["analysis_id"],
+        saving,
+        validation_duration,
+        mapping_duration,
+        elapsed,
+    )
+    return {**mapped_state, "speculative_saving_seconds": round(saving, 3)}
@@ -3,7 +3,9 @@
 import asyncio
 from logging import getLogger
 
+from app.common.log_utils import StateSummary
 from app.common.s3 import get_file_content, get_s3_client
+from app.common.spans import start_span
 from app.research_analysis.agents.state import WorkflowState
 from app.research_analysis.models import AgentStatus
 from app.research_analysis.repository import ResearchAnalysisRepository
@@ -25,14 +27,7 @@ async def transcript_loader_node(
         Updated state with loaded transcripts
     """
     logger.info("Starting transcript loading for analysis %s", state["analysis_id"])
-    logger.debug(
-        "Input state: %s",
-        {
-            k: v
-            for k, v in state.items()
-            if k != "transcripts" and k != "transcripts_pii_cleaned"
-        },
-    )
+    logger.debug("Input state: %s", StateSummary(state))
 
     try:
         # Get file records for this analysis
@@ -52,7 +47,11 @@ async def transcript_loader_node(
 
         async def load_file_content(file):
             try:
-                content = get_file_content(file.s3_key, s3_client)
+                # Off the event loop, so cancelling the workflow stops waiting
+                with start_span("s3.get_object", **{"s3.key": file.s3_key}):
+                    content = await asyncio.to_thread(
+                        get_file_content, file.s3_key, s3_client
+                    )
                 logger.debug("Loaded file %s, length: %d", file.s3_key, len(content))
                 return content
             except Exception as e:
@@ -73,14 +72,7 @@ async def transcript_loader_node(
             "transcripts": transcripts,
             "status": AgentStatus.LOADING_TRANSCRIPTS,
         }
-        logger.debug(
-            "Output state: %s",
-            {
-                k: v
-                for k, v in updated_state.items()
-                if k != "transcripts" and k != "transcripts_pii_cleaned"
-            },
-        )
+        logger.debug("Output state: %s", StateSummary(updated_state))
         return updated_state
 
     except Exception as e:
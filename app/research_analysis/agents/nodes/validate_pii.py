@@ -4,6 +4,8 @@ import asyncio
 import re
 from logging import getLogger
 
+from app.common.log_utils import StateSummary
+from app.config import config
 from app.research_analysis.agents.prompts.pii_validation import (
     PII_VALIDATION_SYSTEM_PROMPT,
     create_pii_validation_prompt,
@@ -11,6 +13,7 @@ from app.research_analysis.agents.prompts.pii_validation import (
 from app.research_analysis.agents.state import WorkflowState
 from app.research_analysis.llm.bedrock_client import chat_with_bedrock
 from app.research_analysis.models import AgentStatus
+from app.research_analysis.pii.detector import redact_transcripts, summarise_counts
 from app.research_analysis.repository import ResearchAnalysisRepository
 
 logger = getLogger(__name__)
@@ -93,6 +96,45 @@ def parse_pii_validation_response(response: str) -> dict:
     }
 
 
+async def _scan_local_pii(transcripts: list[str]) -> list[dict[str, int]]:
+    """
+    Count the structured PII left in cleaned transcripts.
+
+    The scan is CPU bound, so like the remove_pii pre-pass it runs in a worker
+    thread, or the process pool for large corpora.
+
+    Returns:
+        PII counts per kind for each transcript, empty if the scan is disabled
+    """
+    if not config.pii_prepass_enabled:
+        return [{} for _ in transcripts]
+    results = await asyncio.to_thread(redact_transcripts, transcripts)
+    return [result.counts for result in results]
+
+
+def _local_pii_check(leaks: dict[str, int], transcript_index: int) -> dict | None:
+    """
+    Turn the local structured PII scan of a cleaned transcript into a result.
+
+    Args:
+        leaks: PII counts per kind found by the local scan
+        transcript_index: Position of the transcript in the analysis
+
+    Returns:
+        A failed validation result if PII was found, otherwise None
+    """
+    if not leaks:
+        return None
+
+    # Report counts only, the error message is persisted with the analysis
+    return {
+        "pii_found": True,
+        "issues": f"Local check found {summarise_counts(leaks)}",
+        "confidence": "HIGH",
+        "transcript_index": transcript_index,
+    }
+
+
 async def validate_pii_node(
     state: WorkflowState, _repository: ResearchAnalysisRepository
 ) -> WorkflowState:
@@ -107,14 +149,7 @@ async def validate_pii_node(
         Updated state after PII validation
     """
     logger.info("Starting PII validation for analysis %s", state["analysis_id"])
-    logger.debug(
-        "Input state: %s",
-        {
-            k: v
-            for k, v in state.items()
-            if k != "transcripts" and k != "transcripts_pii_cleaned"
-        },
-    )
+    logger.debug("Input state: %s", StateSummary(state))
 
     try:
         cleaned_transcripts = state.get("transcripts_pii_cleaned", [])
@@ -127,9 +162,18 @@ async def validate_pii_node(
                 "error_message": error_msg,
             }
 
+        local_leaks = await _scan_local_pii(cleaned_transcripts)
+
         # Validate each cleaned transcript with Bedrock concurrently
         async def validate_transcript(transcript: str, transcript_index: int) -> dict:
             try:
+                # Obvious structured leaks fail fast without an LLM round trip
+                local_result = _local_pii_check(
+                    local_leaks[transcript_index], transcript_index
+                )
+                if local_result is not None:
+                    return local_result
+
                 user_prompt = create_pii_validation_prompt(transcript)
                 logger.debug(
                     "PII validation prompt for transcript %d: %s",
@@ -138,7 +182,7 @@ async def validate_pii_node(
                 )
 
                 validation_result = await chat_with_bedrock(
-                    PII_VALIDATION_SYSTEM_PROMPT, user_prompt
+                    PII_VALIDATION_SYSTEM_PROMPT, user_prompt, profile="validate_pii"
                 )
                 logger.debug(
                     "Raw PII validation result for transcript %d: %s",
@@ -208,14 +252,7 @@ async def validate_pii_node(
             **state,
             "status": AgentStatus.VALIDATING_PII,
         }
-        logger.debug(
-            "Output state: %s",
-            {
-                k: v
-                for k, v in updated_state.items()
-                if k != "transcripts" and k != "transcripts_pii_cleaned"
-            },
-        )
+        logger.debug("Output state: %s", StateSummary(updated_state))
         return updated_state
 
     except Exception as e:
@@ -0,0 +1,94 @@
+"""Incremental persistence of partially generated workflow artifacts."""
+
+from collections.abc import Awaitable, Callable
+from logging import getLogger
+from typing import Optional
+
+from app.research_analysis.models import AgentStatus
+from app.research_analysis.repository import ResearchAnalysisRepository
+
+logger = getLogger(__name__)
+
+
+def create_progress_writer(
+    repository: ResearchAnalysisRepository,
+    analysis_id: str,
+    field: str,
+    status: AgentStatus,
+) -> Callable[[str], Awaitable[None]]:
+    """
+    Create a callback that stores partial LLM output on the analysis.
+
+    The final artifact is still written by the node's full state sync; these
+    writes only let clients render progress while generation is under way.
+
+    Args:
+        repository: Repository for database operations
+        analysis_id: ID of the analysis being processed
+        field: Agent state field receiving the partial text
+        status: Agent status to report while generating
+
+    Returns:
+        Coroutine function accepting the partial text
+    """
+
+    async def write_progress(partial: str) -> None:
+        try:
+            await repository.update_agent_state_fields(
+                analysis_id, {field: partial, "status": status}
+            )
+        except Exception as e:
+            # Progress writes are best effort and must not fail generation
+            logger.warning(
+                "Failed to persist partial %s for analysis %s: %s",
+                field,
+                analysis_id,
+                e,
+            )
+
+    return write_progress
+
+
+class PauseReporter:
+    """
+    Report a workflow as waiting while its LLM calls are paused.
+
+    Several calls of one workflow can be paused at once (e.g. the calls of an
+    ``asyncio.gather``); the status is switched to WAITING_FOR_LLM when the
+    first pauses and restored when the last resumes.
+    """
+
+    def __init__(self, repository: ResearchAnalysisRepository, analysis_id: str):
+        self.repository = repository
+        self.analysis_id = analysis_id
+        self._paused_calls = 0
+        self._resume_status: Optional[AgentStatus] = None
+
+    async def paused(self) -> None:
+        self._paused_calls += 1
+        if self._paused_calls > 1:
+            return
+        try:
+            analysis = await self.repository.get_analysis(self.analysis_id)
+            if analysis.agent_state is not None:
+                self._resume_status = analysis.agent_state.status
+            await self.repository.update_agent_state_fields(
+                self.analysis_id, {"status": AgentStatus.WAITING_FOR_LLM}
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to report paused analysis %s: %s", self.analysis_id, e
+            )
+
+    async def resumed(self) -> None:
+        self._paused_calls -= 1
+        if self._paused_calls or self._resume_status is None:
+            return
+        try:
+            await self.repository.update_agent_state_fields(
+                self.analysis_id, {"status": self._resume_status}
+            )
+        except Exception as e:
+            logger.warning(
+                "Failed to report resumed analysis %s: %s", self.analysis_id, e
+            )
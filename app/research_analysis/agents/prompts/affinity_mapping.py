@@ -12,6 +12,9 @@ Format your response as markdown with:
 - ## Cluster headings (descriptive theme names)
 - Bullet points for related insights under each cluster
 - Brief explanations of why insights are grouped together
+- Up to two short verbatim participant quotes per cluster that best support it, as markdown blockquotes
+
+The findings report is written from this affinity map alone, so make sure the clusters and quotes carry the evidence it needs.
 
 Focus on:
 - User needs and pain points
@@ -1,40 +1,61 @@
 """Findings report prompt templates."""
 
-FINDINGS_REPORT_SYSTEM_PROMPT = """You are a senior UX researcher creating a comprehensive findings report. Your task is to synthesize research insights into a structured report with three required sections.
-
-Create a professional research findings report with exactly these sections:
-
-## Key Insights
-- Summarize the most important discoveries from the research
+# Report sections in the order they are assembled. Each section is generated
+# by its own LLM call so that they can run in parallel with separate budgets.
+FINDINGS_SECTIONS = {
+    "key_insights": (
+        "Key Insights",
+        """- Summarize the most important discoveries from the research
 - Focus on user needs, pain points, and behavioral patterns
 - Include quantitative observations where relevant
-- Prioritize insights by impact and frequency
-
-## Recommendations
-- Provide actionable recommendations based on the insights
+- Prioritize insights by impact and frequency""",
+    ),
+    "recommendations": (
+        "Recommendations",
+        """- Provide actionable recommendations based on the insights
 - Prioritize recommendations by feasibility and impact
 - Include specific next steps where possible
-- Connect recommendations directly to user needs identified
-
-## Next Steps
-- Outline concrete actions to take based on the findings
+- Connect recommendations directly to user needs identified""",
+    ),
+    "next_steps": (
+        "Next Steps",
+        """- Outline concrete actions to take based on the findings
 - Include timeline considerations where relevant
 - Suggest additional research if needed
-- Identify stakeholders who should be involved
+- Identify stakeholders who should be involved""",
+    ),
+}
 
-Use clear, professional language appropriate for stakeholders. Support findings with specific examples from the research where helpful.
+FINDINGS_SECTION_SYSTEM_PROMPT = """You are a senior UX researcher creating a comprehensive findings report. Your task is to write one section of a structured report that synthesizes research insights.
 
-Return only the markdown report with no additional commentary."""
+The full report has these sections: {all_sections}. Other researchers are writing the other sections, so write ONLY the "{title}" section:
 
+## {title}
+{guidance}
 
-def create_findings_report_prompt(affinity_map: str, transcripts: list[str]) -> str:
-    """Create findings report prompt using affinity map and transcripts."""
-    combined_transcripts = "\n\n---TRANSCRIPT SEPARATOR---\n\n".join(transcripts)
+Use clear, professional language appropriate for stakeholders. Support findings with the participant quotes in the affinity map where helpful.
 
-    return f"""Please create a comprehensive findings report based on the following affinity map and research transcripts:
+Return only the markdown section, starting with the "## {title}" heading, with no additional commentary."""
 
-## AFFINITY MAP:
-{affinity_map}
 
-## ORIGINAL TRANSCRIPTS:
-{combined_transcripts}"""
+def create_findings_section_system_prompt(section: str) -> str:
+    """Create the system prompt for one findings report section."""
+    title, guidance = FINDINGS_SECTIONS[section]
+    all_sections = ", ".join(title for title, _ in FINDINGS_SECTIONS.values())
+    return FINDINGS_SECTION_SYSTEM_PROMPT.format(
+        all_sections=all_sections, title=title, guidance=guidance
+    )
+
+
+def create_findings_report_prompt(affinity_map: str) -> str:
+    """
+    Create the findings section prompt from the affinity map.
+
+    The transcripts are left out: every section is sent the same prompt, and
+    the affinity map already carries the supporting quotes, so the sections
+    do not each pay for the whole corpus in input tokens.
+    """
+    return f"""Please write your section of the findings report based on the following affinity map, which includes supporting participant quotes:
+
+## AFFINITY MAP:
+{affinity_map}"""
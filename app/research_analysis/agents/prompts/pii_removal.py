@@ -1,6 +1,6 @@
 """PII removal prompt templates."""
 
-PII_REMOVAL_SYSTEM_PROMPT = """You are a redaction engine specialized in removing personally identifiable information (PII) from research interview transcripts.
+_PII_REMOVAL_INSTRUCTIONS = """You are a redaction engine specialized in removing personally identifiable information (PII) from research interview transcripts.
 
 Your task is to remove all personal identifiers while preserving the essential content and insights from the transcript.
 
@@ -26,13 +26,35 @@ Preserve:
 - All insights, opinions, and feedback
 - Product names and features being discussed
 - General demographic information (e.g., "middle-aged professional")
-- Context necessary for understanding user needs
+- Context necessary for understanding user needs"""
+
+PII_REMOVAL_SYSTEM_PROMPT = f"""{_PII_REMOVAL_INSTRUCTIONS}
 
 Return only the cleaned markdown text with no additional commentary."""
 
+# Batched requests are split back on the transcript markers, so the model
+# must echo them rather than return bare markdown
+BATCHED_PII_REMOVAL_SYSTEM_PROMPT = f"""{_PII_REMOVAL_INSTRUCTIONS}
+
+You will receive several transcripts, each wrapped in <<<TRANSCRIPT n>>> and <<<END TRANSCRIPT n>>> markers. Return every cleaned transcript wrapped in the same markers, in the same order, keeping the marker lines exactly as given. Add no commentary and nothing outside the markers."""
+
 
 def create_pii_removal_prompt(transcript: str) -> str:
     """Create PII removal prompt for a transcript."""
     return f"""Please remove all personally identifiable information from the following research transcript while preserving all insights and feedback:
 
 {transcript}"""
+
+
+def create_batched_pii_removal_prompt(transcripts: list[str]) -> str:
+    """Create PII removal prompt for several delimited transcripts."""
+    delimited = "\n\n".join(
+        f"<<<TRANSCRIPT {number}>>>\n{transcript}\n<<<END TRANSCRIPT {number}>>>"
+        for number, transcript in enumerate(transcripts, start=1)
+    )
+
+    return f"""Please remove all personally identifiable information from each of the following {len(transcripts)} research transcripts while preserving all insights and feedback.
+
+Each transcript is wrapped in <<<TRANSCRIPT n>>> and <<<END TRANSCRIPT n>>> markers. Treat every transcript independently and return each cleaned transcript wrapped in the same markers, in the same order, with nothing outside the markers.
+
+{delimited}"""
@@ -1,9 +1,19 @@
 from datetime import datetime
-from typing import Optional, TypedDict
+from typing import Annotated, Optional, TypedDict
 
 from app.research_analysis.models import AgentStatus
 
 
+def merge_dicts(current: Optional[dict], update: Optional[dict]) -> dict:
+    """
+    Reducer merging dict updates from parallel branches by key.
+
+    Sequential nodes return the whole dict, so later values replace earlier
+    ones for the same key rather than accumulating.
+    """
+    return {**(current or {}), **(update or {})}
+
+
 class WorkflowState(TypedDict):
     """LangGraph workflow state definition."""
 
@@ -21,6 +31,19 @@ class WorkflowState(TypedDict):
     affinity_map: Optional[str]
     findings_report: Optional[str]
 
+    # Findings report sections, written by parallel branches
+    findings_sections: Annotated[dict[str, str], merge_dicts]
+    findings_section_errors: Annotated[dict[str, str], merge_dicts]
+
+    # Run statistics
+    speculative_saving_seconds: Optional[float]
+
+    # LLM usage and timings per node, see NodeUsage
+    usage: Annotated[dict[str, dict], merge_dicts]
+
+    # Timeout in seconds of each node that exceeded it
+    timed_out_nodes: Annotated[dict[str, float], merge_dicts]
+
 
 def workflow_state_to_agent_state(state: WorkflowState) -> dict:
     """
@@ -38,6 +61,10 @@ def workflow_state_to_agent_state(state: WorkflowState) -> dict:
         "transcripts_pii_cleaned": state.get("transcripts_pii_cleaned", []),
         "affinity_map": state.get("affinity_map"),
         "findings_report": state.get("findings_report"),
+        "findings_sections": state.get("findings_sections") or {},
         "status": state.get("status"),
         "error_message": state.get("error_message"),
+        "speculative_saving_seconds": state.get("speculative_saving_seconds"),
+        "usage": state.get("usage") or {},
+        "timed_out_nodes": state.get("timed_out_nodes") or {},
     }
@@ -0,0 +1,98 @@
+"""Tests for packing small transcripts into shared PII removal requests."""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.research_analysis.agents.batching import (
+    pack_transcripts,
+    split_batched_response,
+)
+from app.research_analysis.agents.nodes import remove_pii
+from app.research_analysis.agents.prompts.pii_removal import (
+    BATCHED_PII_REMOVAL_SYSTEM_PROMPT,
+    create_batched_pii_removal_prompt,
+)
+
+
+# Test Cases - Packing
+def test_pack_transcripts_small_ones_share_batches():
+    # Given: estimated sizes of 100, 900, 50, 250 and 4000 tokens
+    transcripts = ["a" * 400, "b" * 3600, "c" * 200, "d" * 1000, "e" * 16000]
+
+    # When
+    batches = pack_transcripts(
+        transcripts, token_budget=1000, small_transcript_tokens=500
+    )
+
+    # Then: large transcripts go alone, small ones are packed within budget
+    assert sorted(batches) == [[0, 2, 3], [1], [4]]
+
+
+def test_pack_transcripts_every_index_once():
+    # Given
+    transcripts = ["x" * (40 * n) for n in range(1, 30)]
+
+    # When
+    batches = pack_transcripts(
+        transcripts, token_budget=300, small_transcript_tokens=300
+    )
+
+    # Then
+    assert sorted(i for batch in batches for i in batch) == list(range(29))
+    assert len(batches) < len(transcripts)
+
+
+# Test Cases - Splitting
+def test_split_batched_response_round_trip():
+    # Given: an LLM echoing the delimited prompt with redactions applied
+    originals = ["Hi I am Jo from Leeds", "I drink tea daily"]
+    prompt = create_batched_pii_removal_prompt(originals)
+    response = prompt[prompt.index("<<<TRANSCRIPT 1>>>") :].replace("Jo", "[P1]")
+
+    # When
+    cleaned = split_batched_response(response, originals)
+
+    # Then
+    assert cleaned == ["Hi I am [P1] from Leeds", "I drink tea daily"]
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        "<<<TRANSCRIPT 1>>>\nfirst text\n<<<END TRANSCRIPT 1>>>",
+        (
+            "<<<TRANSCRIPT 1>>>\nfirst text\n<<<END TRANSCRIPT 1>>>\n"
+            "<<<TRANSCRIPT 2>>>\nx\n<<<END TRANSCRIPT 2>>>"
+        ),
+    ],
+)
+def test_split_batched_response_missing_or_truncated_raises(response):
+    # Given
+    originals = ["first text", "second transcript text"]
+
+    # When / Then
+    with pytest.raises(ValueError, match="Transcript|transcripts"):
+        split_batched_response(response, originals)
+
+
+# Test Cases - Prompts
+@pytest.mark.asyncio
+async def test_batched_call_asks_for_the_transcript_markers():
+    # Given: a model echoing the markers, as the batch system prompt requires
+    originals = ["Hi I am Jo", "I drink tea daily"]
+    prompts = []
+
+    async def chat(system_prompt, user_prompt, **_):
+        prompts.append(system_prompt)
+        return user_prompt[user_prompt.index("<<<TRANSCRIPT 1>>>") :]
+
+    # When
+    with patch.object(remove_pii, "chat_with_bedrock", chat):
+        cleaned = await remove_pii._clean_batch(originals)
+
+    # Then: one call, whose system prompt does not ask for bare markdown
+    assert cleaned == originals
+    assert prompts == [BATCHED_PII_REMOVAL_SYSTEM_PROMPT]
+    assert "<<<TRANSCRIPT n>>>" in BATCHED_PII_REMOVAL_SYSTEM_PROMPT
+    assert "Return only the cleaned markdown" not in BATCHED_PII_REMOVAL_SYSTEM_PROMPT
@@ -0,0 +1,493 @@
+"""Tests for the research analysis LangGraph workflow with a stubbed LLM."""
+
+import asyncio
+import gc
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from app.common.spans import (
+    InMemorySpanExporter,
+    add_span_exporter,
+    remove_span_exporter,
+    start_span,
+)
+from app.research_analysis import workflow as analysis_workflow
+from app.research_analysis.agents import workflow
+from app.research_analysis.agents.nodes import validate_pii
+from app.research_analysis.agents.prompts.affinity_mapping import (
+    AFFINITY_MAPPING_SYSTEM_PROMPT,
+)
+from app.research_analysis.agents.prompts.findings_report import (
+    FINDINGS_SECTIONS,
+    create_findings_section_system_prompt,
+)
+from app.research_analysis.agents.prompts.pii_validation import (
+    PII_VALIDATION_SYSTEM_PROMPT,
+)
+from app.research_analysis.llm.response_cache import LLMResponseCache
+from app.research_analysis.models import AgentStatus
+from app.research_analysis.pii.detector import redact_transcripts
+
+ANALYSIS_ID = "665f1c2e8f1b2c3d4e5f6a7b"
+STREAM_TICKS = 20
+PII_OK = "PII_FOUND: NO\nISSUES: None\nCONFIDENCE: HIGH"
+PII_LEAK = "PII_FOUND: YES\nISSUES: Real name found\nCONFIDENCE: HIGH"
+USAGE = {"input_tokens": 100, "output_tokens": 10, "total_tokens": 110}
+SECTION_PROMPTS = {
+    create_findings_section_system_prompt(section): section
+    for section in FINDINGS_SECTIONS
+}
+
+
+class StubLLM:
+    """Stub ChatBedrock answering by system prompt, with optional delays."""
+
+    def __init__(
+        self, validation_response=PII_OK, delays=None, failing=(), section_barrier=None
+    ):
+        self.validation_response = validation_response
+        self.delays = delays or {}
+        self.failing = failing
+        self.section_barrier = section_barrier
+        self.cancelled = []
+        self.user_prompts = {}
+        self.stream_closed = threading.Event()
+
+    def _answer(self, system_prompt):
+        if system_prompt == PII_VALIDATION_SYSTEM_PROMPT:
+            return "validation", self.validation_response
+        if system_prompt == AFFINITY_MAPPING_SYSTEM_PROMPT:
+            return "affinity", "# Affinity map"
+        if system_prompt in SECTION_PROMPTS:
+            section = SECTION_PROMPTS[system_prompt]
+            return section, f"## {FINDINGS_SECTIONS[section][0]}\n\n{section} text"
+        return "other", "cleaned transcript"
+
+    def invoke(self, messages):
+        name, answer = self._answer(messages[0].content)
+        time.sleep(self.delays.get(name, 0))
+        return AIMessage(content=answer, usage_metadata=USAGE)
+
+    def stream(self, messages):
+        name, answer = self._answer(messages[0].content)
+        self.user_prompts[name] = messages[1].content
+        if name in self.failing:
+            msg = f"{name} throttled"
+            raise RuntimeError(msg)
+        if self.section_barrier is not None and name in FINDINGS_SECTIONS:
+            # Only passes once every section's stream is in flight at once
+            self.section_barrier.wait()
+        # Stream the delay in ticks so that abandoned streams can be closed
+        try:
+            for _ in range(STREAM_TICKS):
+                time.sleep(self.delays.get(name, 0) / STREAM_TICKS)
+                yield AIMessageChunk(content="")
+        except GeneratorExit:
+            self.cancelled.append(name)
+            self.stream_closed.set()
+            raise
+        yield AIMessageChunk(content=answer, usage_metadata=USAGE)
+
+
+@pytest.fixture
+def repository():
+    repo = MagicMock()
+    repo.list_files = AsyncMock(return_value=[MagicMock(s3_key="research/a/1.md")])
+    repo.update_agent_state = AsyncMock()
+    repo.update_agent_state_fields = AsyncMock()
+    return repo
+
+
+@pytest.fixture(autouse=True)
+def isolated_config():
+    with (
+        patch.object(workflow.config, "llm_cache_enabled", False),
+        patch("app.research_analysis.agents.nodes.transcript_loader.get_s3_client"),
+        patch(
+            "app.research_analysis.agents.nodes.transcript_loader.get_file_content",
+            return_value="Interviewer: hello\nParticipant: I like tea",
+        ),
+    ):
+        yield
+
+
+async def run_workflow(repository, llm):
+    with patch(
+        "app.research_analysis.llm.bedrock_client.get_bedrock_llm", return_value=llm
+    ):
+        return await workflow.execute_research_analysis_workflow(
+            ANALYSIS_ID, repository
+        )
+
+
+# Test Cases - Speculative affinity mapping
+@pytest.mark.asyncio
+async def test_speculative_mapping_validation_passes_commits_map(repository):
+    # Given: mapping and validation take similar time
+    llm = StubLLM(delays={"validation": 0.2, "affinity": 0.2})
+
+    # When
+    final_state = await run_workflow(repository, llm)
+
+    # Then: the map is committed and the overlap is reported
+    assert final_state["status"] == AgentStatus.FINISHED
+    assert final_state["affinity_map"] == "# Affinity map"
+    assert final_state["speculative_saving_seconds"] > 0.1
+
+
+@pytest.mark.asyncio
+async def test_speculative_mapping_validation_fails_cancels_map(repository):
+    # Given: validation finds PII while mapping is still in flight
+    llm = StubLLM(
+        validation_response=PII_LEAK, delays={"validation": 0.1, "affinity": 5}
+    )
+
+    # When
+    final_state = await run_workflow(repository, llm)
+
+    # Then
+    assert final_state["status"] == AgentStatus.FAILED
+    assert final_state["affinity_map"] is None
+    # The stream is closed on the executor once its in-flight chunk returns
+    assert await asyncio.to_thread(llm.stream_closed.wait, 5)
+    assert llm.cancelled == ["affinity"]
+    repository.update_agent_state_fields.assert_not_awaited()
+
+
+@pytest.fixture
+def response_cache():
+    cache = LLMResponseCache(
+        memory_max_entries=100,
+        memory_max_bytes=1_000_000,
+        max_bytes=1_000_000,
+        ttl_seconds=60,
+    )
+    with (
+        patch.object(workflow.config, "llm_cache_enabled", True),
+        patch(
+            "app.research_analysis.llm.bedrock_client.get_response_cache",
+            return_value=cache,
+        ),
+    ):
+        yield cache
+
+
+@pytest.mark.asyncio
+async def test_speculative_map_is_not_cached_when_validation_fails(
+    repository, response_cache
+):
+    # Given: mapping finishes well before validation finds PII
+    llm = StubLLM(validation_response=PII_LEAK, delays={"validation": 0.3})
+
+    # When
+    final_state = await run_workflow(repository, llm)
+
+    # Then
+    assert final_state["status"] == AgentStatus.FAILED
+    assert "# Affinity map" not in response_cache._memory.values()  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_speculative_map_is_cached_once_validation_passes(
+    repository, response_cache
+):
+    # Given
+    llm = StubLLM(delays={"validation": 0.3})
+
+    # When
+    final_state = await run_workflow(repository, llm)
+
+    # Then
+    assert final_state["status"] == AgentStatus.FINISHED
+    assert "# Affinity map" in response_cache._memory.values()  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_discarded_mapping_error_is_retrieved(repository):
+    # Given: mapping raises before validation finds PII
+    handler = MagicMock()
+    asyncio.get_running_loop().set_exception_handler(handler)
+    llm = StubLLM(validation_response=PII_LEAK, delays={"validation": 0.2})
+
+    # When
+    with patch(
+        "app.research_analysis.agents.nodes.speculative_mapping.affinity_mapping_node",
+        AsyncMock(side_effect=RuntimeError("mapping failed")),
+    ):
+        final_state = await run_workflow(repository, llm)
+    gc.collect()
+
+    # Then: no "Task exception was never retrieved" is reported
+    assert final_state["status"] == AgentStatus.FAILED
+    handler.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_sequential_mode_runs_without_speculation(repository):
+    # Given
+    llm = StubLLM()
+
+    # When
+    with patch.object(workflow.config, "speculative_affinity_mapping", False):
+        final_state = await run_workflow(repository, llm)
+
+    # Then
+    assert final_state["status"] == AgentStatus.FINISHED
+    assert final_state["speculative_saving_seconds"] is None
+
+
+# Test Cases - PII validation
+@pytest.mark.asyncio
+async def test_local_pii_check_runs_off_the_event_loop():
+    # Given: a cleaned transcript that still holds a card number
+    threads = []
+
+    def recording_redact(transcripts):
+        threads.append(threading.current_thread())
+        return redact_transcripts(transcripts)
+
+    state = {
+        "analysis_id": ANALYSIS_ID,
+        "transcripts_pii_cleaned": ["Participant: my card is 4111 1111 1111 1111"],
+    }
+
+    # When
+    with patch.object(validate_pii, "redact_transcripts", recording_redact):
+        result = await validate_pii.validate_pii_node(state, MagicMock())
+
+    # Then: it failed locally, scanned in a worker thread
+    assert result["status"] == AgentStatus.FAILED
+    assert "Local check found 1 CARD_NUMBER" in result["error_message"]
+    assert threads
+    assert threading.main_thread() not in threads
+
+
+# Test Cases - Findings report fan-out
+@pytest.mark.asyncio
+async def test_findings_sections_generated_in_parallel_and_assembled(repository):
+    # Given: no section can finish until all of them are being generated
+    barrier = threading.Barrier(len(FINDINGS_SECTIONS), timeout=5)
+    llm = StubLLM(section_barrier=barrier)
+
+    # When
+    final_state = await run_workflow(repository, llm)
+
+    # Then: the sections ran concurrently and are assembled in order
+    assert final_state["status"] == AgentStatus.FINISHED
+    assert not barrier.broken
+    report = final_state["findings_report"]
+    headings = [line for line in report.splitlines() if line.startswith("## ")]
+    assert headings == ["## Key Insights", "## Recommendations", "## Next Steps"]
+
+
+@pytest.mark.asyncio
+async def test_findings_sections_are_sent_the_affinity_map_only(repository):
+    # Given
+    llm = StubLLM()
+
+    # When
+    final_state = await run_workflow(repository, llm)
+
+    # Then: the cleaned transcripts are not resent to every section
+    assert final_state["status"] == AgentStatus.FINISHED
+    for section in FINDINGS_SECTIONS:
+        assert "# Affinity map" in llm.user_prompts[section]
+        assert "cleaned transcript" not in llm.user_prompts[section]
+    assert "cleaned transcript" in llm.user_prompts["affinity"]
+
+
+@pytest.mark.asyncio
+async def test_findings_section_failure_fails_workflow(repository):
+    # Given
+    llm = StubLLM(failing=("recommendations",))
+
+    # When
+    final_state = await run_workflow(repository, llm)
+
+    # Then
+    assert final_state["status"] == AgentStatus.FAILED
+    assert "Recommendations: recommendations throttled" in final_state["error_message"]
+    assert final_state["findings_report"] is None
+
+
+# Test Cases - Usage accounting
+@pytest.mark.asyncio
+async def test_usage_is_recorded_per_node(repository):
+    # Given
+    llm = StubLLM(delays={"affinity": 0.1})
+
+    # When
+    final_state = await run_workflow(repository, llm)
+
+    # Then: every node is accounted for, including the parallel sections
+    usage = final_state["usage"]
+    assert usage["transcript_loader"]["llm_calls"] == 0
+    assert usage["remove_pii"]["llm_calls"] == 1
+    assert usage["validate_pii_and_map"]["llm_calls"] == 2
+    assert usage["validate_pii_and_map"]["wall_seconds"] >= 0.1
+    for section in FINDINGS_SECTIONS:
+        assert usage[f"findings_{section}"]["input_tokens"] == 100
+        assert usage[f"findings_{section}"]["output_tokens"] == 10
+    assert usage["remove_pii"]["cost_usd"] > 0
+    persisted = repository.update_agent_state.await_args.args[1]
+    assert persisted["usage"] == usage
+
+
+# Test Cases - Timeouts
+@pytest.mark.asyncio
+async def test_node_timeout_stops_workflow(repository):
+    # Given: affinity mapping hangs past its node timeout
+    llm = StubLLM(delays={"affinity": 5})
+    timeouts = {"validate_pii_and_map": 0.3}
+
+    # When
+    with patch.object(workflow.config, "node_timeouts", timeouts):
+        final_state = await run_workflow(repository, llm)
+
+    # Then
+    assert final_state["status"] == AgentStatus.TIMED_OUT
+    assert final_state["error_message"] == (
+        "Node validate_pii_and_map timed out after 0.3s"
+    )
+    assert final_state["timed_out_nodes"] == {"validate_pii_and_map": 0.3}
+    assert final_state["usage"]["validate_pii_and_map"]["wall_seconds"] >= 0.3
+    assert final_state["findings_report"] is None
+
+
+@pytest.mark.asyncio
+async def test_timeout_error_raised_by_node_is_not_a_node_timeout():
+    # Given: the node fails with its own TimeoutError, well within its timeout
+    async def run():
+        msg = "Read timed out"
+        raise TimeoutError(msg)
+
+    on_timeout = MagicMock()
+
+    # When / Then
+    with pytest.raises(TimeoutError, match="Read timed out"):
+        await workflow.run_node("remove_pii", run, on_timeout)
+    on_timeout.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_findings_section_timeout_times_out_workflow(repository):
+    # Given
+    llm = StubLLM(delays={"next_steps": 5})
+    timeouts = {"findings_section": 0.3}
+
+    # When
+    with patch.object(workflow.config, "node_timeouts", timeouts):
+        final_state = await run_workflow(repository, llm)
+
+    # Then: the other sections still finish
+    assert final_state["status"] == AgentStatus.TIMED_OUT
+    assert "findings_next_steps timed out after 0.3s" in final_state["error_message"]
+    assert final_state["timed_out_nodes"] == {"findings_next_steps": 0.3}
+    assert set(final_state["findings_sections"]) == {
+        "key_insights",
+        "recommendations",
+    }
+
+
+@pytest.mark.asyncio
+async def test_workflow_deadline_keeps_synced_progress(repository):
+    # Given
+    llm = StubLLM(delays={"affinity": 5})
+
+    # When
+    with patch.object(workflow.config, "workflow_deadline_seconds", 0.3):
+        final_state = await run_workflow(repository, llm)
+
+    # Then: only the status is written, not the initial state
+    assert final_state["status"] == AgentStatus.TIMED_OUT
+    assert final_state["error_message"] == "Analysis exceeded its deadline of 0.3s"
+    repository.update_agent_state_fields.assert_awaited_with(
+        ANALYSIS_ID,
+        {
+            "status": AgentStatus.TIMED_OUT,
+            "error_message": final_state["error_message"],
+        },
+    )
+    persisted = repository.update_agent_state.await_args.args[1]
+    assert persisted["transcripts_pii_cleaned"] == ["cleaned transcript"]
+
+
+# Test Cases - Tracing
+@pytest.mark.asyncio
+async def test_spans_cover_nodes_llm_calls_s3_and_mongo(repository):
+    # Given
+    exporter = InMemorySpanExporter()
+    add_span_exporter(exporter)
+    repository.add_spans = AsyncMock()
+
+    # When
+    try:
+        with start_span("analysis") as root:
+            await run_workflow(repository, StubLLM())
+    finally:
+        remove_span_exporter(exporter)
+
+    # Then: every node is a child of the root, with its calls below it
+    spans = exporter.get_finished_spans()
+    by_id = {span.span_id: span for span in spans}
+    nodes = [span for span in spans if span.parent_span_id == root.span_id]
+    assert {node.name for node in nodes} >= {
+        "transcript_loader",
+        "remove_pii",
+        "validate_pii_and_map",
+        *(f"findings_{section}" for section in FINDINGS_SECTIONS),
+        "findings_report",
+    }
+    parents = {
+        span.name: by_id[span.parent_span_id].name
+        for span in spans
+        if span.name in ("s3.get_object", "llm.stream")
+    }
+    assert parents["s3.get_object"] == "transcript_loader"
+    assert any(span.name == "mongo.update_agent_state" for span in spans)
+    llm_span = next(span for span in spans if span.name == "llm.stream")
+    assert llm_span.attributes["llm.input_tokens"] == 100
+    repository.add_spans.assert_awaited()
+
+
+# Test Cases - Profiling
+@pytest.mark.asyncio
+async def test_profiled_run_samples_graph_nodes(repository):
+    # Given: listing files keeps the transcript loader node busy on the loop
+    async def list_files(_analysis_id):
+        end = time.monotonic() + 0.2
+        while time.monotonic() < end:
+            pass
+        return [MagicMock(s3_key="research/a/1.md")]
+
+    repository.list_files = list_files
+    repository.get_analysis = AsyncMock()
+    repository.get_analysis_status = AsyncMock()
+    repository.finish_running_analysis = AsyncMock(return_value=True)
+    repository.add_spans = AsyncMock()
+
+    # When: the whole graph runs from the profiled workflow task
+    with (
+        patch(
+            "app.research_analysis.llm.bedrock_client.get_bedrock_llm",
+            return_value=StubLLM(),
+        ),
+        patch.object(analysis_workflow, "save_profile") as save_profile,
+    ):
+        await asyncio.create_task(
+            analysis_workflow.start_analysis_workflow(
+                ANALYSIS_ID, repository, profile=True
+            )
+        )
+
+    # Then: the node, which runs in a task of its own, is in the profile
+    _, profiler = save_profile.call_args.args
+    folded = profiler.folded()
+    assert (
+        "app.research_analysis.agents.nodes.transcript_loader:transcript_loader_node"
+        in folded
+    )
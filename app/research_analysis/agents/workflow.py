@@ -1,21 +1,37 @@
 """Main LangGraph workflow for research analysis."""
 
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
 from datetime import datetime, timezone
 from logging import getLogger
 
 from langgraph.graph import END, START, StateGraph
 
+from app.common.metrics import counter, metrics_enabled
+from app.common.spans import STATUS_ERROR, start_span
+from app.config import config
 from app.research_analysis.agents.nodes.affinity_mapping import affinity_mapping_node
-from app.research_analysis.agents.nodes.findings_report import findings_report_node
+from app.research_analysis.agents.nodes.findings_report import (
+    findings_report_node,
+    findings_section_node,
+)
 from app.research_analysis.agents.nodes.remove_pii import remove_pii_node
+from app.research_analysis.agents.nodes.speculative_mapping import (
+    validate_pii_and_map_node,
+)
 from app.research_analysis.agents.nodes.transcript_loader import transcript_loader_node
 from app.research_analysis.agents.nodes.validate_pii import validate_pii_node
+from app.research_analysis.agents.prompts.findings_report import FINDINGS_SECTIONS
 from app.research_analysis.agents.state import (
     WorkflowState,
     workflow_state_to_agent_state,
 )
+from app.research_analysis.llm.context import ctx_llm_usage
+from app.research_analysis.llm.usage import UsageRecorder
 from app.research_analysis.models import AgentStatus
 from app.research_analysis.repository import ResearchAnalysisRepository
+from app.research_analysis.timeline import store_spans
 
 logger = getLogger(__name__)
 
@@ -32,7 +48,8 @@ async def sync_state_to_db(
     """
     try:
         agent_state_dict = workflow_state_to_agent_state(state)
-        await repository.update_agent_state(state["analysis_id"], agent_state_dict)
+        with start_span("mongo.update_agent_state"):
+            await repository.update_agent_state(state["analysis_id"], agent_state_dict)
         logger.debug("Synced state to DB for analysis %s", state["analysis_id"])
     except Exception as e:
         logger.error(
@@ -40,6 +57,60 @@ async def sync_state_to_db(
         )
 
 
+async def run_node(
+    name: str,
+    run: Callable[[], Awaitable[dict]],
+    on_timeout: Callable[[str], dict],
+) -> dict:
+    """
+    Run a node within its timeout, recording its LLM usage and wall time.
+
+    The node runs in a tracing span named after it. Usage is recorded under
+    ``usage[name]``. A node exceeding
+    ``config.get_node_timeout(name)`` is cancelled and reported through
+    ``on_timeout``, with its timeout recorded under ``timed_out_nodes[name]``.
+
+    Args:
+        name: Graph node name the usage and timeout are keyed by
+        run: Coroutine function executing the node
+        on_timeout: Builds the node's state update from the timeout message
+
+    Returns:
+        The node's state update with its usage added
+    """
+    timeout = config.get_node_timeout(name)
+    recorder = UsageRecorder()
+    token = ctx_llm_usage.set(recorder)
+    start = time.monotonic()
+    node_timeout = asyncio.timeout(timeout)
+    try:
+        with start_span(name, **{"workflow.node": name}) as span:
+            try:
+                async with node_timeout:
+                    updated_state = await run()
+            except TimeoutError:
+                if node_timeout.expired():
+                    span.set_status(STATUS_ERROR, "timed out")
+                raise
+    except TimeoutError:
+        # A TimeoutError raised inside the node, e.g. a read timeout, is an error
+        if not node_timeout.expired():
+            raise
+        error_msg = f"Node {name} timed out after {timeout:g}s"
+        logger.error("%s", error_msg)
+        if metrics_enabled():
+            counter("WorkflowNodeTimeouts", 1)
+        updated_state = on_timeout(error_msg)
+        timed_out = updated_state.get("timed_out_nodes") or {}
+        updated_state["timed_out_nodes"] = {**timed_out, name: timeout}
+    finally:
+        recorder.wall_seconds = time.monotonic() - start
+        ctx_llm_usage.reset(token)
+
+    usage = {**(updated_state.get("usage") or {}), name: recorder.to_dict()}
+    return {**updated_state, "usage": usage}
+
+
 def create_node_with_state_sync(node_func, repository: ResearchAnalysisRepository):
     """
     Wrapper that adds state synchronization to any node function.
@@ -52,18 +123,57 @@ def create_node_with_state_sync(node_func, repository: ResearchAnalysisRepositor
         Wrapped node function that syncs state after execution
     """
 
+    name = node_func.__name__.removesuffix("_node")
+
     async def wrapper(state: WorkflowState) -> WorkflowState:
         # Execute the original node
-        updated_state = await node_func(state, repository)
+        updated_state = await run_node(
+            name,
+            lambda: node_func(state, repository),
+            lambda error_msg: {
+                **state,
+                "status": AgentStatus.TIMED_OUT,
+                "error_message": error_msg,
+            },
+        )
 
-        # Sync the updated state to MongoDB
+        # Sync the updated state and the node's spans to MongoDB
         await sync_state_to_db(updated_state, repository)
+        await store_spans(repository, state["analysis_id"])
 
         return updated_state
 
     return wrapper
 
 
+def create_findings_section_node(section: str, repository: ResearchAnalysisRepository):
+    """
+    Create a parallel branch node generating one findings report section.
+
+    Branch nodes return partial state updates, so they persist their own
+    progress instead of syncing the full state.
+
+    Args:
+        section: Key of the section in FINDINGS_SECTIONS
+        repository: Repository for database operations
+
+    Returns:
+        Node function for the section
+    """
+
+    async def section_node(state: WorkflowState) -> dict:
+        # Parallel branches must not write the status, see findings_report_node
+        update = await run_node(
+            f"findings_{section}",
+            lambda: findings_section_node(state, repository, section),
+            lambda error_msg: {"findings_section_errors": {section: error_msg}},
+        )
+        await store_spans(repository, state["analysis_id"])
+        return update
+
+    return section_node
+
+
 def should_continue(state: WorkflowState) -> str:
     """
     Conditional edge function to determine if workflow should continue or end.
@@ -72,23 +182,42 @@ def should_continue(state: WorkflowState) -> str:
         state: Current workflow state
 
     Returns:
-        "END" if status is FAILED, otherwise "continue"
+        "END" if status is FAILED or TIMED_OUT, otherwise "continue"
     """
-    if state.get("status") == AgentStatus.FAILED:
+    if state.get("status") in (AgentStatus.FAILED, AgentStatus.TIMED_OUT):
         logger.info(
-            "Workflow stopping due to failed status for analysis %s",
+            "Workflow stopping due to %s status for analysis %s",
+            state["status"].value,
             state["analysis_id"],
         )
         return "END"
     return "continue"
 
 
+def route_to_findings_sections(state: WorkflowState) -> list[str] | str:
+    """
+    Conditional edge fanning out to one branch per findings report section.
+
+    Args:
+        state: Current workflow state
+
+    Returns:
+        END if status is FAILED or TIMED_OUT, otherwise the section node names
+    """
+    if should_continue(state) == "END":
+        return END
+    return [f"findings_{section}" for section in FINDINGS_SECTIONS]
+
+
 def create_research_analysis_workflow(
     repository: ResearchAnalysisRepository,
 ) -> StateGraph:
     """
     Create the research analysis LangGraph workflow.
 
+    With ``config.speculative_affinity_mapping`` enabled, PII validation and
+    affinity mapping run as a single node that overlaps the two LLM stages.
+
     Args:
         repository: Repository for data access
 
@@ -101,16 +230,17 @@ def create_research_analysis_workflow(
     # Create wrapped nodes with automatic state sync
     transcript_loader = create_node_with_state_sync(transcript_loader_node, repository)
     remove_pii = create_node_with_state_sync(remove_pii_node, repository)
-    validate_pii = create_node_with_state_sync(validate_pii_node, repository)
-    affinity_mapping = create_node_with_state_sync(affinity_mapping_node, repository)
-    generate_findings = create_node_with_state_sync(findings_report_node, repository)
+    assemble_findings = create_node_with_state_sync(findings_report_node, repository)
+    section_nodes = [f"findings_{section}" for section in FINDINGS_SECTIONS]
 
     # Add nodes to the graph
     graph.add_node("transcript_loader", transcript_loader)
     graph.add_node("remove_pii", remove_pii)
-    graph.add_node("validate_pii", validate_pii)
-    graph.add_node("affinity_mapping", affinity_mapping)
-    graph.add_node("generate_findings", generate_findings)
+    graph.add_node("assemble_findings", assemble_findings)
+    for section in FINDINGS_SECTIONS:
+        graph.add_node(
+            f"findings_{section}", create_findings_section_node(section, repository)
+        )
 
     # Add sequential workflow with conditional error handling
     graph.add_edge(START, "transcript_loader")
@@ -120,27 +250,82 @@ def create_research_analysis_workflow(
         "transcript_loader", should_continue, {"continue": "remove_pii", "END": END}
     )
 
-    graph.add_conditional_edges(
-        "remove_pii", should_continue, {"continue": "validate_pii", "END": END}
-    )
+    if config.speculative_affinity_mapping:
+        graph.add_node(
+            "validate_pii_and_map",
+            create_node_with_state_sync(validate_pii_and_map_node, repository),
+        )
+        graph.add_conditional_edges(
+            "remove_pii",
+            should_continue,
+            {"continue": "validate_pii_and_map", "END": END},
+        )
+        graph.add_conditional_edges(
+            "validate_pii_and_map",
+            route_to_findings_sections,
+            [*section_nodes, END],
+        )
+    else:
+        graph.add_node(
+            "validate_pii", create_node_with_state_sync(validate_pii_node, repository)
+        )
+        graph.add_node(
+            "affinity_mapping",
+            create_node_with_state_sync(affinity_mapping_node, repository),
+        )
+        graph.add_conditional_edges(
+            "remove_pii", should_continue, {"continue": "validate_pii", "END": END}
+        )
+        graph.add_conditional_edges(
+            "validate_pii",
+            should_continue,
+            {"continue": "affinity_mapping", "END": END},
+        )
+        graph.add_conditional_edges(
+            "affinity_mapping",
+            route_to_findings_sections,
+            [*section_nodes, END],
+        )
 
-    graph.add_conditional_edges(
-        "validate_pii", should_continue, {"continue": "affinity_mapping", "END": END}
-    )
-
-    graph.add_conditional_edges(
-        "affinity_mapping",
-        should_continue,
-        {"continue": "generate_findings", "END": END},
-    )
+    # Sections are generated in parallel and joined once all have finished
+    graph.add_edge(section_nodes, "assemble_findings")
 
     # Final node always goes to END
-    graph.add_edge("generate_findings", END)
+    graph.add_edge("assemble_findings", END)
 
     # Compile the graph
     return graph.compile()
 
 
+async def handle_deadline_exceeded(
+    initial_state: WorkflowState, repository: ResearchAnalysisRepository
+) -> WorkflowState:
+    """
+    Mark an analysis whose workflow exceeded its deadline as timed out.
+
+    Only the status and error message are written, so the progress and node
+    timings synced before the deadline are kept.
+
+    Args:
+        initial_state: Initial state of the cancelled workflow
+        repository: Repository for database operations
+
+    Returns:
+        Final workflow state with TIMED_OUT status
+    """
+    analysis_id = initial_state["analysis_id"]
+    error_msg = (
+        f"Analysis exceeded its deadline of {config.workflow_deadline_seconds:g}s"
+    )
+    logger.error("%s for analysis %s", error_msg, analysis_id)
+    if metrics_enabled():
+        counter("WorkflowDeadlineExceeded", 1)
+
+    timeout_fields = {"status": AgentStatus.TIMED_OUT, "error_message": error_msg}
+    await repository.update_agent_state_fields(analysis_id, timeout_fields)
+    return {**initial_state, **timeout_fields}
+
+
 async def execute_research_analysis_workflow(
     analysis_id: str, repository: ResearchAnalysisRepository
 ) -> WorkflowState:
@@ -166,6 +351,11 @@ async def execute_research_analysis_workflow(
         "transcripts_pii_cleaned": [],
         "affinity_map": None,
         "findings_report": None,
+        "findings_sections": {},
+        "findings_section_errors": {},
+        "speculative_saving_seconds": None,
+        "usage": {},
+        "timed_out_nodes": {},
     }
 
     # Sync initial state to DB
@@ -174,8 +364,10 @@ async def execute_research_analysis_workflow(
     # Create and execute workflow
     workflow = create_research_analysis_workflow(repository)
 
+    deadline = asyncio.timeout(config.workflow_deadline_seconds)
     try:
-        final_state = await workflow.ainvoke(initial_state)
+        async with deadline:
+            final_state = await workflow.ainvoke(initial_state)
         logger.info("Completed research analysis workflow for analysis %s", analysis_id)
 
         # Final state sync to ensure DB is up to date
@@ -183,6 +375,9 @@ async def execute_research_analysis_workflow(
 
         return final_state
     except Exception as e:
+        if deadline.expired():
+            return await handle_deadline_exceeded(initial_state, repository)
+
         error_msg = f"Workflow execution failed: {str(e)}"
         logger.error(error_msg)
 
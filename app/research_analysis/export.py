@@ -0,0 +1,334 @@
+"""
+Streaming zip and tar exports of analysis artifacts.
+
+An export is laid out up front as a sequence of segments of known size:
+archive headers, artifact contents and trailers. Artifact sizes come from
+the database without reading the artifacts, so the archive size, and any
+byte range of it, is known before streaming starts. Artifacts are then read
+one at a time, only when the requested range reaches them, and sent in
+chunks. Archives are uncompressed (zip STORED, plain tar), so their layout
+does not depend on the content.
+
+The strong ETag of an export is derived from its layout and the analysis
+``updated_at``, so a client resuming with ``If-Range`` gets the whole archive
+again if the analysis changed in between, instead of bytes from two versions.
+"""
+
+import hashlib
+import json
+import struct
+import tarfile
+import zlib
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi.responses import StreamingResponse
+
+from app.common.exceptions import ConflictError, ValidationError
+from app.common.http_range import content_range
+from app.research_analysis.models import AnalysisFile, ExportFormat
+from app.research_analysis.repository import ResearchAnalysisRepository
+
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {
+    ExportFormat.ZIP: "application/zip",
+    ExportFormat.TAR: "application/x-tar",
+}
+
+# Without zip64 records, zip offsets and sizes must fit in 32 bits
+ZIP_MAX_SIZE = 0xFFFFFFFF
+ZIP_MAX_ENTRIES = 0xFFFF
+
+_TAR_BLOCK = 512
+
+
+class ExportMember:
+    """An archive member whose content is read on demand."""
+
+    def __init__(self, name: str, size: int, read: Callable[[], Awaitable[bytes]]):
+        self.name = name
+        self.size = size
+        self.crc: Optional[int] = None
+        self._read = read
+        self._data: Optional[bytes] = None
+
+    async def data(self) -> bytes:
+        """Read the content, kept until ``release`` so a header can use its CRC."""
+        if self._data is None:
+            data = await self._read()
+            if len(data) != self.size:
+                # The artifact changed since the layout was computed
+                msg = f"Export member {self.name} changed while exporting"
+                raise ConflictError(msg)
+            self.crc = zlib.crc32(data)
+            self._data = data
+        return self._data
+
+    async def release(self) -> bytes:
+        data = await self.data()
+        self._data = None
+        return data
+
+
+def _constant(data: bytes) -> Callable[[], Awaitable[bytes]]:
+    async def read():
+        return data
+
+    return read
+
+
+def _static(data: bytes) -> tuple[int, Callable[[], Awaitable[bytes]]]:
+    return len(data), _constant(data)
+
+
+@dataclass
+class ExportArchive:
+    """An archive as segments of (size, read) streamed in order."""
+
+    filename: str
+    media_type: str
+    etag: str
+    segments: list[tuple[int, Callable[[], Awaitable[bytes]]]]
+
+    @property
+    def size(self) -> int:
+        return sum(size for size, _ in self.segments)
+
+    async def iter_bytes(
+        self, start: int = 0, end: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Stream the archive bytes from start to end, inclusive."""
+        end = self.size - 1 if end is None else end
+        offset = 0
+        for size, read in self.segments:
+            segment_start, offset = offset, offset + size
+            if offset <= start or size == 0:
+                continue
+            if segment_start > end:
+                break
+            data = await read()
+            stop = min(end + 1 - segment_start, size)
+            for i in range(max(start - segment_start, 0), stop, CHUNK_SIZE):
+                yield data[i : min(i + CHUNK_SIZE, stop)]
+
+
+def _tar_segments(members: list[ExportMember], mtime: datetime) -> list:
+    segments = []
+    for member in members:
+        info = tarfile.TarInfo(member.name)
+        info.size = member.size
+        info.mtime = int(mtime.timestamp())
+        info.mode = 0o644
+        segments.append(_static(info.tobuf(tarfile.PAX_FORMAT, "utf-8")))
+        segments.append((member.size, member.release))
+        segments.append(_static(b"\0" * (-member.size % _TAR_BLOCK)))
+    segments.append(_static(b"\0" * (2 * _TAR_BLOCK)))
+    return segments
+
+
+def _dos_datetime(mtime: datetime) -> tuple[int, int]:
+    time = (mtime.hour << 11) | (mtime.minute << 5) | (mtime.second // 2)
+    date = ((mtime.year - 1980) << 9) | (mtime.month << 5) | mtime.day
+    return time, date
+
+
+def _zip_segments(members: list[ExportMember], mtime: datetime) -> list:
+    dos_time, dos_date = _dos_datetime(mtime)
+    # Version 2.0, UTF-8 names, STORED
+    version, flags, method = 20, 0x0800, 0
+    segments, offsets, offset = [], [], 0
+
+    for member in members:
+        name = member.name.encode("utf-8")
+
+        async def local_header(member=member, name=name):
+            await member.data()
+            return (
+                struct.pack(
+                    "<4s5H3L2H",
+                    b"PK\x03\x04",
+                    version,
+                    flags,
+                    method,
+                    dos_time,
+                    dos_date,
+                    member.crc,
+                    member.size,
+                    member.size,
+                    len(name),
+                    0,
+                )
+                + name
+            )
+
+        offsets.append(offset)
+        segments.append((30 + len(name), local_header))
+        segments.append((member.size, member.release))
+        offset += 30 + len(name) + member.size
+
+    central_size = sum(46 + len(member.name.encode("utf-8")) for member in members)
+    if offset + central_size > ZIP_MAX_SIZE or len(members) > ZIP_MAX_ENTRIES:
+        msg = "Export is too large for a zip archive, use format=tar"
+        raise ValidationError(msg)
+
+    async def central_directory():
+        entries = []
+        for member, member_offset in zip(members, offsets):
+            if member.crc is None:
+                # Skipped by a range request, read it for its CRC only
+                await member.release()
+            name = member.name.encode("utf-8")
+            entries.append(
+                struct.pack(
+                    "<4s6H3L5H2L",
+                    b"PK\x01\x02",
+                    version,
+                    version,
+                    flags,
+                    method,
+                    dos_time,
+                    dos_date,
+                    member.crc,
+                    member.size,
+                    member.size,
+                    len(name),
+                    0,
+                    0,
+                    0,
+                    0,
+                    0o100644 << 16,
+                    member_offset,
+                )
+                + name
+            )
+        return b"".join(entries)
+
+    end_of_central_directory = struct.pack(
+        "<4s4H2LH",
+        b"PK\x05\x06",
+        0,
+        0,
+        len(members),
+        len(members),
+        central_size,
+        offset,
+        0,
+    )
+    segments.append((central_size, central_directory))
+    segments.append(_static(end_of_central_directory))
+    return segments
+
+
+def _transcript_names(files: list[AnalysisFile], count: int) -> list[str]:
+    if len(files) != count:
+        return [f"transcripts/transcript-{i + 1:02d}.md" for i in range(count)]
+    # S3 keys end in {uuid}-{filename}
+    return [
+        f"transcripts/{i + 1:02d}-{file.s3_key.rsplit('/', 1)[-1].split('-', 5)[-1]}"
+        for i, file in enumerate(files)
+    ]
+
+
+async def build_export(
+    repository: ResearchAnalysisRepository,
+    analysis_id: str,
+    export_format: ExportFormat,
+) -> ExportArchive:
+    """
+    Lay out the export archive of an analysis.
+
+    The archive holds a manifest.json, the findings report, the affinity map
+    and the cleaned transcripts, where present.
+    """
+    sizes = await repository.get_export_sizes(analysis_id)
+    files = await repository.list_files(analysis_id)
+
+    def reader(field: str, index: Optional[int] = None):
+        async def read():
+            value = await repository.get_agent_state_field(analysis_id, field, index)
+            return (value or "").encode("utf-8")
+
+        return read
+
+    members = []
+    if sizes.get("findings_report") is not None:
+        members.append(
+            ExportMember(
+                "findings_report.md",
+                sizes["findings_report"],
+                reader("findings_report"),
+            )
+        )
+    if sizes.get("affinity_map") is not None:
+        members.append(
+            ExportMember(
+                "affinity_map.md", sizes["affinity_map"], reader("affinity_map")
+            )
+        )
+    transcript_sizes = sizes.get("transcripts_pii_cleaned", [])
+    names = _transcript_names(files, len(transcript_sizes))
+    for index, (name, size) in enumerate(zip(names, transcript_sizes)):
+        members.append(
+            ExportMember(name, size, reader("transcripts_pii_cleaned", index))
+        )
+
+    mtime = sizes["created_at"]
+    if mtime.tzinfo is None:
+        mtime = mtime.replace(tzinfo=timezone.utc)
+    manifest = json.dumps(
+        {
+            "analysis_id": analysis_id,
+            "status": sizes.get("status"),
+            "created_at": mtime.isoformat(),
+            "files": [{"name": m.name, "size": m.size} for m in members],
+        },
+        indent=2,
+    ).encode("utf-8")
+    members.insert(0, ExportMember("manifest.json", len(manifest), _constant(manifest)))
+
+    if export_format == ExportFormat.TAR:
+        segments = _tar_segments(members, mtime)
+    else:
+        segments = _zip_segments(members, mtime)
+    return ExportArchive(
+        filename=f"analysis-{analysis_id}.{export_format.value}",
+        media_type=MEDIA_TYPES[export_format],
+        etag=_export_etag(export_format, manifest, sizes.get("updated_at")),
+        segments=segments,
+    )
+
+
+def _export_etag(
+    export_format: ExportFormat, manifest: bytes, updated_at: Optional[datetime]
+) -> str:
+    # The manifest lists the status and the size of every artifact
+    digest = hashlib.sha256(manifest)
+    digest.update(export_format.value.encode())
+    if updated_at is not None:
+        digest.update(updated_at.isoformat().encode())
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def export_response(
+    archive: ExportArchive, byte_range: Optional[tuple[int, int]]
+) -> StreamingResponse:
+    """Stream an export archive, or the requested byte range of it."""
+    size = archive.size
+    start, end = byte_range or (0, size - 1)
+    headers = {
+        "ETag": archive.etag,
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start + 1),
+        "Content-Disposition": f'attachment; filename="{archive.filename}"',
+    }
+    if byte_range is not None:
+        headers["Content-Range"] = content_range(start, end, size)
+    return StreamingResponse(
+        archive.iter_bytes(start, end),
+        status_code=206 if byte_range is not None else 200,
+        media_type=archive.media_type,
+        headers=headers,
+    )
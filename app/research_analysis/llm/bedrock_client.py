@@ -1,66 +1,466 @@
+# LLM integration for research analysis
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import aclosing, asynccontextmanager
 from logging import getLogger
-from typing import Optional
+from typing import Optional, TypeVar
 
 from langchain_aws import ChatBedrock
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 
-from app.config import config
+from app.common.metrics import counter, gauge, metrics_enabled
+from app.common.spans import start_span
+from app.config import BedrockEndpoint, config
+from app.research_analysis.llm.circuit_breaker import Permit, get_circuit_breaker
+from app.research_analysis.llm.context import (
+    ctx_llm_cache_bypass,
+    ctx_llm_cache_deferred,
+    ctx_llm_pause_listener,
+    ctx_llm_schedule,
+)
+from app.research_analysis.llm.endpoints import get_endpoint_pool, is_regional_error
+from app.research_analysis.llm.hedging import get_request_hedger
+from app.research_analysis.llm.response_cache import get_response_cache
+from app.research_analysis.llm.scheduler import get_llm_scheduler
+from app.research_analysis.llm.transport import get_bedrock_transport
+from app.research_analysis.llm.usage import (
+    record_cache_hit,
+    record_llm_call,
+    record_queue_wait,
+)
 
 logger = getLogger(__name__)
 
-_bedrock_llm: Optional[ChatBedrock] = None
+T = TypeVar("T")
 
+# Bedrock LLM clients keyed by profile and endpoint name
+_bedrock_llms: dict[tuple[str, str], ChatBedrock] = {}
 
-def get_bedrock_llm() -> ChatBedrock:
-    """Get Bedrock LLM client instance."""
-    global _bedrock_llm
-    if _bedrock_llm is None:
-        _bedrock_llm = ChatBedrock(
-            model_id=config.bedrock_model_id,
-            region_name=config.bedrock_region,
-            temperature=0,
-            max_tokens=4000,
+DEFAULT_PROFILE = "default"
+
+
+def _resolve_profile(profile: str) -> tuple[dict, Optional[float]]:
+    """Resolve a profile name to generation parameters and timeout."""
+    llm_profile = config.get_llm_profile(profile)
+    params = {
+        "temperature": llm_profile.temperature,
+        "max_tokens": llm_profile.max_tokens,
+    }
+    return params, llm_profile.timeout
+
+
+def _model_id(profile: str, endpoint: BedrockEndpoint) -> str:
+    """Model called for a profile on an endpoint, the profile's model first."""
+    return (
+        config.get_llm_profile(profile).model_id
+        or endpoint.model_id
+        or config.bedrock_model_id
+    )
+
+
+def get_bedrock_llm(
+    profile: str = DEFAULT_PROFILE, endpoint: Optional[BedrockEndpoint] = None
+) -> ChatBedrock:
+    """
+    Get Bedrock LLM client instance for an LLM profile and endpoint.
+
+    A model id set on the profile takes precedence over the endpoint's.
+    """
+    endpoint = endpoint or BedrockEndpoint(region=config.bedrock_region)
+    key = (profile, endpoint.name)
+    llm = _bedrock_llms.get(key)
+    if llm is None:
+        model_id = _model_id(profile, endpoint)
+        params, timeout = _resolve_profile(profile)
+        llm = ChatBedrock(
+            model_id=model_id,
+            region_name=endpoint.region,
+            client=get_bedrock_transport().client(endpoint.region, timeout),
+            **params,
         )
+        _bedrock_llms[key] = llm
         logger.info(
-            "Initialized Bedrock LLM client with model %s", config.bedrock_model_id
+            "Initialized Bedrock LLM client for profile %s with model %s in %s",
+            profile,
+            model_id,
+            endpoint.region,
         )
-    return _bedrock_llm
+    return llm
 
 
-async def chat_with_bedrock(system_prompt: str, user_prompt: str) -> str:
+async def _with_failover(
+    profile: str, attempt: Callable[[ChatBedrock], Awaitable[T]]
+) -> tuple[T, str]:
     """
-    Send a chat request to Bedrock.
+    Run a call on an endpoint from the pool, failing over on regional errors.
 
     Args:
-        system_prompt: System message content
-        user_prompt: User message content
+        profile: Name of the LLM profile
+        attempt: Coroutine function making the call with the given client
 
     Returns:
-        LLM response content
+        Result of the first endpoint to succeed, and the model it called
     """
-    llm = get_bedrock_llm()
+    pool = get_endpoint_pool()
+    tried: set[str] = set()
+    state = pool.choose()
+    while True:
+        llm = get_bedrock_llm(profile, state.endpoint)
+        start = time.monotonic()
+        try:
+            with start_span("bedrock.attempt", **{"llm.endpoint": state.name}):
+                result = await attempt(llm)
+        except Exception as e:
+            pool.record_failure(state, e)
+            tried.add(state.name)
+            # None once every endpoint name has been tried
+            next_state = pool.choose(frozenset(tried)) if is_regional_error(e) else None
+            if next_state is None:
+                raise
+            logger.warning(
+                "Bedrock endpoint %s failed, failing over: %s", state.name, e
+            )
+            state = next_state
+            continue
+        pool.record_success(state, time.monotonic() - start)
+        return result, _model_id(profile, state.endpoint)
 
-    messages = [
-        SystemMessage(content=system_prompt),
-        HumanMessage(content=user_prompt),
-    ]
 
+def _build_messages(system_prompt: str, user_prompt: str) -> list[BaseMessage]:
     logger.debug(
         "Sending Bedrock request - System prompt length: %d, User prompt length: %d",
         len(system_prompt),
         len(user_prompt),
     )
+    return [
+        SystemMessage(content=system_prompt),
+        HumanMessage(content=user_prompt),
+    ]
+
+
+def _log_response(content: str):
+    logger.debug(
+        "Bedrock response received, length: %d, content preview: %s",
+        len(content),
+        content[:200] + "..." if len(content) > 200 else content,
+    )
+
+
+def _cache_keys(system_prompt: str, user_prompt: str, profile: str) -> dict[str, str]:
+    """
+    Return response cache keys by model, or none if the cache is not in use.
+
+    Endpoints may call different models, so there is one key for each model
+    the call can be routed to.
+    """
+    if not config.llm_cache_enabled or ctx_llm_cache_bypass.get():
+        return {}
+    params, _ = _resolve_profile(profile)
+    models = dict.fromkeys(
+        _model_id(profile, state.endpoint) for state in get_endpoint_pool().endpoints
+    )
+    return {
+        model_id: get_response_cache().make_key(
+            model_id, params, system_prompt, user_prompt
+        )
+        for model_id in models
+    }
+
+
+async def _get_cached(cache_keys: dict[str, str]) -> Optional[str]:
+    """Look up a cached response, recording the hit for usage accounting."""
+    if not cache_keys:
+        return None
+    cached = await get_response_cache().get(*cache_keys.values())
+    if cached is not None:
+        logger.debug("Bedrock response served from cache")
+        record_cache_hit()
+    return cached
+
+
+async def _put_cached(cache_keys: dict[str, str], model_id: str, response: str):
+    """
+    Store a response under the key of the model that generated it.
+
+    The response is deferred instead if the caller set ctx_llm_cache_deferred.
+    """
+    cache_key = cache_keys.get(model_id)
+    if cache_key is None:
+        return
+    schedule = ctx_llm_schedule.get()
+    entry = (cache_key, response, schedule.analysis_id if schedule else None)
+    deferred = ctx_llm_cache_deferred.get()
+    if deferred is not None:
+        deferred.append(entry)
+        return
+    await get_response_cache().put(*entry)
+
+
+async def store_deferred_responses(
+    deferred: list[tuple[str, str, Optional[str]]],
+):
+    """Store responses deferred through ctx_llm_cache_deferred."""
+    for cache_key, response, analysis_id in deferred:
+        await get_response_cache().put(cache_key, response, analysis_id)
+
+
+async def _wait_for_circuit() -> Permit:
+    """Wait while the circuit breaker is open, reporting the pause."""
+    breaker = get_circuit_breaker()
+    permit = breaker.try_acquire()
+    if permit is not None:
+        return permit
 
+    logger.warning("LLM circuit breaker is open, pausing call")
+    if metrics_enabled():
+        counter("LLMCircuitPausedCalls", 1)
+    listener = ctx_llm_pause_listener.get()
+    if listener is not None:
+        await listener.paused()
     try:
-        response = await llm.ainvoke(messages)
-        logger.debug(
-            "Bedrock response received, length: %d, content preview: %s",
-            len(response.content),
-            response.content[:200] + "..."
-            if len(response.content) > 200
-            else response.content,
+        return await breaker.acquire(config.llm_circuit_max_wait_seconds)
+    finally:
+        if listener is not None:
+            await listener.resumed()
+
+
+@asynccontextmanager
+async def _scheduler_slot() -> AsyncIterator[None]:
+    """Hold a call slot granted by the fair-share scheduler."""
+    if not config.llm_scheduler_enabled:
+        yield
+        return
+
+    scheduler = get_llm_scheduler()
+    waited = await scheduler.acquire(ctx_llm_schedule.get())
+    record_queue_wait(waited)
+    if metrics_enabled():
+        gauge("LLMActiveCalls", scheduler.active)
+    try:
+        yield
+    finally:
+        scheduler.release()
+        if metrics_enabled():
+            gauge("LLMActiveCalls", scheduler.active)
+
+
+async def _guarded(call: Callable[[], Awaitable[T]], timed: bool = True) -> T:
+    """
+    Run a provider call through the circuit breaker and the scheduler.
+
+    Args:
+        call: Coroutine function making the call
+        timed: Whether the call's latency counts towards slow calls
+
+    Returns:
+        Result of the call
+    """
+    if not config.llm_circuit_breaker_enabled:
+        async with _scheduler_slot():
+            return await call()
+
+    permit = await _wait_for_circuit()
+    breaker = get_circuit_breaker()
+    async with _scheduler_slot():
+        start = time.monotonic()
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            breaker.release(permit)
+            raise
+        except Exception as e:
+            if is_regional_error(e):
+                breaker.record_failure(permit)
+            else:
+                # The provider answered, the request itself was bad
+                breaker.record_success(permit=permit)
+            raise
+    breaker.record_success(time.monotonic() - start if timed else None, permit)
+    return result
+
+
+async def _run_to_completion(profile: str, call: Awaitable[BaseMessage]):
+    """
+    Await a blocking model call, which keeps running if the caller is cancelled.
+
+    The executor thread of a cancelled call cannot be stopped and Bedrock
+    bills the call all the same. So the caller, such as a losing hedge
+    attempt, waits for it, holding its scheduler slot, and records its usage.
+    """
+    start = time.monotonic()
+    future = asyncio.ensure_future(call)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        with contextlib.suppress(Exception):
+            response = await future
+            record_llm_call(profile, response.usage_metadata, time.monotonic() - start)
+        raise
+
+
+async def _invoke(messages: list[BaseMessage], profile: str) -> tuple[BaseMessage, str]:
+    """
+    Invoke the model on the transport, hedging the call if enabled.
+
+    Every hedge attempt runs through the circuit breaker and the scheduler on
+    its own, so hedges count towards ``config.llm_max_concurrent_calls``.
+    """
+    transport = get_bedrock_transport()
+
+    if not config.llm_hedging_enabled:
+        return await _guarded(
+            lambda: _with_failover(
+                profile, lambda llm: transport.run(llm.invoke, messages)
+            )
+        )
+
+    # Attempts run in tasks of their own, so the caller does not wait for a
+    # losing attempt to complete
+    async def attempt() -> tuple[BaseMessage, str]:
+        return await _guarded(
+            lambda: _with_failover(
+                profile,
+                lambda llm: _run_to_completion(
+                    profile, transport.run(llm.invoke, messages)
+                ),
+            )
         )
+
+    return await get_request_hedger(profile).call(attempt)
+
+
+async def _stream(
+    llm: ChatBedrock,
+    messages: list[BaseMessage],
+    on_progress: Optional[Callable[[str], Awaitable[None]]],
+) -> tuple[str, dict]:
+    """
+    Stream a response, passing throttled progress to on_progress.
+
+    A due flush is sent when the next chunk arrives, with the text before
+    that chunk. The complete text is therefore never passed to on_progress:
+    the caller writes it once, with the rest of its state.
+    """
+    parts: list[str] = []
+    usage_metadata = {"input_tokens": 0, "output_tokens": 0}
+    chunks_since_flush = 0
+    last_flush = time.monotonic()
+    # Close the stream as soon as we stop reading, e.g. when cancelled
+    stream = get_bedrock_transport().stream(llm.stream, messages)
+    async with aclosing(stream) as chunks:
+        async for chunk in chunks:
+            if on_progress is not None and chunks_since_flush:
+                elapsed_ms = (time.monotonic() - last_flush) * 1000
+                if (
+                    chunks_since_flush >= config.llm_stream_flush_chunks
+                    or elapsed_ms >= config.llm_stream_flush_interval_ms
+                ):
+                    await on_progress("".join(parts))
+                    chunks_since_flush = 0
+                    last_flush = time.monotonic()
+
+            parts.append(chunk.text)
+            chunks_since_flush += 1
+            if chunk.usage_metadata:
+                for key in usage_metadata:
+                    usage_metadata[key] += chunk.usage_metadata.get(key, 0)
+    return "".join(parts), usage_metadata
+
+
+async def chat_with_bedrock(
+    system_prompt: str, user_prompt: str, profile: str = DEFAULT_PROFILE
+) -> str:
+    """
+    Send a chat request to Bedrock.
+
+    Responses are served from the LLM response cache when possible, unless the
+    current workflow has opted out via ``ctx_llm_cache_bypass``. With
+    ``config.llm_hedging_enabled``, calls slower than usual are hedged.
+    Calls are routed over ``config.bedrock_endpoints``, failing over to
+    another endpoint on throttling or regional errors, and wait while the
+    circuit breaker is open.
+
+    Args:
+        system_prompt: System message content
+        user_prompt: User message content
+        profile: Name of the LLM profile in ``config.llm_profiles``
+
+    Returns:
+        LLM response content
+    """
+    with start_span("llm.chat", **{"llm.profile": profile}):
+        cache_keys = _cache_keys(system_prompt, user_prompt, profile)
+        cached = await _get_cached(cache_keys)
+        if cached is not None:
+            return cached
+
+        messages = _build_messages(system_prompt, user_prompt)
+
+        start = time.monotonic()
+        try:
+            response, model_id = await _invoke(messages, profile)
+            _log_response(response.content)
+        except Exception as e:
+            logger.error("Bedrock LLM call failed: %s", e)
+            raise
+        record_llm_call(profile, response.usage_metadata, time.monotonic() - start)
+
+        await _put_cached(cache_keys, model_id, response.content)
         return response.content
-    except Exception as e:
-        logger.error("Bedrock LLM call failed: %s", e)
-        raise
+
+
+async def stream_chat_with_bedrock(
+    system_prompt: str,
+    user_prompt: str,
+    on_progress: Optional[Callable[[str], Awaitable[None]]] = None,
+    profile: str = DEFAULT_PROFILE,
+) -> str:
+    """
+    Send a chat request to Bedrock, streaming the response tokens.
+
+    The text generated so far is passed to on_progress at most every
+    ``config.llm_stream_flush_chunks`` chunks or
+    ``config.llm_stream_flush_interval_ms`` milliseconds, whichever comes first.
+    The complete response is never passed to on_progress, it is only returned
+    once the stream has finished. A
+    stream failing over to another endpoint restarts from the beginning.
+
+    Args:
+        system_prompt: System message content
+        user_prompt: User message content
+        on_progress: Optional coroutine receiving the partial response
+        profile: Name of the LLM profile in ``config.llm_profiles``
+
+    Returns:
+        LLM response content
+    """
+    if not config.llm_streaming_enabled:
+        return await chat_with_bedrock(system_prompt, user_prompt, profile)
+
+    with start_span("llm.stream", **{"llm.profile": profile}):
+        cache_keys = _cache_keys(system_prompt, user_prompt, profile)
+        cached = await _get_cached(cache_keys)
+        if cached is not None:
+            return cached
+
+        messages = _build_messages(system_prompt, user_prompt)
+
+        start = time.monotonic()
+        try:
+            (content, usage_metadata), model_id = await _guarded(
+                lambda: _with_failover(
+                    profile, lambda llm: _stream(llm, messages, on_progress)
+                ),
+                timed=False,
+            )
+        except Exception as e:
+            logger.error("Bedrock LLM streaming call failed: %s", e)
+            raise
+
+        record_llm_call(profile, usage_metadata, time.monotonic() - start)
+        _log_response(content)
+
+        await _put_cached(cache_keys, model_id, content)
+        return content
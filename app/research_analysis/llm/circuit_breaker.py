@@ -0,0 +1,218 @@
+"""Circuit breaker around the LLM provider."""
+
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from logging import getLogger
+from typing import Optional
+
+from app.common.metrics import counter, gauge, metrics_enabled
+from app.config import config
+
+logger = getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+
+TRANSITION_METRICS = {
+    CircuitState.OPEN: "LLMCircuitOpened",
+    CircuitState.HALF_OPEN: "LLMCircuitHalfOpened",
+    CircuitState.CLOSED: "LLMCircuitClosed",
+}
+
+# Values of the LLMCircuitState gauge
+STATE_GAUGE_VALUES = {
+    CircuitState.CLOSED: 0,
+    CircuitState.HALF_OPEN: 1,
+    CircuitState.OPEN: 2,
+}
+
+
+@dataclass(frozen=True)
+class Permit:
+    """Permission for one call, tagged with the breaker state it was granted in."""
+
+    state: CircuitState
+    generation: int
+
+
+class CircuitOpenError(Exception):
+    """Raised when the LLM provider stays unavailable for too long."""
+
+
+class CircuitBreaker:
+    """
+    Stop calling the LLM provider while it is failing or unusually slow.
+
+    While closed, the outcomes of the last ``window`` calls are tracked. Once
+    at least ``min_calls`` are recorded and the failure rate or slow-call rate
+    reaches its threshold, the circuit opens and calls wait instead of being
+    made. After ``open_seconds`` it turns half-open and lets
+    ``half_open_calls`` trial calls through: if they all succeed the circuit
+    closes, otherwise it opens again.
+
+    Every transition starts a new generation. The outcome of a call only
+    counts if its permit was granted in the current generation, so calls
+    still in flight when the circuit opens cannot close it again or use up
+    its trial slots.
+    """
+
+    def __init__(
+        self,
+        window: int,
+        min_calls: int,
+        failure_rate: float,
+        slow_call_seconds: float,
+        slow_call_rate: float,
+        open_seconds: float,
+        half_open_calls: int,
+    ):
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self._outcomes: deque[str] = deque(maxlen=window)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._trials_started = 0
+        self._trials_passed = 0
+        self._generation = 0
+        self._report_state()
+
+    @property
+    def state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and time.monotonic() - self._opened_at >= self.open_seconds
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def try_acquire(self) -> Optional[Permit]:
+        """Reserve permission for a call, returning None while open."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return Permit(state, self._generation)
+        if state == CircuitState.HALF_OPEN and self._trials_started < (
+            self.half_open_calls
+        ):
+            self._trials_started += 1
+            return Permit(state, self._generation)
+        return None
+
+    async def acquire(self, max_wait: float) -> Permit:
+        """
+        Wait until a call is permitted.
+
+        Returns:
+            Permit to pass back with the outcome of the call
+
+        Raises:
+            CircuitOpenError: If no call is permitted within max_wait seconds
+        """
+        deadline = time.monotonic() + max_wait
+        while (permit := self.try_acquire()) is None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                msg = "LLM provider unavailable: circuit breaker is open"
+                raise CircuitOpenError(msg)
+            reopen_in = self._opened_at + self.open_seconds - time.monotonic()
+            await asyncio.sleep(min(remaining, max(reopen_in, 0.1), 1.0))
+        return permit
+
+    def record_success(
+        self, seconds: Optional[float] = None, permit: Optional[Permit] = None
+    ):
+        """
+        Record a successful call, and whether it was slow if timed.
+
+        Args:
+            seconds: Latency of the call, None if it should not count as slow
+            permit: Permit of the call, None to count it in the current state
+        """
+        slow = seconds is not None and seconds >= self.slow_call_seconds
+        self._record("slow" if slow else "ok", permit)
+
+    def record_failure(self, permit: Optional[Permit] = None):
+        self._record("failed", permit)
+
+    def release(self, permit: Permit):
+        """Give back a permit whose call ended without an outcome."""
+        if (
+            permit.state == CircuitState.HALF_OPEN
+            and self._is_current(permit)
+            and self._trials_started
+        ):
+            self._trials_started -= 1
+
+    def _is_current(self, permit: Optional[Permit]) -> bool:
+        return permit is None or (
+            permit.generation == self._generation and permit.state == self._state
+        )
+
+    def _record(self, outcome: str, permit: Optional[Permit]):
+        if not self._is_current(permit):
+            return
+        if self._state == CircuitState.HALF_OPEN:
+            if outcome != "ok":
+                self._transition(CircuitState.OPEN)
+                return
+            self._trials_passed += 1
+            if self._trials_passed >= self.half_open_calls:
+                self._transition(CircuitState.CLOSED)
+            return
+        if self._state == CircuitState.OPEN:
+            return
+
+        self._outcomes.append(outcome)
+        if len(self._outcomes) < self.min_calls:
+            return
+        failed = self._outcomes.count("failed") / len(self._outcomes)
+        slow = self._outcomes.count("slow") / len(self._outcomes)
+        if failed >= self.failure_rate or slow >= self.slow_call_rate:
+            self._transition(CircuitState.OPEN)
+
+    def _transition(self, state: CircuitState):
+        logger.warning("LLM circuit breaker %s -> %s", self._state.value, state.value)
+        self._state = state
+        self._trials_started = 0
+        self._trials_passed = 0
+        self._generation += 1
+        if state == CircuitState.OPEN:
+            self._opened_at = time.monotonic()
+        if state == CircuitState.CLOSED:
+            self._outcomes.clear()
+        if metrics_enabled():
+            counter(TRANSITION_METRICS[state], 1)
+        self._report_state()
+
+    def _report_state(self):
+        if metrics_enabled():
+            gauge("LLMCircuitState", STATE_GAUGE_VALUES[self._state])
+
+
+_circuit_breaker: Optional[CircuitBreaker] = None
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Get the process-wide LLM circuit breaker."""
+    global _circuit_breaker
+    if _circuit_breaker is None:
+        _circuit_breaker = CircuitBreaker(
+            window=config.llm_circuit_window,
+            min_calls=config.llm_circuit_min_calls,
+            failure_rate=config.llm_circuit_failure_rate,
+            slow_call_seconds=config.llm_circuit_slow_call_seconds,
+            slow_call_rate=config.llm_circuit_slow_call_rate,
+            open_seconds=config.llm_circuit_open_seconds,
+            half_open_calls=config.llm_circuit_half_open_calls,
+        )
+    return _circuit_breaker
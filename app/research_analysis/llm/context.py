@@ -0,0 +1,22 @@
+import contextvars
+
+# Per-workflow LLM call settings. Background workflows run in their own task,
+# so values set at the start of a workflow apply to every LLM call it makes
+# (including those fanned out with asyncio.gather) without leaking elsewhere.
+ctx_llm_cache_bypass = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+# Response cache writes held back until the caller commits them, see
+# store_deferred_responses. None stores responses straight away.
+ctx_llm_cache_deferred = contextvars.ContextVar("llm_cache_deferred", default=None)
+
+# Usage recorder of the workflow node currently running, set by the node
+# wrappers so LLM calls can be attributed to the node that made them.
+ctx_llm_usage = contextvars.ContextVar("llm_usage", default=None)
+
+# Analysis the current workflow's LLM calls are scheduled for, see
+# SchedulingClass.
+ctx_llm_schedule = contextvars.ContextVar("llm_schedule", default=None)
+
+# Listener told when LLM calls of the current workflow pause and resume while
+# the circuit breaker is open, see PauseReporter.
+ctx_llm_pause_listener = contextvars.ContextVar("llm_pause_listener", default=None)
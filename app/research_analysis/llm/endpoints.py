@@ -0,0 +1,202 @@
+"""Weighted multi-region Bedrock endpoints with health-based routing."""
+
+import random
+import time
+from collections import deque
+from logging import getLogger
+from typing import Optional
+
+from botocore.exceptions import (
+    ClientError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    EndpointConnectionError,
+    ReadTimeoutError,
+)
+
+from app.common.metrics import counter, metrics_enabled
+from app.config import BedrockEndpoint, config
+
+logger = getLogger(__name__)
+
+THROTTLING_ERROR_CODES = {"ThrottlingException", "ServiceQuotaExceededException"}
+
+# Errors specific to one region, where another region may well succeed
+REGIONAL_ERROR_CODES = THROTTLING_ERROR_CODES | {
+    "InternalServerException",
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+    "ModelTimeoutException",
+}
+
+REGIONAL_CONNECTION_ERRORS = (
+    EndpointConnectionError,
+    ConnectionClosedError,
+    ConnectTimeoutError,
+    ReadTimeoutError,
+)
+
+# Weight multiplier floor, so a recovering endpoint still gets some traffic
+MIN_HEALTH = 0.05
+
+
+def _error_code(error: Exception) -> Optional[str]:
+    if isinstance(error, ClientError):
+        return error.response.get("Error", {}).get("Code")
+    return None
+
+
+def is_throttling_error(error: Exception) -> bool:
+    return _error_code(error) in THROTTLING_ERROR_CODES
+
+
+def is_regional_error(error: Exception) -> bool:
+    """Whether an error is worth retrying against another endpoint."""
+    return (
+        isinstance(error, REGIONAL_CONNECTION_ERRORS)
+        or _error_code(error) in REGIONAL_ERROR_CODES
+    )
+
+
+class EndpointState:
+    """Health and statistics of one Bedrock endpoint."""
+
+    def __init__(self, endpoint: BedrockEndpoint, window: int):
+        self.endpoint = endpoint
+        self.outcomes: deque[str] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.calls = 0
+        self.errors = 0
+        self.throttles = 0
+        self.latency_seconds = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.endpoint.name
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def failure_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return sum(outcome != "ok" for outcome in self.outcomes) / len(self.outcomes)
+
+    @property
+    def routing_weight(self) -> float:
+        return self.endpoint.weight * max(MIN_HEALTH, 1 - self.failure_rate)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "throttles": self.throttles,
+            "failure_rate": round(self.failure_rate, 3),
+            "mean_latency_seconds": round(self.latency_seconds / self.calls, 3)
+            if self.calls
+            else None,
+            "available": self.available,
+        }
+
+
+class EndpointPool:
+    """
+    Route Bedrock calls across weighted endpoints.
+
+    Endpoints are picked at random in proportion to their configured weight,
+    scaled down by their recent failure (error or throttling) rate. After
+    ``failure_threshold`` consecutive regional failures an endpoint is taken
+    out of rotation for ``cooldown_seconds``.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[BedrockEndpoint],
+        failure_threshold: int,
+        cooldown_seconds: float,
+        window: int = 50,
+    ):
+        self.endpoints = [EndpointState(endpoint, window) for endpoint in endpoints]
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+
+    def choose(self, exclude: frozenset[str] = frozenset()) -> Optional[EndpointState]:
+        """
+        Pick an endpoint for the next call.
+
+        Args:
+            exclude: Names of endpoints already tried for this call
+
+        Returns:
+            The chosen endpoint, or None if every endpoint has been tried
+        """
+        candidates = [state for state in self.endpoints if state.name not in exclude]
+        if not candidates:
+            return None
+        available = [state for state in candidates if state.available]
+        if not available:
+            # Everything is cooling down, so use whichever recovers first
+            return min(candidates, key=lambda state: state.cooldown_until)
+        weights = [state.routing_weight for state in available]
+        return random.choices(available, weights=weights)[0]  # noqa: S311
+
+    def record_success(self, state: EndpointState, seconds: float):
+        state.calls += 1
+        state.latency_seconds += seconds
+        state.outcomes.append("ok")
+        state.consecutive_failures = 0
+        _emit(state, "LLMEndpointCalls")
+
+    def record_failure(self, state: EndpointState, error: Exception):
+        state.calls += 1
+        throttled = is_throttling_error(error)
+        if throttled:
+            state.throttles += 1
+            state.outcomes.append("throttled")
+            _emit(state, "LLMEndpointThrottles")
+        else:
+            state.errors += 1
+            state.outcomes.append("error")
+            _emit(state, "LLMEndpointErrors")
+
+        if not is_regional_error(error):
+            return
+        state.consecutive_failures += 1
+        if state.consecutive_failures >= self.failure_threshold:
+            state.cooldown_until = time.monotonic() + self.cooldown_seconds
+            state.consecutive_failures = 0
+            logger.warning(
+                "Bedrock endpoint %s taken out of rotation for %ss",
+                state.name,
+                self.cooldown_seconds,
+            )
+
+    def stats(self) -> dict[str, dict]:
+        """Per-endpoint call statistics."""
+        return {state.name: state.stats() for state in self.endpoints}
+
+
+def _emit(state: EndpointState, metric_name: str):
+    if metrics_enabled():
+        counter(metric_name, 1, {"Endpoint": state.name})
+
+
+_endpoint_pool: Optional[EndpointPool] = None
+
+
+def get_endpoint_pool() -> EndpointPool:
+    """Get the endpoint pool, defaulting to the single configured region."""
+    global _endpoint_pool
+    if _endpoint_pool is None:
+        endpoints = config.bedrock_endpoints or [
+            BedrockEndpoint(region=config.bedrock_region)
+        ]
+        _endpoint_pool = EndpointPool(
+            endpoints,
+            failure_threshold=config.bedrock_endpoint_failure_threshold,
+            cooldown_seconds=config.bedrock_endpoint_cooldown_seconds,
+        )
+    return _endpoint_pool
@@ -0,0 +1,134 @@
+"""Hedged LLM requests to cut tail latency."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from logging import getLogger
+from typing import Optional, TypeVar
+
+from app.common.metrics import counter, metrics_enabled
+from app.config import config
+from app.research_analysis.llm.usage import record_hedged_call
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class RequestHedger:
+    """
+    Issue a duplicate request when the first one is slower than usual.
+
+    Latencies of completed calls are kept in a rolling window. Once the window
+    holds ``min_samples`` values, a call still running after the configured
+    latency percentile gets a duplicate and the first successful result wins;
+    the other call is cancelled. Duplicates are recorded as hedged_calls in
+    the usage of the current node.
+
+    Duplicates are paid for from a token bucket: every call adds
+    ``budget_ratio`` tokens (up to ``budget_burst``) and every duplicate
+    spends one, so hedging adds at most ``budget_ratio`` extra load in the
+    long run.
+    """
+
+    def __init__(
+        self,
+        percentile: float,
+        min_samples: int,
+        window: int,
+        budget_ratio: float,
+        budget_burst: float = 10,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.budget_ratio = budget_ratio
+        self.budget_burst = budget_burst
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.hedged_calls = 0
+        self.hedge_wins = 0
+        self._tokens = budget_burst
+
+    def hedge_delay(self) -> Optional[float]:
+        """Latency after which a call is hedged, or None while warming up."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        index = math.ceil(len(ordered) * self.percentile / 100) - 1
+        return ordered[min(max(index, 0), len(ordered) - 1)]
+
+    def _spend_budget(self) -> bool:
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    async def call(self, make_call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call, hedging it if it exceeds the latency percentile.
+
+        Args:
+            make_call: Function starting a new attempt of the call
+
+        Returns:
+            Result of the first attempt to succeed
+        """
+        self._tokens = min(self.budget_burst, self._tokens + self.budget_ratio)
+        delay = self.hedge_delay()
+        started = time.monotonic()
+        primary = asyncio.ensure_future(make_call())
+        attempts = {primary}
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done and self._spend_budget():
+                    self.hedged_calls += 1
+                    record_hedged_call()
+                    attempts.add(asyncio.ensure_future(make_call()))
+                    if metrics_enabled():
+                        counter("LLMHedgedRequests", 1)
+                    logger.debug("Hedging LLM call after %.3fs", delay)
+
+            winner = await _first_success(attempts)
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+        if winner is not primary:
+            self.hedge_wins += 1
+        # The latency of the call as a whole, so that a winning hedge does not
+        # record its own shorter time and pull the percentile down
+        self.latencies.append(time.monotonic() - started)
+        return winner.result()
+
+
+async def _first_success(attempts: set[asyncio.Future]) -> asyncio.Future:
+    """Wait for the first attempt to succeed, or raise the last error."""
+    pending = set(attempts)
+    error: Optional[BaseException] = None
+    while pending:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for attempt in done:
+            if attempt.exception() is None:
+                return attempt
+            error = attempt.exception()
+    raise error
+
+
+# Hedgers keyed by LLM profile, as latency differs between models and budgets
+_request_hedgers: dict[str, RequestHedger] = {}
+
+
+def get_request_hedger(profile: str) -> RequestHedger:
+    """Get the request hedger for an LLM profile."""
+    hedger = _request_hedgers.get(profile)
+    if hedger is None:
+        hedger = RequestHedger(
+            percentile=config.llm_hedging_percentile,
+            min_samples=config.llm_hedging_min_samples,
+            window=config.llm_hedging_window,
+            budget_ratio=config.llm_hedging_budget_ratio,
+        )
+        _request_hedgers[profile] = hedger
+    return hedger
@@ -0,0 +1,248 @@
+"""Persistent cache for deterministic LLM responses."""
+
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime, timezone
+from logging import getLogger
+from typing import Optional
+
+from pymongo import ASCENDING
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+from pymongo.errors import OperationFailure
+
+from app.common.metrics import counter, metrics_enabled
+from app.config import config
+
+logger = getLogger(__name__)
+
+CACHE_COLLECTION = "llm_response_cache"
+
+# Error code of create_index for an existing index with other options
+INDEX_OPTIONS_CONFLICT = 85
+
+
+class LLMResponseCache:
+    """
+    Content-hash keyed LLM response cache.
+
+    An in-memory LRU sits in front of a MongoDB collection. Mongo entries
+    expire through a TTL index, and every ``evict_every`` stores the oldest
+    entries are evicted if the collection has grown past
+    ``config.llm_cache_max_bytes``. Entries record the analyses whose calls
+    stored them, so purge_analysis can remove them when an analysis is
+    deleted. Cache failures are logged and never fail the LLM call.
+    """
+
+    def __init__(
+        self,
+        memory_max_entries: int,
+        memory_max_bytes: int,
+        max_bytes: int,
+        ttl_seconds: int,
+        evict_every: int = 1,
+    ):
+        self.memory_max_entries = memory_max_entries
+        self.memory_max_bytes = memory_max_bytes
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evict_every = evict_every
+        self.collection: Optional[AsyncCollection] = None
+        self.hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._memory_analyses: dict[str, str] = {}
+        self._memory_bytes = 0
+        self._stores_since_eviction = 0
+
+    @staticmethod
+    def make_key(
+        model_id: str, params: dict, system_prompt: str, user_prompt: str
+    ) -> str:
+        """Build the cache key from everything that determines the response."""
+        payload = json.dumps(
+            [model_id, params, system_prompt, user_prompt],
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def init_collection(self, db: AsyncDatabase):
+        """Attach the MongoDB collection and ensure its indexes exist."""
+        collection = db[CACHE_COLLECTION]
+        try:
+            await collection.create_index(
+                "created_at", expireAfterSeconds=self.ttl_seconds
+            )
+        except OperationFailure as e:
+            if e.code != INDEX_OPTIONS_CONFLICT:
+                raise
+            # LLM_CACHE_TTL_SECONDS changed since the index was created
+            await db.command(
+                "collMod",
+                CACHE_COLLECTION,
+                index={
+                    "keyPattern": {"created_at": 1},
+                    "expireAfterSeconds": self.ttl_seconds,
+                },
+            )
+            logger.info("LLM response cache TTL changed to %ss", self.ttl_seconds)
+        await collection.create_index("analysis_ids")
+        self.collection = collection
+        logger.info("LLM response cache collection initialised")
+
+    async def get(self, *keys: str) -> Optional[str]:
+        """
+        Look up a cached response, promoting Mongo hits into memory.
+
+        Args:
+            *keys: Keys of equally acceptable responses, such as the same
+                prompts sent to the models of different endpoints
+
+        Returns:
+            The response cached under the first key found, None on a miss
+        """
+        response = next((r for r in map(self._memory_get, keys) if r is not None), None)
+        if response is None and self.collection is not None:
+            try:
+                doc = await self.collection.find_one(
+                    {"_id": {"$in": list(keys)}}, {"response": 1}
+                )
+            except Exception as e:
+                logger.warning("LLM cache lookup failed: %s", e)
+                doc = None
+            if doc:
+                response = doc["response"]
+                self._memory_put(doc["_id"], response)
+
+        if response is None:
+            self.misses += 1
+            self._record("LLMCacheMiss")
+        else:
+            self.hits += 1
+            self._record("LLMCacheHit")
+        logger.debug("LLM cache hit rate: %.2f", self.hit_rate)
+        return response
+
+    async def put(self, key: str, response: str, analysis_id: Optional[str] = None):
+        """
+        Store a response in memory and in MongoDB.
+
+        Args:
+            key: Cache key, see make_key
+            response: Response to store
+            analysis_id: Analysis whose call produced the response, if any
+        """
+        self._memory_put(key, response, analysis_id)
+        if self.collection is None:
+            return
+
+        size = len(response.encode("utf-8"))
+        update = {
+            "$set": {
+                "response": response,
+                "size": size,
+                "created_at": datetime.now(timezone.utc),
+            }
+        }
+        if analysis_id is not None:
+            update["$addToSet"] = {"analysis_ids": analysis_id}
+        try:
+            await self.collection.update_one({"_id": key}, update, upsert=True)
+            # Sizing the collection scans it, so only check every few stores
+            self._stores_since_eviction += 1
+            if self._stores_since_eviction >= self.evict_every:
+                self._stores_since_eviction = 0
+                await self._evict()
+        except Exception as e:
+            logger.warning("LLM cache store failed: %s", e)
+
+    async def purge_analysis(self, analysis_id: str):
+        """
+        Remove the responses stored by the calls of an analysis.
+
+        Entries in the memory front of other replicas are only dropped as
+        they are evicted there.
+        """
+        for key, owner in list(self._memory_analyses.items()):
+            if owner == analysis_id:
+                self._memory_bytes -= len(self._memory.pop(key))
+                del self._memory_analyses[key]
+        if self.collection is None:
+            return
+        try:
+            result = await self.collection.delete_many({"analysis_ids": analysis_id})
+            logger.info(
+                "Purged %d LLM cache entries of analysis %s",
+                result.deleted_count,
+                analysis_id,
+            )
+        except Exception as e:
+            logger.warning("LLM cache purge for analysis %s failed: %s", analysis_id, e)
+
+    async def _evict(self):
+        """Delete the oldest entries while the collection exceeds max_bytes."""
+        totals = await self.collection.aggregate(
+            [{"$group": {"_id": None, "bytes": {"$sum": "$size"}}}]
+        )
+        total = next(iter(await totals.to_list(1)), {}).get("bytes", 0)
+        if total <= self.max_bytes:
+            return
+
+        evict_ids = []
+        cursor = self.collection.find({}, {"size": 1}).sort("created_at", ASCENDING)
+        async for doc in cursor:
+            if total <= self.max_bytes:
+                break
+            evict_ids.append(doc["_id"])
+            total -= doc.get("size", 0)
+        await self.collection.delete_many({"_id": {"$in": evict_ids}})
+        logger.info("Evicted %d LLM cache entries", len(evict_ids))
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        response = self._memory.get(key)
+        if response is not None:
+            self._memory.move_to_end(key)
+        return response
+
+    def _memory_put(self, key: str, response: str, analysis_id: Optional[str] = None):
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = response
+        self._memory_bytes += len(response)
+        if analysis_id is not None:
+            self._memory_analyses[key] = analysis_id
+        while self._memory and (
+            len(self._memory) > self.memory_max_entries
+            or self._memory_bytes > self.memory_max_bytes
+        ):
+            evicted_key, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._memory_analyses.pop(evicted_key, None)
+
+    def _record(self, metric_name: str):
+        if metrics_enabled():
+            counter(metric_name, 1)
+
+
+_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_response_cache() -> LLMResponseCache:
+    """Get LLM response cache instance."""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = LLMResponseCache(
+            memory_max_entries=config.llm_cache_memory_max_entries,
+            memory_max_bytes=config.llm_cache_memory_max_bytes,
+            max_bytes=config.llm_cache_max_bytes,
+            ttl_seconds=config.llm_cache_ttl_seconds,
+            evict_every=config.llm_cache_evict_every,
+        )
+    return _response_cache
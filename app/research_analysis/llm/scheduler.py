@@ -0,0 +1,139 @@
+"""Fair-share scheduling of LLM calls between analyses."""
+
+import asyncio
+import time
+from collections import deque
+from logging import getLogger
+from typing import NamedTuple, Optional
+
+from app.config import config
+
+logger = getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+
+
+class SchedulingClass(NamedTuple):
+    """Who an LLM call is made for, set per workflow in ``ctx_llm_schedule``."""
+
+    analysis_id: str
+    priority: bool = False
+    weight: float = 1.0
+
+
+class FairShareScheduler:
+    """
+    Limit concurrent LLM calls and share them fairly between analyses.
+
+    Up to ``max_concurrent`` calls run at once. Further calls queue per
+    analysis and free slots are handed out by deficit round-robin, so each
+    analysis with waiting calls gets slots in proportion to its weight no
+    matter how many calls it has queued. Analyses in the priority lane have
+    their weight multiplied by ``priority_weight``: they get a larger share,
+    but a steady flow of them cannot starve other analyses.
+    """
+
+    def __init__(self, max_concurrent: int, priority_weight: float = 1.0):
+        self.max_concurrent = max_concurrent
+        self.priority_weight = priority_weight
+        self._active = 0
+        self._queues: dict[str, deque[asyncio.Future]] = {}
+        self._weights: dict[str, float] = {}
+        self._deficits: dict[str, float] = {}
+        self._rotation: deque[str] = deque()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    async def acquire(self, scheduling: Optional[SchedulingClass] = None) -> float:
+        """
+        Wait for a call slot.
+
+        Args:
+            scheduling: Analysis the call is made for, None for other callers
+
+        Returns:
+            Seconds spent waiting in the queue
+        """
+        # Calls only queue while every slot is taken, see _dispatch
+        if self._active < self.max_concurrent:
+            self._active += 1
+            return 0.0
+
+        start = time.monotonic()
+        scheduling = scheduling or SchedulingClass(DEFAULT_TENANT)
+        future = asyncio.get_running_loop().create_future()
+        self._enqueue(scheduling, future)
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # A slot handed over just before cancellation must be given back
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+        return time.monotonic() - start
+
+    def release(self):
+        """Free a call slot and hand it to the next waiting call."""
+        self._active -= 1
+        self._dispatch()
+
+    def _enqueue(self, scheduling: SchedulingClass, future: asyncio.Future):
+        tenant = scheduling.analysis_id
+        queue = self._queues.get(tenant)
+        if queue is None:
+            queue = self._queues[tenant] = deque()
+            self._deficits[tenant] = 0.0
+            self._rotation.append(tenant)
+        self._weights[tenant] = scheduling.weight * (
+            self.priority_weight if scheduling.priority else 1.0
+        )
+        queue.append(future)
+
+    def _dispatch(self):
+        while self._active < self.max_concurrent:
+            future = self._next_waiter()
+            if future is None:
+                return
+            self._active += 1
+            future.set_result(None)
+
+    def _next_waiter(self) -> Optional[asyncio.Future]:
+        while self._rotation:
+            tenant = self._rotation[0]
+            queue = self._queues[tenant]
+            # Waiters whose call was cancelled are done already
+            while queue and queue[0].done():
+                queue.popleft()
+            if not queue:
+                self._rotation.popleft()
+                del self._queues[tenant], self._deficits[tenant]
+                del self._weights[tenant]
+                continue
+
+            if self._deficits[tenant] < 1:
+                self._deficits[tenant] += self._weights[tenant]
+                if self._deficits[tenant] < 1:
+                    self._rotation.rotate(-1)
+                    continue
+
+            self._deficits[tenant] -= 1
+            if self._deficits[tenant] < 1:
+                self._rotation.rotate(-1)
+            return queue.popleft()
+        return None
+
+
+_scheduler: Optional[FairShareScheduler] = None
+
+
+def get_llm_scheduler() -> FairShareScheduler:
+    """Get the process-wide LLM call scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = FairShareScheduler(
+            config.llm_max_concurrent_calls, config.llm_priority_weight
+        )
+    return _scheduler
@@ -0,0 +1,217 @@
+"""Tests for per-node LLM profiles and usage accounting in the Bedrock client."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from app.config import AppConfig, LLMProfile
+from app.research_analysis.llm import bedrock_client
+from app.research_analysis.llm.context import ctx_llm_usage
+from app.research_analysis.llm.usage import UsageRecorder, get_process_usage
+
+
+@pytest.fixture
+def profiles_config():
+    test_config = AppConfig(
+        bedrock_model_id="base-model",
+        llm_profiles={
+            "default": LLMProfile(),
+            "validate_pii": LLMProfile(
+                model_id="small-model", max_tokens=300, temperature=0, timeout=60
+            ),
+        },
+    )
+    with patch.object(bedrock_client, "config", test_config):
+        yield test_config
+
+
+@pytest.fixture
+def transport():
+    mock_transport = MagicMock()
+    with (
+        patch.object(bedrock_client, "_bedrock_llms", {}),
+        patch.object(
+            bedrock_client, "get_bedrock_transport", return_value=mock_transport
+        ),
+        patch.object(bedrock_client, "ChatBedrock") as chat_bedrock,
+    ):
+        yield mock_transport, chat_bedrock
+
+
+# Test Cases - Profiles
+def test_unknown_profile_falls_back_to_default():
+    # Given
+    test_config = AppConfig(llm_profiles={"default": LLMProfile(max_tokens=123)})
+
+    # When
+    profile = test_config.get_llm_profile("unknown_node")
+
+    # Then
+    assert profile.max_tokens == 123
+
+
+def test_default_profiles_give_validation_a_small_budget():
+    # Given / When
+    test_config = AppConfig()
+
+    # Then
+    assert test_config.get_llm_profile("validate_pii").max_tokens < (
+        test_config.get_llm_profile("findings_section").max_tokens
+    )
+
+
+# Test Cases - Clients
+def test_get_bedrock_llm_uses_profile_parameters(profiles_config, transport):
+    # Given
+    mock_transport, chat_bedrock = transport
+
+    # When
+    bedrock_client.get_bedrock_llm("validate_pii")
+
+    # Then
+    mock_transport.client.assert_called_once_with(profiles_config.bedrock_region, 60)
+    kwargs = chat_bedrock.call_args.kwargs
+    assert kwargs["model_id"] == "small-model"
+    assert kwargs["max_tokens"] == 300
+
+
+@pytest.mark.usefixtures("profiles_config")
+def test_get_bedrock_llm_caches_one_client_per_profile(transport):
+    # Given
+    _, chat_bedrock = transport
+
+    # When
+    first = bedrock_client.get_bedrock_llm("validate_pii")
+    second = bedrock_client.get_bedrock_llm("validate_pii")
+    bedrock_client.get_bedrock_llm("default")
+
+    # Then
+    assert first is second
+    assert chat_bedrock.call_count == 2
+    assert chat_bedrock.call_args.kwargs["model_id"] == "base-model"
+
+
+@pytest.mark.usefixtures("profiles_config")
+def test_cache_key_differs_between_profiles():
+    # Given / When
+    default_keys = bedrock_client._cache_keys("system", "user", "default")
+    validation_keys = bedrock_client._cache_keys("system", "user", "validate_pii")
+
+    # Then
+    assert set(default_keys.values()).isdisjoint(validation_keys.values())
+
+
+# Test Cases - Usage accounting
+@pytest.mark.asyncio
+async def test_chat_with_bedrock_records_usage_for_current_node():
+    # Given
+    llm = MagicMock()
+    llm.invoke = MagicMock(
+        return_value=AIMessage(
+            content="answer",
+            usage_metadata={
+                "input_tokens": 1000,
+                "output_tokens": 100,
+                "total_tokens": 1100,
+            },
+        )
+    )
+    recorder = UsageRecorder()
+    process_calls = get_process_usage().llm_calls
+    token = ctx_llm_usage.set(recorder)
+
+    # When
+    try:
+        with (
+            patch.object(bedrock_client.config, "llm_cache_enabled", False),
+            patch.object(bedrock_client, "get_bedrock_llm", return_value=llm),
+        ):
+            await bedrock_client.chat_with_bedrock("system", "user")
+    finally:
+        ctx_llm_usage.reset(token)
+
+    # Then: default prices are $0.003/1k input and $0.015/1k output tokens
+    assert recorder.llm_calls == 1
+    assert recorder.input_tokens == 1000
+    assert recorder.output_tokens == 100
+    assert recorder.cost_usd == pytest.approx(0.0045)
+    assert get_process_usage().llm_calls == process_calls + 1
+
+
+# Test Cases - Streaming progress
+class FakeStreamTransport:
+    """Transport relaying stub chunks, each taking chunk_ms on a fake clock."""
+
+    def __init__(self, chunk_ms: float):
+        self.chunk_ms = chunk_ms
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    async def stream(self, func, *args):
+        for chunk in func(*args):
+            self.now += self.chunk_ms / 1000
+            yield chunk
+
+
+async def stream_chunks(count: int, chunk_ms: float, flush_chunks: int):
+    llm = MagicMock()
+    llm.stream = MagicMock(
+        return_value=[AIMessageChunk(content=f"{i},") for i in range(count)]
+    )
+    fake = FakeStreamTransport(chunk_ms)
+    progress = []
+
+    async def on_progress(partial):
+        progress.append(partial)
+
+    with (
+        patch.object(bedrock_client.config, "llm_cache_enabled", False),
+        patch.object(bedrock_client.config, "llm_stream_flush_chunks", flush_chunks),
+        patch.object(bedrock_client.config, "llm_stream_flush_interval_ms", 1000),
+        patch.object(bedrock_client, "get_bedrock_llm", return_value=llm),
+        patch.object(bedrock_client, "get_bedrock_transport", return_value=fake),
+        patch.object(bedrock_client.time, "monotonic", fake.monotonic),
+    ):
+        content = await bedrock_client.stream_chat_with_bedrock(
+            "system", "user", on_progress=on_progress
+        )
+    return content, progress
+
+
+def text_of(count: int) -> str:
+    return "".join(f"{i}," for i in range(count))
+
+
+@pytest.mark.asyncio
+async def test_stream_progress_is_flushed_every_n_chunks():
+    # Given / When: 10 fast chunks, flushed every 3
+    content, progress = await stream_chunks(10, chunk_ms=1, flush_chunks=3)
+
+    # Then
+    assert content == text_of(10)
+    assert progress == [text_of(3), text_of(6), text_of(9)]
+
+
+@pytest.mark.asyncio
+async def test_stream_progress_is_flushed_every_interval():
+    # Given / When: 10 chunks of 400ms, flushed every second or 50 chunks
+    content, progress = await stream_chunks(10, chunk_ms=400, flush_chunks=50)
+
+    # Then: chunks arrive at 0.4s, 0.8s, 1.2s..., so a flush is due at the
+    # third, sixth and ninth, with the text before them
+    assert content == text_of(10)
+    assert progress == [text_of(2), text_of(5), text_of(8)]
+
+
+@pytest.mark.asyncio
+async def test_stream_complete_text_is_not_passed_as_progress():
+    # Given / When: every chunk is due a flush, the last one included
+    content, progress = await stream_chunks(6, chunk_ms=1, flush_chunks=1)
+
+    # Then: the complete text is only returned, for the caller to write once
+    assert progress == [text_of(n) for n in range(1, 6)]
+    assert content == text_of(6)
+    assert content not in progress
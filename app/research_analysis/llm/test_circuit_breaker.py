@@ -0,0 +1,244 @@
+"""Tests for the LLM circuit breaker."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+from langchain_core.messages import AIMessage
+
+from app.common import metrics
+from app.common.metrics import MetricsRegistry
+from app.research_analysis.llm import bedrock_client
+from app.research_analysis.llm.circuit_breaker import (
+    STATE_GAUGE_VALUES,
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+)
+from app.research_analysis.llm.context import ctx_llm_pause_listener
+
+OPEN_SECONDS = 0.2
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    options = {
+        "window": 10,
+        "min_calls": 4,
+        "failure_rate": 0.5,
+        "slow_call_seconds": 1.0,
+        "slow_call_rate": 0.75,
+        "open_seconds": OPEN_SECONDS,
+        "half_open_calls": 2,
+    }
+    return CircuitBreaker(**{**options, **kwargs})
+
+
+def open_breaker(breaker: CircuitBreaker):
+    for _ in range(4):
+        breaker.record_failure()
+
+
+# Test Cases - State transitions
+def test_opens_on_failure_rate():
+    # Given
+    breaker = make_breaker()
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    breaker.record_failure()
+
+    # When
+    breaker.record_failure()
+
+    # Then
+    assert breaker.state == CircuitState.OPEN
+    assert breaker.try_acquire() is None
+
+
+def test_opens_on_slow_call_rate():
+    # Given
+    breaker = make_breaker()
+
+    # When
+    for _ in range(3):
+        breaker.record_success(5.0)
+    breaker.record_success(0.1)
+
+    # Then
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_stays_closed_below_min_calls():
+    # Given
+    breaker = make_breaker()
+
+    # When
+    for _ in range(3):
+        breaker.record_failure()
+
+    # Then
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_half_open_trials_close_the_circuit():
+    # Given
+    breaker = make_breaker()
+    open_breaker(breaker)
+    time.sleep(OPEN_SECONDS)
+
+    # When: only the permitted trial calls get through
+    permits = [breaker.try_acquire() for _ in range(3)]
+    breaker.record_success(0.1, permits[0])
+    breaker.record_success(0.1, permits[1])
+
+    # Then
+    assert [permit is not None for permit in permits] == [True, True, False]
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_failed_trial_reopens_the_circuit():
+    # Given
+    breaker = make_breaker()
+    open_breaker(breaker)
+    time.sleep(OPEN_SECONDS)
+    permit = breaker.try_acquire()
+
+    # When
+    breaker.record_failure(permit)
+
+    # Then
+    assert breaker.state == CircuitState.OPEN
+
+
+# Test Cases - Permits
+def test_calls_in_flight_when_opened_do_not_close_the_circuit():
+    # Given: calls granted while closed are still running when it opens
+    breaker = make_breaker()
+    in_flight = [breaker.try_acquire() for _ in range(3)]
+    open_breaker(breaker)
+    time.sleep(OPEN_SECONDS)
+    trial = breaker.try_acquire()
+
+    # When: they succeed while the circuit is half-open
+    for permit in in_flight:
+        breaker.record_success(0.1, permit)
+
+    # Then: only the trial calls can close it
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.record_success(0.1, trial)
+    breaker.record_success(0.1, breaker.try_acquire())
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_releasing_a_stale_permit_frees_no_trial_slot():
+    # Given: both trial slots are taken
+    breaker = make_breaker()
+    in_flight = breaker.try_acquire()
+    open_breaker(breaker)
+    time.sleep(OPEN_SECONDS)
+    trials = [breaker.try_acquire(), breaker.try_acquire()]
+
+    # When: a call granted while closed is cancelled
+    breaker.release(in_flight)
+
+    # Then
+    assert None not in trials
+    assert breaker.try_acquire() is None
+
+
+def test_released_trial_permit_frees_its_slot():
+    # Given
+    breaker = make_breaker()
+    open_breaker(breaker)
+    time.sleep(OPEN_SECONDS)
+    trials = [breaker.try_acquire(), breaker.try_acquire()]
+
+    # When
+    breaker.release(trials[0])
+
+    # Then
+    assert breaker.try_acquire() is not None
+
+
+def test_state_is_reported_as_a_gauge():
+    # Given
+    registry = MetricsRegistry()
+    with (
+        patch.object(metrics.config, "enable_metrics", True),
+        patch.object(metrics, "_registry", registry),
+    ):
+        breaker = make_breaker()
+        closed = registry.gauges["LLMCircuitState"]
+
+        # When
+        open_breaker(breaker)
+
+    # Then
+    assert closed == STATE_GAUGE_VALUES[CircuitState.CLOSED]
+    assert registry.gauges["LLMCircuitState"] == STATE_GAUGE_VALUES[CircuitState.OPEN]
+
+
+@pytest.mark.asyncio
+async def test_acquire_gives_up_after_max_wait():
+    # Given
+    breaker = make_breaker(open_seconds=60)
+    open_breaker(breaker)
+
+    # When / Then
+    with pytest.raises(CircuitOpenError):
+        await breaker.acquire(max_wait=0.1)
+
+
+# Test Cases - Bedrock client
+@pytest.mark.asyncio
+async def test_calls_pause_while_open_and_resume_when_half_open():
+    # Given: an open circuit and a workflow listening for pauses
+    breaker = make_breaker()
+    open_breaker(breaker)
+    listener = MagicMock(paused=AsyncMock(), resumed=AsyncMock())
+    llm = MagicMock()
+    llm.invoke = MagicMock(return_value=AIMessage(content="answer"))
+    token = ctx_llm_pause_listener.set(listener)
+
+    # When
+    try:
+        with (
+            patch.object(bedrock_client.config, "llm_cache_enabled", False),
+            patch.object(bedrock_client, "get_bedrock_llm", return_value=llm),
+            patch.object(bedrock_client, "get_circuit_breaker", return_value=breaker),
+        ):
+            start = time.monotonic()
+            answer = await bedrock_client.chat_with_bedrock("system", "user")
+    finally:
+        ctx_llm_pause_listener.reset(token)
+
+    # Then: the call waited for the open period instead of failing
+    assert answer == "answer"
+    assert time.monotonic() - start >= OPEN_SECONDS * 0.9
+    listener.paused.assert_awaited_once()
+    listener.resumed.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_provider_errors_trip_the_breaker():
+    # Given
+    breaker = make_breaker(min_calls=2)
+    llm = MagicMock()
+    llm.invoke = MagicMock(
+        side_effect=ClientError(
+            {"Error": {"Code": "ServiceUnavailableException"}}, "Converse"
+        )
+    )
+
+    # When
+    with (
+        patch.object(bedrock_client.config, "llm_cache_enabled", False),
+        patch.object(bedrock_client, "get_bedrock_llm", return_value=llm),
+        patch.object(bedrock_client, "get_circuit_breaker", return_value=breaker),
+    ):
+        for _ in range(2):
+            with pytest.raises(ClientError):
+                await bedrock_client.chat_with_bedrock("system", "user")
+
+    # Then
+    assert breaker.state == CircuitState.OPEN
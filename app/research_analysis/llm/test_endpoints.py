@@ -0,0 +1,202 @@
+"""Tests for multi-region Bedrock routing and failover with stub endpoints."""
+
+from collections import Counter
+from unittest.mock import patch
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from langchain_core.messages import AIMessage
+
+from app.common.metrics import MetricsRegistry
+from app.config import BedrockEndpoint
+from app.metrics.router import router as metrics_router
+from app.research_analysis.llm import bedrock_client, endpoints
+from app.research_analysis.llm.endpoints import EndpointPool
+
+PRIMARY = BedrockEndpoint(region="eu-central-1", weight=3)
+SECONDARY = BedrockEndpoint(region="eu-west-1", weight=1)
+
+
+def client_error(code: str) -> ClientError:
+    return ClientError({"Error": {"Code": code, "Message": code}}, "Converse")
+
+
+class StubEndpoint:
+    """Stub ChatBedrock for one region, optionally failing every call."""
+
+    def __init__(self, region: str, error: Exception = None):
+        self.region = region
+        self.error = error
+        self.calls = 0
+
+    def invoke(self, _messages):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return AIMessage(content=f"answer from {self.region}")
+
+
+@pytest.fixture
+def pool():
+    return EndpointPool([PRIMARY, SECONDARY], failure_threshold=2, cooldown_seconds=60)
+
+
+def use_stubs(pool: EndpointPool, *stubs: StubEndpoint):
+    by_region = {stub.region: stub for stub in stubs}
+
+    def get_llm(_profile, endpoint):
+        return by_region[endpoint.region]
+
+    return (
+        patch.object(bedrock_client.config, "llm_cache_enabled", False),
+        patch.object(bedrock_client, "get_endpoint_pool", return_value=pool),
+        patch.object(bedrock_client, "get_bedrock_llm", side_effect=get_llm),
+    )
+
+
+async def chat(pool: EndpointPool, *stubs: StubEndpoint) -> str:
+    cache, endpoint_pool, llm = use_stubs(pool, *stubs)
+    with cache, endpoint_pool, llm:
+        return await bedrock_client.chat_with_bedrock("system", "user")
+
+
+# Test Cases - Routing
+def test_calls_are_spread_by_weight(pool):
+    # Given / When
+    picks = Counter(pool.choose().name for _ in range(2000))
+
+    # Then: roughly 3:1
+    assert 2.4 < picks["eu-central-1"] / picks["eu-west-1"] < 3.8
+
+
+def test_throttled_endpoint_gets_less_traffic(pool):
+    # Given: the primary region is throttling most calls
+    primary = pool.endpoints[0]
+    for _ in range(9):
+        pool.record_failure(primary, client_error("ThrottlingException"))
+        primary.consecutive_failures = 0
+    pool.record_success(primary, 0.1)
+
+    # When
+    picks = Counter(pool.choose().name for _ in range(2000))
+
+    # Then
+    assert picks["eu-west-1"] > picks["eu-central-1"]
+    assert pool.stats()["eu-central-1"]["throttles"] == 9
+
+
+def test_failing_endpoint_is_taken_out_of_rotation(pool):
+    # Given
+    primary = pool.endpoints[0]
+
+    # When
+    for _ in range(2):
+        pool.record_failure(primary, client_error("ServiceUnavailableException"))
+
+    # Then
+    assert not primary.available
+    assert {pool.choose().name for _ in range(100)} == {"eu-west-1"}
+
+
+def test_endpoint_metrics_carry_an_endpoint_dimension(pool):
+    # Given
+    registry = MetricsRegistry()
+
+    # When
+    with (
+        patch.object(endpoints.config, "enable_metrics", True),
+        patch("app.common.metrics._registry", registry),
+    ):
+        pool.record_success(pool.endpoints[0], 0.1)
+        pool.record_failure(pool.endpoints[1], client_error("ThrottlingException"))
+
+    # Then: one metric per outcome, not per endpoint
+    assert registry.counters == {
+        ("LLMEndpointCalls", (("Endpoint", "eu-central-1"),)): 1,
+        ("LLMEndpointThrottles", (("Endpoint", "eu-west-1"),)): 1,
+    }
+
+
+def test_endpoint_metrics_are_scraped_with_only_prometheus_enabled(pool):
+    # Given: EMF flushing off, Prometheus scraping on
+    registry = MetricsRegistry()
+    app = FastAPI()
+    app.include_router(metrics_router)
+
+    # When
+    with (
+        patch.object(endpoints.config, "enable_metrics", False),
+        patch.object(endpoints.config, "metrics_prometheus_enabled", True),
+        patch("app.common.metrics._registry", registry),
+    ):
+        pool.record_success(pool.endpoints[0], 0.1)
+        response = TestClient(app).get("/metrics")
+
+    # Then
+    assert 'LLMEndpointCalls_total{Endpoint="eu-central-1"} 1' in response.text
+
+
+# Test Cases - Failover
+@pytest.mark.asyncio
+async def test_regional_error_fails_over_to_other_endpoint(pool):
+    # Given
+    down = StubEndpoint("eu-central-1", EndpointConnectionError(endpoint_url="x"))
+    healthy = StubEndpoint("eu-west-1")
+
+    # When: the weighted pick lands on the primary region first
+    with patch(
+        "app.research_analysis.llm.endpoints.random.choices",
+        side_effect=lambda candidates, **_: candidates[:1],
+    ):
+        answer = await chat(pool, down, healthy)
+
+    # Then
+    assert answer == "answer from eu-west-1"
+    assert down.calls == 1
+    assert pool.stats()["eu-central-1"]["errors"] == 1
+    assert pool.stats()["eu-west-1"]["calls"] == 1
+
+
+@pytest.mark.asyncio
+async def test_non_regional_error_is_not_retried(pool):
+    # Given: a bad request fails the same way in every region
+    invalid = client_error("ValidationException")
+    primary = StubEndpoint("eu-central-1", invalid)
+    secondary = StubEndpoint("eu-west-1", invalid)
+
+    # When / Then
+    with pytest.raises(ClientError):
+        await chat(pool, primary, secondary)
+    assert primary.calls + secondary.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_error_raised_when_every_endpoint_fails(pool):
+    # Given
+    throttled = client_error("ThrottlingException")
+
+    # When / Then
+    with pytest.raises(ClientError):
+        await chat(
+            pool,
+            StubEndpoint("eu-central-1", throttled),
+            StubEndpoint("eu-west-1", throttled),
+        )
+
+
+@pytest.mark.asyncio
+async def test_error_raised_when_endpoints_share_a_name():
+    # Given: two endpoints for the same region, without a model id
+    pool = EndpointPool(
+        [PRIMARY, BedrockEndpoint(region="eu-central-1")],
+        failure_threshold=2,
+        cooldown_seconds=60,
+    )
+    down = StubEndpoint("eu-central-1", client_error("ServiceUnavailableException"))
+
+    # When / Then: the Bedrock error is raised once the name has been tried
+    with pytest.raises(ClientError):
+        await chat(pool, down)
+    assert down.calls == 1
@@ -0,0 +1,228 @@
+"""Tests for hedged LLM requests against a heavy-tailed stub model."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.research_analysis.llm import bedrock_client
+from app.research_analysis.llm.context import ctx_llm_usage
+from app.research_analysis.llm.hedging import RequestHedger
+from app.research_analysis.llm.scheduler import FairShareScheduler
+from app.research_analysis.llm.usage import UsageRecorder
+
+FAST = 0.01
+SLOW = 1.0
+
+
+class HeavyTailedModel:
+    """Stub model where every tenth call is a hundred times slower."""
+
+    def __init__(self, fail_first=False):
+        self.calls = 0
+        self.cancelled = 0
+        self.fail_first = fail_first
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        call = self.calls
+        try:
+            if self.fail_first and call == 1:
+                await asyncio.sleep(FAST * 1.5)
+                msg = "throttled"
+                raise RuntimeError(msg)
+            await asyncio.sleep(SLOW if call % 10 == 0 else FAST)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return f"response {call}"
+
+
+def make_hedger(**kwargs) -> RequestHedger:
+    options = {
+        "percentile": 90,
+        "min_samples": 5,
+        "window": 50,
+        "budget_ratio": 0.1,
+    }
+    return RequestHedger(**{**options, **kwargs})
+
+
+def warm_up(hedger: RequestHedger, samples: int = 5):
+    for _ in range(samples):
+        hedger.latencies.append(FAST)
+
+
+# Test Cases - Hedge delay
+def test_hedge_delay_is_none_while_warming_up():
+    # Given
+    hedger = make_hedger()
+    hedger.latencies.extend([FAST] * 4)
+
+    # When / Then
+    assert hedger.hedge_delay() is None
+
+
+def test_hedge_delay_uses_latency_percentile():
+    # Given
+    hedger = make_hedger()
+    hedger.latencies.extend([0.1 * i for i in range(1, 11)])
+
+    # When / Then
+    assert hedger.hedge_delay() == pytest.approx(0.9)
+
+
+# Test Cases - Hedged calls
+@pytest.mark.asyncio
+async def test_winning_hedge_records_latency_of_the_whole_call():
+    # Given: the primary hangs, so the hedge started after 0.1s wins
+    hedger = make_hedger(min_samples=1, budget_ratio=1)
+    hedger.latencies.append(0.1)
+    calls = 0
+
+    async def make_call():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(SLOW if calls == 1 else FAST)
+        return calls
+
+    # When
+    result = await hedger.call(make_call)
+
+    # Then: the sample covers the hedge delay, not only the hedge's own time
+    assert result == 2
+    assert hedger.hedge_wins == 1
+    assert hedger.latencies[-1] >= 0.1 + FAST
+
+
+@pytest.mark.asyncio
+async def test_heavy_tail_is_cut_by_hedging():
+    # Given: 30 calls with a 1s response every tenth call
+    model = HeavyTailedModel()
+    hedger = make_hedger(budget_ratio=0.2)
+
+    # When
+    start = time.monotonic()
+    results = [await hedger.call(model) for _ in range(30)]
+    elapsed = time.monotonic() - start
+
+    # Then: slow calls were duplicated instead of waited for
+    assert len(results) == 30
+    assert hedger.hedged_calls == 3
+    assert hedger.hedge_wins == 3
+    assert model.cancelled == 3
+    assert elapsed < SLOW
+
+
+@pytest.mark.asyncio
+async def test_hedging_stops_when_budget_is_spent():
+    # Given: no budget at all
+    model = HeavyTailedModel()
+    hedger = make_hedger(budget_ratio=0, budget_burst=0)
+    warm_up(hedger)
+    model.calls = 9
+
+    # When: the next call is slow
+    start = time.monotonic()
+    result = await hedger.call(model)
+
+    # Then
+    assert result == "response 10"
+    assert hedger.hedged_calls == 0
+    assert time.monotonic() - start >= SLOW
+
+
+@pytest.mark.asyncio
+async def test_hedge_result_used_when_primary_fails():
+    # Given: the first attempt fails just after the hedge is issued
+    model = HeavyTailedModel(fail_first=True)
+    hedger = make_hedger()
+    warm_up(hedger)
+
+    # When
+    result = await hedger.call(model)
+
+    # Then
+    assert result == "response 2"
+    assert hedger.hedge_wins == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_with_bedrock_hedges_slow_invoke():
+    # Given: a blocking model whose first call hangs
+    delays = iter([SLOW, FAST])
+
+    def invoke(_messages):
+        time.sleep(next(delays))
+        return AIMessage(content="answer")
+
+    llm = MagicMock()
+    llm.invoke = invoke
+    hedger = make_hedger()
+    warm_up(hedger)
+
+    # When
+    with (
+        patch.object(bedrock_client.config, "llm_cache_enabled", False),
+        patch.object(bedrock_client.config, "llm_hedging_enabled", True),
+        patch.object(bedrock_client, "get_bedrock_llm", return_value=llm),
+        patch.object(bedrock_client, "get_request_hedger", return_value=hedger),
+    ):
+        start = time.monotonic()
+        answer = await bedrock_client.chat_with_bedrock("system", "user")
+
+    # Then
+    assert answer == "answer"
+    assert hedger.hedge_wins == 1
+    assert time.monotonic() - start < SLOW
+
+
+@pytest.mark.asyncio
+async def test_hedge_takes_a_slot_and_losing_attempt_usage_is_recorded():
+    # Given: a blocking model whose first call hangs, and one usage recorder
+    delays = iter([SLOW, FAST])
+    usage = {"input_tokens": 100, "output_tokens": 10, "total_tokens": 110}
+    returned = threading.Event()
+
+    def invoke(_messages):
+        delay = next(delays)
+        time.sleep(delay)
+        if delay == SLOW:
+            returned.set()
+        return AIMessage(content="answer", usage_metadata=usage)
+
+    llm = MagicMock()
+    llm.invoke = invoke
+    hedger = make_hedger()
+    warm_up(hedger)
+    scheduler = FairShareScheduler(max_concurrent=10)
+    recorder = UsageRecorder()
+    ctx_llm_usage.set(recorder)
+
+    # When
+    with (
+        patch.object(bedrock_client.config, "llm_cache_enabled", False),
+        patch.object(bedrock_client.config, "llm_hedging_enabled", True),
+        patch.object(bedrock_client.config, "llm_scheduler_enabled", True),
+        patch.object(bedrock_client.config, "llm_circuit_breaker_enabled", False),
+        patch.object(bedrock_client, "get_bedrock_llm", return_value=llm),
+        patch.object(bedrock_client, "get_request_hedger", return_value=hedger),
+        patch.object(bedrock_client, "get_llm_scheduler", return_value=scheduler),
+    ):
+        await bedrock_client.chat_with_bedrock("system", "user")
+
+        # Then: the losing attempt holds its own slot until its call returns
+        assert recorder.hedged_calls == 1
+        assert scheduler.active == 1
+        await asyncio.to_thread(returned.wait, 5)
+        for _ in range(100):
+            if scheduler.active == 0:
+                break
+            await asyncio.sleep(0.01)
+
+    assert scheduler.active == 0
+    assert recorder.llm_calls == 2
+    assert recorder.input_tokens == 200
@@ -0,0 +1,223 @@
+"""Tests for the LLM response cache and its use in chat_with_bedrock."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+from langchain_core.messages import AIMessage
+from pymongo.errors import OperationFailure
+
+from app.config import BedrockEndpoint
+from app.research_analysis.llm import bedrock_client
+from app.research_analysis.llm.context import ctx_llm_cache_bypass
+from app.research_analysis.llm.endpoints import EndpointPool
+from app.research_analysis.llm.response_cache import (
+    INDEX_OPTIONS_CONFLICT,
+    LLMResponseCache,
+)
+
+
+@pytest.fixture
+def cache():
+    return LLMResponseCache(
+        memory_max_entries=2, memory_max_bytes=1000, max_bytes=1000, ttl_seconds=60
+    )
+
+
+@pytest.fixture
+def mock_llm():
+    llm = MagicMock()
+    llm.invoke = MagicMock(return_value=AIMessage(content="cleaned transcript"))
+    with patch.object(bedrock_client, "get_bedrock_llm", return_value=llm):
+        yield llm
+
+
+# Test Cases - Keys
+def test_make_key_depends_on_every_input():
+    # Given
+    base = ("model", {"temperature": 0}, "system", "user")
+
+    # When
+    key = LLMResponseCache.make_key(*base)
+
+    # Then
+    assert key == LLMResponseCache.make_key(*base)
+    assert key != LLMResponseCache.make_key("other", *base[1:])
+    assert key != LLMResponseCache.make_key(base[0], {"temperature": 1}, *base[2:])
+    assert key != LLMResponseCache.make_key(*base[:3], "other user")
+
+
+# Test Cases - Memory front
+@pytest.mark.asyncio
+async def test_memory_lru_evicts_least_recently_used(cache):
+    # Given
+    await cache.put("a", "1")
+    await cache.put("b", "2")
+    await cache.get("a")
+
+    # When
+    await cache.put("c", "3")
+
+    # Then
+    assert await cache.get("a") == "1"
+    assert await cache.get("b") is None
+    assert await cache.get("c") == "3"
+
+
+@pytest.mark.asyncio
+async def test_mongo_hit_promoted_to_memory(cache):
+    # Given
+    cache.collection = MagicMock()
+    cache.collection.find_one = AsyncMock(
+        return_value={"_id": "key", "response": "stored"}
+    )
+
+    # When
+    first = await cache.get("key")
+    second = await cache.get("key")
+
+    # Then
+    assert first == second == "stored"
+    cache.collection.find_one.assert_awaited_once()
+    assert cache.hit_rate == 1.0
+
+
+@pytest.mark.asyncio
+async def test_mongo_size_is_checked_every_few_stores():
+    # Given: the collection holds 1200 bytes, over the 1000 byte cap
+    cache = LLMResponseCache(
+        memory_max_entries=2,
+        memory_max_bytes=1000,
+        max_bytes=1000,
+        ttl_seconds=60,
+        evict_every=3,
+    )
+    totals = MagicMock()
+    totals.to_list = AsyncMock(return_value=[{"bytes": 1200}])
+    oldest = MagicMock()
+    oldest.sort.return_value.__aiter__.return_value = [
+        {"_id": "old", "size": 300},
+        {"_id": "new", "size": 900},
+    ]
+    cache.collection = MagicMock()
+    cache.collection.update_one = AsyncMock()
+    cache.collection.aggregate = AsyncMock(return_value=totals)
+    cache.collection.find.return_value = oldest
+    cache.collection.delete_many = AsyncMock()
+
+    # When
+    for key in ("a", "b", "c", "d", "e"):
+        await cache.put(key, "response")
+
+    # Then: one size check for five stores, evicting the oldest entry only
+    cache.collection.aggregate.assert_awaited_once()
+    cache.collection.delete_many.assert_awaited_once_with({"_id": {"$in": ["old"]}})
+
+
+@pytest.mark.asyncio
+async def test_changed_ttl_is_applied_to_the_existing_index(cache):
+    # Given: the TTL index exists with another expiry
+    collection = MagicMock()
+    collection.create_index = AsyncMock(
+        side_effect=[OperationFailure("conflict", code=INDEX_OPTIONS_CONFLICT), None]
+    )
+    db = MagicMock()
+    db.__getitem__.return_value = collection
+    db.command = AsyncMock()
+
+    # When
+    await cache.init_collection(db)
+
+    # Then
+    db.command.assert_awaited_once_with(
+        "collMod",
+        "llm_response_cache",
+        index={"keyPattern": {"created_at": 1}, "expireAfterSeconds": 60},
+    )
+    assert cache.collection is collection
+
+
+@pytest.mark.asyncio
+async def test_purge_removes_the_responses_of_an_analysis(cache):
+    # Given
+    cache.collection = MagicMock()
+    cache.collection.update_one = AsyncMock()
+    cache.collection.delete_many = AsyncMock()
+    cache.evict_every = 10
+    await cache.put("deleted", "response", analysis_id="a")
+    await cache.put("kept", "response", analysis_id="b")
+
+    # When
+    await cache.purge_analysis("a")
+
+    # Then
+    assert list(cache._memory) == ["kept"]  # noqa: SLF001
+    update = cache.collection.update_one.await_args_list[0].args[1]
+    assert update["$addToSet"] == {"analysis_ids": "a"}
+    cache.collection.delete_many.assert_awaited_once_with({"analysis_ids": "a"})
+
+
+# Test Cases - chat_with_bedrock
+@pytest.mark.asyncio
+async def test_chat_with_bedrock_repeat_call_served_from_cache(cache, mock_llm):
+    # Given
+    with patch.object(bedrock_client, "get_response_cache", return_value=cache):
+        # When
+        first = await bedrock_client.chat_with_bedrock("system", "user")
+        second = await bedrock_client.chat_with_bedrock("system", "user")
+
+    # Then
+    assert first == second == "cleaned transcript"
+    mock_llm.invoke.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_chat_with_bedrock_bypass_skips_cache(cache, mock_llm):
+    # Given
+    token = ctx_llm_cache_bypass.set(True)
+    try:
+        with patch.object(bedrock_client, "get_response_cache", return_value=cache):
+            # When
+            await bedrock_client.chat_with_bedrock("system", "user")
+            await bedrock_client.chat_with_bedrock("system", "user")
+    finally:
+        ctx_llm_cache_bypass.reset(token)
+
+    # Then
+    assert mock_llm.invoke.call_count == 2
+    assert cache.hits == cache.misses == 0
+
+
+@pytest.mark.asyncio
+async def test_response_is_cached_under_the_model_that_generated_it(cache):
+    # Given: endpoints calling different models, one of them throttled
+    pool = EndpointPool(
+        [
+            BedrockEndpoint(region="eu-central-1", model_id="model-a"),
+            BedrockEndpoint(region="eu-west-1", model_id="model-b"),
+        ],
+        failure_threshold=2,
+        cooldown_seconds=60,
+    )
+    throttled = ClientError({"Error": {"Code": "ThrottlingException"}}, "Converse")
+
+    def get_llm(_profile, endpoint):
+        llm = MagicMock()
+        if endpoint.model_id == "model-b":
+            llm.invoke = MagicMock(side_effect=throttled)
+        else:
+            llm.invoke = MagicMock(return_value=AIMessage(content="from model a"))
+        return llm
+
+    # When
+    with (
+        patch.object(bedrock_client.config, "llm_cache_enabled", True),
+        patch.object(bedrock_client, "get_response_cache", return_value=cache),
+        patch.object(bedrock_client, "get_endpoint_pool", return_value=pool),
+        patch.object(bedrock_client, "get_bedrock_llm", side_effect=get_llm),
+    ):
+        await bedrock_client.chat_with_bedrock("system", "user")
+        keys = bedrock_client._cache_keys("system", "user", "default")
+
+    # Then
+    assert cache._memory == {keys["model-a"]: "from model a"}  # noqa: SLF001
@@ -0,0 +1,145 @@
+"""Tests for fair-share scheduling of LLM calls."""
+
+import asyncio
+
+import pytest
+
+from app.research_analysis.llm.scheduler import FairShareScheduler, SchedulingClass
+
+LARGE = SchedulingClass("large-study")
+SMALL = SchedulingClass("small-study")
+
+
+async def run_calls(scheduler: FairShareScheduler, calls: list[SchedulingClass]):
+    """Queue calls behind a held slot and return the order they are served in."""
+    served = []
+
+    async def call(scheduling: SchedulingClass):
+        await scheduler.acquire(scheduling)
+        served.append(scheduling.analysis_id)
+        await asyncio.sleep(0)
+        scheduler.release()
+
+    await scheduler.acquire()
+    tasks = [asyncio.create_task(call(scheduling)) for scheduling in calls]
+    await asyncio.sleep(0)
+    scheduler.release()
+    await asyncio.gather(*tasks)
+    return served
+
+
+# Test Cases - Fair share
+@pytest.mark.asyncio
+async def test_small_analysis_is_not_starved_by_large_one():
+    # Given: a large study queues 6 calls before a small one queues 2
+    scheduler = FairShareScheduler(max_concurrent=1)
+
+    # When
+    served = await run_calls(scheduler, [LARGE] * 6 + [SMALL] * 2)
+
+    # Then: slots alternate while both have calls waiting
+    assert served[:4] == ["large-study", "small-study"] * 2
+
+
+@pytest.mark.asyncio
+async def test_weights_share_slots_proportionally():
+    # Given
+    scheduler = FairShareScheduler(max_concurrent=1)
+    heavy = SchedulingClass("heavy", weight=2)
+
+    # When
+    served = await run_calls(scheduler, [heavy] * 6 + [SMALL] * 3)
+
+    # Then
+    assert served[:6] == ["heavy", "heavy", "small-study"] * 2
+
+
+@pytest.mark.asyncio
+async def test_priority_lane_gets_a_larger_share():
+    # Given
+    scheduler = FairShareScheduler(max_concurrent=1, priority_weight=4)
+    interactive = SchedulingClass("interactive", priority=True)
+
+    # When
+    served = await run_calls(scheduler, [LARGE] * 3 + [interactive] * 8)
+
+    # Then
+    assert served[:10] == (["large-study"] + ["interactive"] * 4) * 2
+
+
+@pytest.mark.asyncio
+async def test_stream_of_priority_analyses_does_not_starve_large_one():
+    # Given: every served call brings in a new small priority analysis
+    scheduler = FairShareScheduler(max_concurrent=1, priority_weight=4)
+    served = []
+    tasks = []
+
+    async def call(scheduling: SchedulingClass):
+        await scheduler.acquire(scheduling)
+        served.append(scheduling.analysis_id)
+        if len(served) < 40:
+            small = SchedulingClass(f"small-{len(served)}", priority=True)
+            tasks.append(asyncio.create_task(call(small)))
+        await asyncio.sleep(0)
+        scheduler.release()
+
+    # When
+    await scheduler.acquire()
+    for scheduling in [LARGE] * 3 + [SchedulingClass("small", priority=True)] * 4:
+        tasks.append(asyncio.create_task(call(scheduling)))
+    await asyncio.sleep(0)
+    scheduler.release()
+    while not all(task.done() for task in tasks):
+        await asyncio.gather(*tasks)
+
+    # Then: the large study keeps getting slots while small ones arrive
+    large_turns = [i for i, analysis in enumerate(served) if analysis == LARGE[0]]
+    assert len(large_turns) == 3
+    assert large_turns[-1] < 30
+
+
+# Test Cases - Slots
+@pytest.mark.asyncio
+async def test_calls_run_immediately_while_slots_are_free():
+    # Given
+    scheduler = FairShareScheduler(max_concurrent=2)
+
+    # When
+    waits = [await scheduler.acquire(LARGE), await scheduler.acquire(SMALL)]
+
+    # Then
+    assert waits == [0.0, 0.0]
+    assert scheduler.active == 2
+
+
+@pytest.mark.asyncio
+async def test_queue_wait_is_reported():
+    # Given
+    scheduler = FairShareScheduler(max_concurrent=1)
+    await scheduler.acquire(LARGE)
+    waiter = asyncio.create_task(scheduler.acquire(SMALL))
+
+    # When
+    await asyncio.sleep(0.1)
+    scheduler.release()
+
+    # Then
+    assert await waiter >= 0.09
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_keep_a_slot():
+    # Given
+    scheduler = FairShareScheduler(max_concurrent=1)
+    await scheduler.acquire(LARGE)
+    cancelled = asyncio.create_task(scheduler.acquire(SMALL))
+    waiting = asyncio.create_task(scheduler.acquire(LARGE))
+    await asyncio.sleep(0)
+
+    # When
+    cancelled.cancel()
+    scheduler.release()
+    await waiting
+
+    # Then
+    assert scheduler.active == 1
@@ -0,0 +1,159 @@
+"""Sized connection pool and executor for Bedrock calls."""
+
+import asyncio
+import contextvars
+import threading
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+from logging import getLogger
+from typing import Any, Optional, TypeVar
+
+import boto3
+from botocore.config import Config
+
+from app.config import config
+
+logger = getLogger(__name__)
+
+T = TypeVar("T")
+
+_STREAM_DONE = object()
+
+
+class BedrockTransport:
+    """
+    Bedrock runtime clients and the thread pool their blocking calls run on.
+
+    ChatBedrock's async methods fall back to the event loop's default executor
+    (``min(32, cpu_count + 4)`` threads) and botocore's default pool of 10
+    connections, which silently caps concurrency well below what the
+    workflow's ``asyncio.gather`` calls ask for. The transport sizes both
+    explicitly from configuration.
+    """
+
+    def __init__(self, max_connections: int, executor_workers: int):
+        self.max_connections = max_connections
+        self.executor_workers = executor_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._clients: dict[tuple[str, Optional[float]], Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self):
+        """Create the executor and pre-spawn its worker threads."""
+        if self._executor is not None:
+            return
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.executor_workers, thread_name_prefix="bedrock"
+        )
+        # Threads are spawned lazily, one per submit while none is idle, so
+        # hold every task at a barrier until all workers exist
+        barrier = threading.Barrier(self.executor_workers)
+        futures = [
+            self._executor.submit(barrier.wait, timeout=10)
+            for _ in range(self.executor_workers)
+        ]
+        for future in futures:
+            future.result()
+        logger.info(
+            "Started Bedrock transport with %d workers and %d connections",
+            self.executor_workers,
+            self.max_connections,
+        )
+
+    def warm(self, region: str):
+        """Create the runtime client for a region ahead of the first call."""
+        self.client(region)
+
+    def close(self):
+        """Shut down the executor and close all clients."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+        logger.info("Closed Bedrock transport")
+
+    def client(self, region: str, read_timeout: Optional[float] = None):
+        """Get the pooled bedrock-runtime client for a region and timeout."""
+        key = (region, read_timeout)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = boto3.client(
+                    "bedrock-runtime",
+                    region_name=region,
+                    endpoint_url=config.bedrock_endpoint_url,
+                    config=Config(
+                        max_pool_connections=self.max_connections,
+                        read_timeout=read_timeout or config.bedrock_read_timeout,
+                    ),
+                )
+                self._clients[key] = client
+                logger.info("Created Bedrock runtime client for region %s", region)
+        return client
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run a blocking call on the transport's executor."""
+        self.start()
+        # Copy the context so context variables (trace ids etc.) reach the call
+        call = partial(contextvars.copy_context().run, func, *args)
+        return await asyncio.get_running_loop().run_in_executor(self._executor, call)
+
+    async def stream(self, func: Callable[..., Any], *args: Any) -> AsyncIterator:
+        """
+        Iterate a blocking iterator on the transport's executor.
+
+        If the consumer stops early, for example because its task was
+        cancelled, the iterator is closed once the in-flight ``next`` call
+        returns so that the underlying HTTP stream is released.
+        """
+        iterator = await self.run(lambda: iter(func(*args)))
+        context = contextvars.copy_context()
+        pending: Optional[Future] = None
+        exhausted = False
+        try:
+            while True:
+                pending = self._executor.submit(
+                    context.run, next, iterator, _STREAM_DONE
+                )
+                item = await asyncio.wrap_future(pending)
+                if item is _STREAM_DONE:
+                    exhausted = True
+                    return
+                yield item
+        finally:
+            if not exhausted and self._executor is not None:
+                self._executor.submit(_close_after, pending, iterator)
+
+
+def _close_after(pending: Optional[Future], iterator: Any):
+    """Close an abandoned iterator once its in-flight call has finished."""
+    if pending is not None:
+        wait([pending])
+    close = getattr(iterator, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception as e:
+            logger.debug("Error closing abandoned Bedrock stream: %s", e)
+
+
+_bedrock_transport: Optional[BedrockTransport] = None
+
+
+def get_bedrock_transport() -> BedrockTransport:
+    """Get Bedrock transport instance."""
+    global _bedrock_transport
+    if _bedrock_transport is None:
+        _bedrock_transport = BedrockTransport(
+            max_connections=config.bedrock_max_connections,
+            executor_workers=config.bedrock_executor_workers,
+        )
+    return _bedrock_transport
@@ -0,0 +1,134 @@
+"""Token, latency and cost accounting for Bedrock calls."""
+
+from dataclasses import asdict, dataclass
+from logging import getLogger
+from typing import Optional
+
+from app.common.metrics import counter, histogram, metrics_enabled
+from app.common.spans import ctx_span
+from app.config import config
+from app.research_analysis.llm.context import ctx_llm_usage
+
+logger = getLogger(__name__)
+
+
+@dataclass
+class UsageRecorder:
+    """Accumulated LLM usage for a workflow node or the whole process."""
+
+    llm_calls: int = 0
+    cached_calls: int = 0
+    hedged_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    llm_seconds: float = 0.0
+    queue_wait_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    cost_usd: float = 0.0
+
+    def add_call(
+        self, input_tokens: int, output_tokens: int, seconds: float, cost: float
+    ):
+        self.llm_calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.llm_seconds += seconds
+        self.cost_usd += cost
+
+    def to_dict(self) -> dict:
+        usage = asdict(self)
+        usage["llm_seconds"] = round(self.llm_seconds, 3)
+        usage["queue_wait_seconds"] = round(self.queue_wait_seconds, 3)
+        usage["wall_seconds"] = round(self.wall_seconds, 3)
+        usage["cost_usd"] = round(self.cost_usd, 6)
+        return usage
+
+
+# Totals for every LLM call made by this process
+_process_usage = UsageRecorder()
+
+
+def get_process_usage() -> UsageRecorder:
+    """Get the LLM usage totals for this process."""
+    return _process_usage
+
+
+def _token_counts(usage_metadata: Optional[dict]) -> tuple[int, int]:
+    if not usage_metadata:
+        return 0, 0
+    return (
+        usage_metadata.get("input_tokens", 0),
+        usage_metadata.get("output_tokens", 0),
+    )
+
+
+def record_llm_call(profile: str, usage_metadata: Optional[dict], seconds: float):
+    """
+    Record a completed Bedrock call against the current node and the process.
+
+    Args:
+        profile: Name of the LLM profile used for the call
+        usage_metadata: Token usage reported by the model, if any
+        seconds: Latency of the call
+    """
+    input_tokens, output_tokens = _token_counts(usage_metadata)
+    llm_profile = config.get_llm_profile(profile)
+    cost = (
+        input_tokens * llm_profile.input_cost_per_1k_tokens
+        + output_tokens * llm_profile.output_cost_per_1k_tokens
+    ) / 1000
+
+    _process_usage.add_call(input_tokens, output_tokens, seconds, cost)
+    recorder = ctx_llm_usage.get()
+    if recorder is not None:
+        recorder.add_call(input_tokens, output_tokens, seconds, cost)
+    _annotate_span(
+        {
+            "llm.input_tokens": input_tokens,
+            "llm.output_tokens": output_tokens,
+            "llm.cost_usd": round(cost, 6),
+        }
+    )
+
+    if metrics_enabled():
+        counter("LLMCalls", 1)
+        counter("LLMInputTokens", input_tokens)
+        counter("LLMOutputTokens", output_tokens)
+        histogram("LLMCallMilliseconds", seconds * 1000)
+
+
+def record_cache_hit():
+    """Record an LLM call served from the response cache."""
+    _process_usage.cached_calls += 1
+    recorder = ctx_llm_usage.get()
+    if recorder is not None:
+        recorder.cached_calls += 1
+    _annotate_span({"llm.cached": True})
+
+
+def record_hedged_call():
+    """Record a duplicate attempt of an LLM call issued by request hedging."""
+    _process_usage.hedged_calls += 1
+    recorder = ctx_llm_usage.get()
+    if recorder is not None:
+        recorder.hedged_calls += 1
+    _annotate_span({"llm.hedged": True})
+
+
+def record_queue_wait(seconds: float):
+    """Record time an LLM call waited for a scheduler slot."""
+    _process_usage.queue_wait_seconds += seconds
+    recorder = ctx_llm_usage.get()
+    if recorder is not None:
+        recorder.queue_wait_seconds += seconds
+    _annotate_span({"llm.queue_wait_ms": round(seconds * 1000, 1)})
+
+    if metrics_enabled():
+        counter("LLMQueueWaitMilliseconds", int(seconds * 1000))
+
+
+def _annotate_span(attributes: dict):
+    """Add attributes to the span of the current LLM call, if traced."""
+    span = ctx_span.get()
+    if span is not None:
+        span.attributes.update(attributes)
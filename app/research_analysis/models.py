@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from typing import Optional
+from typing import Any, Optional
 
 from bson import ObjectId
 from pydantic import BaseModel, Field
@@ -38,6 +38,7 @@ class AnalysisStatus(str, Enum):
     RUNNING = "RUNNING"
     COMPLETED = "COMPLETED"
     ERROR = "ERROR"
+    CANCELLED = "CANCELLED"
 
 
 class AgentStatus(str, Enum):
@@ -49,8 +50,32 @@ class AgentStatus(str, Enum):
     VALIDATING_PII = "VALIDATING_PII"
     GENERATING_AFFINITY_MAP = "GENERATING_AFFINITY_MAP"
     GENERATING_FINDINGS = "GENERATING_FINDINGS"
+    WAITING_FOR_LLM = "WAITING_FOR_LLM"
     FINISHED = "FINISHED"
     FAILED = "FAILED"
+    TIMED_OUT = "TIMED_OUT"
+    CANCELLED = "CANCELLED"
+
+
+class ExportFormat(str, Enum):
+    """Archive format of an analysis export."""
+
+    ZIP = "zip"
+    TAR = "tar"
+
+
+class NodeUsage(BaseModel):
+    """LLM usage and timings of one workflow node."""
+
+    llm_calls: int = 0
+    cached_calls: int = 0
+    hedged_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    llm_seconds: float = 0.0
+    queue_wait_seconds: float = 0.0
+    wall_seconds: float = 0.0
+    cost_usd: float = 0.0
 
 
 class AgentState(BaseModel):
@@ -61,8 +86,12 @@ class AgentState(BaseModel):
     transcripts_pii_cleaned: list[str] = Field(default_factory=list)
     affinity_map: Optional[str] = None
     findings_report: Optional[str] = None
+    findings_sections: dict[str, str] = Field(default_factory=dict)
     status: Optional[AgentStatus] = None
     error_message: Optional[str] = None
+    speculative_saving_seconds: Optional[float] = None
+    usage: dict[str, NodeUsage] = Field(default_factory=dict)
+    timed_out_nodes: dict[str, float] = Field(default_factory=dict)
 
 
 class ResearchAnalysis(BaseModel):
@@ -70,6 +99,7 @@ class ResearchAnalysis(BaseModel):
 
     id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: Optional[datetime] = None
     status: AnalysisStatus = AnalysisStatus.INIT
     error_message: Optional[str] = None
     agent_state: Optional[AgentState] = None
@@ -112,6 +142,9 @@ class StatusUpdateRequest(BaseModel):
     """Request model for status updates."""
 
     status: AnalysisStatus
+    bypass_llm_cache: bool = False
+    priority: bool = False  # Use the LLM priority lane, e.g. for interactive runs
+    profile: bool = False  # Profile the workflow run, needs the profiling token
 
 
 class AnalysisResponse(BaseModel):
@@ -148,3 +181,49 @@ class FileResponse(BaseModel):
 
     class Config:
         populate_by_name = True
+
+
+class TimelineSpan(BaseModel):
+    """One span of an analysis timeline, with its child spans."""
+
+    name: str
+    span_id: str
+    start_time: datetime
+    offset_ms: float
+    duration_ms: Optional[float] = None
+    status: str
+    status_message: Optional[str] = None
+    attributes: dict[str, Any] = Field(default_factory=dict)
+    children: list["TimelineSpan"] = Field(default_factory=list)
+
+
+class TimelineResponse(BaseModel):
+    """Response model for the span timeline of an analysis."""
+
+    analysis_id: str
+    trace_id: Optional[str] = None
+    spans: list[TimelineSpan] = Field(default_factory=list)
+
+
+class UsageTotal(BaseModel):
+    """LLM usage summed over the nodes of an analysis."""
+
+    llm_calls: int = 0
+    cached_calls: int = 0
+    hedged_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    llm_seconds: float = 0.0
+    queue_wait_seconds: float = 0.0
+    # Sum of node wall times, which overlap for parallel nodes such as the
+    # findings sections, so this exceeds the elapsed time of the analysis
+    node_seconds: float = 0.0
+    cost_usd: float = 0.0
+
+
+class UsageResponse(BaseModel):
+    """Response model for LLM usage of an analysis."""
+
+    analysis_id: str
+    nodes: dict[str, NodeUsage] = Field(default_factory=dict)
+    total: UsageTotal = Field(default_factory=UsageTotal)
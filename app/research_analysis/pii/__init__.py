@@ -0,0 +1 @@
+# Deterministic PII detection for research analysis
@@ -0,0 +1,261 @@
+"""Deterministic detection and redaction of structured PII.
+
+Emails, UK phone numbers, UK postcodes, National Insurance numbers and payment
+card numbers follow fixed formats, so they can be found locally with compiled
+regular expressions (plus a Luhn checksum for cards) instead of an LLM call.
+"""
+
+import multiprocessing
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from logging import getLogger
+from typing import NamedTuple, Optional
+
+from app.config import config
+
+logger = getLogger(__name__)
+
+EMAIL = "EMAIL"
+PHONE = "PHONE"
+POSTCODE = "POSTCODE"
+NI_NUMBER = "NI_NUMBER"
+CARD_NUMBER = "CARD_NUMBER"
+
+PLACEHOLDERS = {
+    EMAIL: "[EMAIL]",
+    PHONE: "[PHONE]",
+    POSTCODE: "[POSTCODE]",
+    NI_NUMBER: "[NI_NUMBER]",
+    CARD_NUMBER: "[CARD_NUMBER]",
+}
+
+_EMAIL_RE = re.compile(
+    r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}\b"
+)
+
+# Patterns are tried in priority order at each position, so a card number is
+# never also reported as a phone number. NI numbers and postcodes are matched
+# in upper case only, which is how transcription tools render them. Card
+# numbers are either unseparated or grouped as printed on cards: 4-4-4-4 (with
+# a short or extra last group for 13 to 19 digits) or 4-6-5 and 4-6-4.
+_STRUCTURED_PATTERNS = {
+    CARD_NUMBER: (
+        r"(?<![\d-])(?:\d{13,19}"
+        r"|\d{4}[ -]\d{4}[ -]\d{4}[ -]\d{1,4}(?:[ -]\d{3})?"
+        r"|\d{4}[ -]\d{6}[ -]\d{4,5})(?![\d-])"
+    ),
+    NI_NUMBER: (
+        r"\b(?!BG|GB|KN|NK|NT|TN|ZZ)[A-CEGHJ-PR-TW-Z][A-CEGHJ-NPR-TW-Z]"
+        r" ?\d{2} ?\d{2} ?\d{2} ?[A-D]\b"
+    ),
+    PHONE: (
+        r"(?<![\w+])(?:\+44\s?(?:\(0\)\s?)?|\(?0)"
+        r"\d{2,4}\)?[\s.-]?\d{3,4}[\s.-]?\d{3,4}(?!\w)"
+    ),
+    POSTCODE: (
+        r"\b(?:GIR ?0AA|[A-PR-UWYZ][A-HK-Y]?\d[A-HJKMNPR-Y\d]? ?\d[ABD-HJLNP-UW-Z]{2})\b"
+    ),
+}
+
+# The leading lookahead lets the regex engine skip straight to candidate start
+# characters, which keeps a single combined scan several times faster than
+# running each pattern separately.
+_STRUCTURED_RE = re.compile(
+    r"(?=[A-Z0-9+(])(?:"
+    + "|".join(
+        f"(?P<{kind}>{pattern})" for kind, pattern in _STRUCTURED_PATTERNS.items()
+    )
+    + ")"
+)
+_FALLBACK_RES = {
+    kind: re.compile(pattern) for kind, pattern in _STRUCTURED_PATTERNS.items()
+}
+
+
+class PiiMatch(NamedTuple):
+    """A single PII occurrence found in a text."""
+
+    kind: str
+    start: int
+    end: int
+
+
+class RedactionResult(NamedTuple):
+    """Redacted text together with the number of replacements per PII kind."""
+
+    text: str
+    counts: dict[str, int]
+
+
+def _luhn_valid(digits: str) -> bool:
+    """Check a digit string against the Luhn checksum."""
+    total = 0
+    for i, char in enumerate(reversed(digits)):
+        value = int(char)
+        if i % 2:
+            value *= 2
+            if value > 9:
+                value -= 9
+        total += value
+    return total % 10 == 0
+
+
+def _is_card_number(value: str) -> bool:
+    digits = re.sub(r"\D", "", value)
+    return 13 <= len(digits) <= 19 and _luhn_valid(digits)
+
+
+def _is_phone_number(value: str) -> bool:
+    digits = re.sub(r"\D", "", value)
+    if digits.startswith("44"):
+        digits = "0" + digits[2:].removeprefix("0")
+    return len(digits) in (10, 11)
+
+
+_VALIDATORS = {
+    CARD_NUMBER: _is_card_number,
+    PHONE: _is_phone_number,
+}
+
+
+def _is_valid(kind: str, value: str) -> bool:
+    validator = _VALIDATORS.get(kind)
+    return validator is None or validator(value)
+
+
+def _fallback_match(text: str, start: int, failed_kind: str) -> Optional[PiiMatch]:
+    """Try lower priority patterns at a position whose first match failed validation."""
+    kinds = list(_STRUCTURED_PATTERNS)
+    for kind in kinds[kinds.index(failed_kind) + 1 :]:
+        found = _FALLBACK_RES[kind].match(text, start)
+        if found and _is_valid(kind, found.group()):
+            return PiiMatch(kind, *found.span())
+    return None
+
+
+def find_pii(text: str) -> list[PiiMatch]:
+    """
+    Find structured PII in text.
+
+    Args:
+        text: Text to scan
+
+    Returns:
+        Non-overlapping matches sorted by position
+    """
+    emails = []
+    if "@" in text:
+        emails = [PiiMatch(EMAIL, *found.span()) for found in _EMAIL_RE.finditer(text)]
+
+    matches = list(emails)
+    for found in _STRUCTURED_RE.finditer(text):
+        start, end = found.span()
+        match = PiiMatch(found.lastgroup, start, end)
+        if not _is_valid(match.kind, found.group()):
+            match = _fallback_match(text, start, match.kind)
+            if match is None:
+                continue
+        if any(match.start < e.end and e.start < match.end for e in emails):
+            continue
+        matches.append(match)
+
+    if emails:
+        matches.sort(key=lambda m: m.start)
+    return matches
+
+
+def redact_pii(text: str) -> RedactionResult:
+    """
+    Replace structured PII in text with bracketed placeholders.
+
+    Args:
+        text: Text to redact
+
+    Returns:
+        Redacted text and replacement counts per PII kind
+    """
+    matches = find_pii(text)
+    if not matches:
+        return RedactionResult(text, {})
+
+    parts = []
+    position = 0
+    for match in matches:
+        parts.append(text[position : match.start])
+        parts.append(PLACEHOLDERS[match.kind])
+        position = match.end
+    parts.append(text[position:])
+    return RedactionResult("".join(parts), dict(Counter(m.kind for m in matches)))
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers = 0
+
+
+def start_process_pool(max_workers: Optional[int] = None):
+    """
+    Create the process pool used for large corpora, once at startup.
+
+    Workers are spawned rather than forked, as forking a process that already
+    runs threads (the Bedrock executor, the logging listener) can deadlock the
+    child on locks held by those threads.
+
+    Args:
+        max_workers: Pool size, defaults to ``config.pii_prepass_max_workers``
+            or the CPU count
+    """
+    global _process_pool, _process_pool_workers
+    if _process_pool is not None:
+        return
+    workers = max_workers or config.pii_prepass_max_workers or os.cpu_count() or 1
+    _process_pool = ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
+    _process_pool_workers = workers
+
+
+def shutdown_process_pool():
+    """Shut down the process pool, if started."""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+
+
+def redact_transcripts(transcripts: list[str]) -> list[RedactionResult]:
+    """
+    Redact structured PII from a batch of transcripts.
+
+    Corpora larger than ``config.pii_prepass_pool_min_bytes`` are spread over
+    the process pool, if started, as the regex scan is CPU bound and holds the
+    GIL.
+
+    Args:
+        transcripts: Transcript texts
+
+    Returns:
+        Redaction results in the same order as the input
+    """
+    total_bytes = sum(len(transcript) for transcript in transcripts)
+    pool = _process_pool
+    if (
+        pool is None
+        or len(transcripts) < 2
+        or total_bytes < config.pii_prepass_pool_min_bytes
+    ):
+        return [redact_pii(transcript) for transcript in transcripts]
+
+    logger.debug(
+        "Redacting %d transcripts (%d bytes) in a process pool",
+        len(transcripts),
+        total_bytes,
+    )
+    chunksize = max(1, len(transcripts) // (_process_pool_workers * 4))
+    return list(pool.map(redact_pii, transcripts, chunksize=chunksize))
+
+
+def summarise_counts(counts: dict[str, int]) -> str:
+    """Describe PII counts without revealing the matched values."""
+    return ", ".join(f"{count} {kind}" for kind, count in sorted(counts.items()))
@@ -0,0 +1,138 @@
+"""Tests for the deterministic PII detector."""
+
+import pytest
+
+from app.research_analysis.pii.detector import (
+    CARD_NUMBER,
+    EMAIL,
+    NI_NUMBER,
+    PHONE,
+    POSTCODE,
+    find_pii,
+    redact_pii,
+    redact_transcripts,
+    shutdown_process_pool,
+    start_process_pool,
+)
+
+
+# Test Cases - Detection
+@pytest.mark.parametrize(
+    ("text", "kind"),
+    [
+        ("Email me at jane.doe@example.co.uk please", EMAIL),
+        ("Call me on 07700 900123 tomorrow", PHONE),
+        ("My number is +44 20 7946 0958.", PHONE),
+        ("We moved to SW1A 1AA last year", POSTCODE),
+        ("My NI number is JG 10 37 46 C", NI_NUMBER),
+        ("The card is 4111 1111 1111 1111.", CARD_NUMBER),
+        ("The card is 4111111111111111.", CARD_NUMBER),
+        ("My Amex is 3782 822463 10005.", CARD_NUMBER),
+    ],
+)
+def test_find_pii_structured_identifier_detected(text, kind):
+    # When
+    matches = find_pii(text)
+
+    # Then
+    assert [match.kind for match in matches] == [kind]
+
+
+def test_find_pii_card_failing_luhn_ignored():
+    # Given: 16 digits that do not pass the Luhn checksum
+    text = "My credit card is a Visa and the number is 1234 5678 8765 1111."
+
+    # When / Then
+    assert find_pii(text) == []
+
+
+def test_find_pii_spaced_single_digits_not_a_card():
+    # Given: digits read out one by one, which together pass the Luhn checksum
+    text = "The code was 2 4 6 8 1 0 2 4 6 8 1 0 2 4 6 7 I think."
+
+    # When / Then
+    assert find_pii(text) == []
+
+
+def test_find_pii_ordinary_numbers_ignored():
+    # Given
+    text = "I have about 35 different teas and drank 1200 cups in 2023."
+
+    # When / Then
+    assert find_pii(text) == []
+
+
+# Test Cases - Redaction
+def test_redact_pii_replaces_with_placeholders():
+    # Given
+    text = "Contact jo@example.com or 07700 900123, card 4111-1111-1111-1111."
+
+    # When
+    result = redact_pii(text)
+
+    # Then
+    assert result.text == "Contact [EMAIL] or [PHONE], card [CARD_NUMBER]."
+    assert result.counts == {EMAIL: 1, PHONE: 1, CARD_NUMBER: 1}
+
+
+def test_redact_pii_clean_text_unchanged():
+    # Given
+    text = "I live in [CITY] and my email is [EMAIL]."
+
+    # When
+    result = redact_pii(text)
+
+    # Then
+    assert result.text == text
+    assert result.counts == {}
+
+
+def test_redact_transcripts_process_pool_matches_inline(monkeypatch):
+    # Given: a pool threshold low enough to force the process pool path
+    from app.research_analysis.pii import detector
+
+    monkeypatch.setattr(detector.config, "pii_prepass_pool_min_bytes", 1)
+    transcripts = ["mail a@b.com", "nothing here", "postcode M1 1AE"]
+    start_process_pool(max_workers=2)
+
+    # When
+    try:
+        results = redact_transcripts(transcripts)
+    finally:
+        shutdown_process_pool()
+
+    # Then
+    assert [result.text for result in results] == [
+        redact_pii(transcript).text for transcript in transcripts
+    ]
+
+
+def test_process_pool_spawns_workers_instead_of_forking():
+    # Given / When
+    from app.research_analysis.pii import detector
+
+    start_process_pool(max_workers=1)
+    try:
+        # Then
+        context = detector._process_pool._mp_context  # noqa: SLF001
+        assert context.get_start_method() == "spawn"
+    finally:
+        shutdown_process_pool()
+    assert detector._process_pool is None  # noqa: SLF001
+
+
+def test_redact_transcripts_without_process_pool_redacts_inline(monkeypatch):
+    # Given: a large corpus before the pool is started
+    from app.research_analysis.pii import detector
+
+    monkeypatch.setattr(detector.config, "pii_prepass_pool_min_bytes", 1)
+    transcripts = ["mail a@b.com", "postcode M1 1AE"]
+
+    # When
+    results = redact_transcripts(transcripts)
+
+    # Then
+    assert [result.text for result in results] == [
+        "mail [EMAIL]",
+        "postcode [POSTCODE]",
+    ]
@@ -10,6 +10,7 @@ from app.common.exceptions import NotFoundError
 from app.common.mongo import get_db
 from app.research_analysis.models import (
     AnalysisFile,
+    AnalysisStatus,
     ResearchAnalysis,
     ResearchAnalysisSummary,
 )
@@ -24,6 +25,7 @@ class ResearchAnalysisRepository:
         self.db = db
         self.research_analysis_collection: AsyncCollection = db.research_analysis
         self.analysis_file_collection: AsyncCollection = db.analysis_file
+        self.analysis_span_collection: AsyncCollection = db.analysis_span
 
     async def create_analysis(self, analysis: ResearchAnalysis) -> ResearchAnalysis:
         """Create a new research analysis session."""
@@ -43,6 +45,103 @@ class ResearchAnalysisRepository:
             raise NotFoundError(msg)
         return ResearchAnalysis(**doc)
 
+    async def get_analysis_document(self, analysis_id: str) -> dict:
+        """Get a research analysis as the raw document, without validation."""
+        doc = await self.research_analysis_collection.find_one(
+            {"_id": ObjectId(analysis_id)}
+        )
+        if not doc:
+            msg = f"Analysis {analysis_id} not found"
+            raise NotFoundError(msg)
+        return doc
+
+    async def get_export_sizes(self, analysis_id: str) -> dict:
+        """
+        Get the UTF-8 sizes of the exportable artifacts of an analysis.
+
+        The sizes are computed by MongoDB, so the artifacts are not read.
+
+        Returns:
+            created_at, updated_at (absent before the first update), status,
+            and the byte sizes of findings_report and affinity_map (None if
+            absent) and of each cleaned transcript
+        """
+
+        def byte_size(path: str) -> dict:
+            return {
+                "$cond": [
+                    {"$eq": [{"$type": path}, "string"]},
+                    {"$strLenBytes": path},
+                    None,
+                ]
+            }
+
+        cursor = await self.research_analysis_collection.aggregate(
+            [
+                {"$match": {"_id": ObjectId(analysis_id)}},
+                {
+                    "$project": {
+                        "_id": 0,
+                        "created_at": 1,
+                        "updated_at": 1,
+                        "status": 1,
+                        "findings_report": byte_size("$agent_state.findings_report"),
+                        "affinity_map": byte_size("$agent_state.affinity_map"),
+                        "transcripts_pii_cleaned": {
+                            "$map": {
+                                "input": {
+                                    "$ifNull": [
+                                        "$agent_state.transcripts_pii_cleaned",
+                                        [],
+                                    ]
+                                },
+                                "in": {"$strLenBytes": "$$this"},
+                            }
+                        },
+                    }
+                },
+            ]
+        )
+        docs = await cursor.to_list(1)
+        if not docs:
+            msg = f"Analysis {analysis_id} not found"
+            raise NotFoundError(msg)
+        return docs[0]
+
+    async def get_agent_state_field(
+        self, analysis_id: str, field: str, index: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Read a single agent state field, or one element of a list field.
+
+        Lets large artifacts be read one at a time rather than with the
+        whole analysis document.
+        """
+        value = f"$agent_state.{field}"
+        if index is not None:
+            value = {"$arrayElemAt": [value, index]}
+        cursor = await self.research_analysis_collection.aggregate(
+            [
+                {"$match": {"_id": ObjectId(analysis_id)}},
+                {"$project": {"_id": 0, "value": value}},
+            ]
+        )
+        docs = await cursor.to_list(1)
+        if not docs:
+            msg = f"Analysis {analysis_id} not found"
+            raise NotFoundError(msg)
+        return docs[0].get("value")
+
+    async def get_analysis_status(self, analysis_id: str) -> AnalysisStatus:
+        """Get only the status of a research analysis."""
+        doc = await self.research_analysis_collection.find_one(
+            {"_id": ObjectId(analysis_id)}, {"status": 1}
+        )
+        if not doc:
+            msg = f"Analysis {analysis_id} not found"
+            raise NotFoundError(msg)
+        return AnalysisStatus(doc["status"])
+
     async def list_analyses(self) -> list[ResearchAnalysisSummary]:
         """List all research analyses (summary view)."""
         cursor = self.research_analysis_collection.find(
@@ -65,7 +164,8 @@ class ResearchAnalysisRepository:
             update_doc["error_message"] = error_message
 
         result = await self.research_analysis_collection.update_one(
-            {"_id": ObjectId(analysis_id)}, {"$set": update_doc}
+            {"_id": ObjectId(analysis_id)},
+            {"$set": update_doc, "$currentDate": {"updated_at": True}},
         )
 
         if result.matched_count == 0:
@@ -75,12 +175,48 @@ class ResearchAnalysisRepository:
         logger.info("Updated analysis %s status to %s", analysis_id, status)
         return await self.get_analysis(analysis_id)
 
+    async def finish_running_analysis(
+        self, analysis_id: str, status: str, error_message: Optional[str] = None
+    ) -> bool:
+        """
+        Set the final status of an analysis, unless it is no longer running.
+
+        The RUNNING condition is part of the update, so a cancellation written
+        just before the workflow finished is not overwritten.
+
+        Returns:
+            True if the analysis was still running and has been updated
+        """
+        update_doc = {"status": status}
+        if error_message is not None:
+            update_doc["error_message"] = error_message
+
+        result = await self.research_analysis_collection.update_one(
+            {"_id": ObjectId(analysis_id), "status": AnalysisStatus.RUNNING.value},
+            {"$set": update_doc, "$currentDate": {"updated_at": True}},
+        )
+
+        if result.matched_count == 0:
+            logger.info(
+                "Analysis %s is no longer running, not setting status %s",
+                analysis_id,
+                status,
+            )
+            return False
+
+        logger.info("Updated analysis %s status to %s", analysis_id, status)
+        return True
+
     async def update_agent_state(
         self, analysis_id: str, agent_state: dict
     ) -> ResearchAnalysis:
         """Update agent state."""
         result = await self.research_analysis_collection.update_one(
-            {"_id": ObjectId(analysis_id)}, {"$set": {"agent_state": agent_state}}
+            {"_id": ObjectId(analysis_id)},
+            {
+                "$set": {"agent_state": agent_state},
+                "$currentDate": {"updated_at": True},
+            },
         )
 
         if result.matched_count == 0:
@@ -90,6 +226,26 @@ class ResearchAnalysisRepository:
         logger.debug("Updated agent state for analysis %s", analysis_id)
         return await self.get_analysis(analysis_id)
 
+    async def update_agent_state_fields(self, analysis_id: str, fields: dict):
+        """
+        Set individual agent state fields without replacing the sub-document.
+
+        Used for frequent progress writes, so it does not re-read the analysis.
+        """
+        update_doc = {f"agent_state.{key}": value for key, value in fields.items()}
+        result = await self.research_analysis_collection.update_one(
+            {"_id": ObjectId(analysis_id)},
+            {"$set": update_doc, "$currentDate": {"updated_at": True}},
+        )
+
+        if result.matched_count == 0:
+            msg = f"Analysis {analysis_id} not found"
+            raise NotFoundError(msg)
+
+        logger.debug(
+            "Updated agent state fields %s for analysis %s", list(fields), analysis_id
+        )
+
     async def delete_analysis(self, analysis_id: str):
         """Delete a research analysis."""
         result = await self.research_analysis_collection.delete_one(
@@ -122,6 +278,16 @@ class ResearchAnalysisRepository:
 
         return files
 
+    async def get_file(self, analysis_id: str, file_id: str) -> AnalysisFile:
+        """Get a file record of an analysis."""
+        doc = await self.analysis_file_collection.find_one(
+            {"_id": ObjectId(file_id), "analysis_id": ObjectId(analysis_id)}
+        )
+        if not doc:
+            msg = f"File {file_id} not found in analysis {analysis_id}"
+            raise NotFoundError(msg)
+        return AnalysisFile(**doc)
+
     async def delete_files_by_analysis(self, analysis_id: str) -> list[str]:
         """Delete all files for an analysis and return S3 keys."""
         files = await self.list_files(analysis_id)
@@ -134,6 +300,25 @@ class ResearchAnalysisRepository:
         logger.info("Deleted %d files for analysis %s", len(s3_keys), analysis_id)
         return s3_keys
 
+    async def add_spans(self, analysis_id: str, spans: list[dict]):
+        """Store finished tracing spans of an analysis workflow."""
+        docs = [{**span, "analysis_id": ObjectId(analysis_id)} for span in spans]
+        await self.analysis_span_collection.insert_many(docs)
+        logger.debug("Stored %d spans for analysis %s", len(docs), analysis_id)
+
+    async def list_spans(self, analysis_id: str) -> list[dict]:
+        """List tracing spans of an analysis in start order."""
+        cursor = self.analysis_span_collection.find(
+            {"analysis_id": ObjectId(analysis_id)}, {"_id": 0, "analysis_id": 0}
+        ).sort("start_time_unix_nano", 1)
+        return [doc async for doc in cursor]
+
+    async def delete_spans_by_analysis(self, analysis_id: str):
+        """Delete all tracing spans of an analysis."""
+        await self.analysis_span_collection.delete_many(
+            {"analysis_id": ObjectId(analysis_id)}
+        )
+
     async def ensure_indexes(self):
         """Ensure required database indexes exist."""
         # Index on research_analysis.status
@@ -142,6 +327,9 @@ class ResearchAnalysisRepository:
         # Index on analysis_file.analysis_id
         await self.analysis_file_collection.create_index("analysis_id")
 
+        # Index on analysis_span.analysis_id
+        await self.analysis_span_collection.create_index("analysis_id")
+
         # Index on research_analysis.created_at for sorting
         await self.research_analysis_collection.create_index([("created_at", -1)])
 
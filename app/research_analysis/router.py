@@ -1,10 +1,19 @@
-from fastapi import APIRouter, Depends, File, UploadFile, status
+from typing import Optional
 
+from fastapi import APIRouter, Depends, File, Header, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+
+from app.common.http_range import if_range_matches, parse_range
+from app.common.profiling import profile_response, require_profiling_admin
+from app.research_analysis.export import export_response
 from app.research_analysis.models import (
     AnalysisListResponse,
     AnalysisResponse,
+    ExportFormat,
     FileResponse,
     StatusUpdateRequest,
+    TimelineResponse,
+    UsageResponse,
 )
 from app.research_analysis.service import ResearchAnalysisService
 
@@ -42,7 +51,86 @@ async def get_analysis_session(
 
     Get a session with full agent state for progress or final artifacts display.
     """
-    return await service.get_analysis(analysis_id)
+    # Encoded straight from the stored document, response_model documents it
+    return Response(
+        await service.get_analysis_json(analysis_id), media_type="application/json"
+    )
+
+
+@router.get("/{analysis_id}/usage", response_model=UsageResponse)
+async def get_analysis_usage(
+    analysis_id: str, service: ResearchAnalysisService = Depends()
+):
+    """
+    Retrieve Analysis LLM Usage
+
+    Get LLM calls, input/output tokens, latency and estimated cost per
+    workflow node, plus totals for the analysis.
+    """
+    return await service.get_usage(analysis_id)
+
+
+@router.get("/{analysis_id}/timeline", response_model=TimelineResponse)
+async def get_analysis_timeline(
+    analysis_id: str, service: ResearchAnalysisService = Depends()
+):
+    """
+    Retrieve Analysis Timeline
+
+    Get the tracing span tree of the latest workflow run, with the start
+    offset and duration of each workflow node, LLM call, S3 fetch and
+    database sync.
+    """
+    return await service.get_timeline(analysis_id)
+
+
+@router.get(
+    "/{analysis_id}/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/zip": {}, "application/x-tar": {}}},
+        206: {"description": "Requested byte range of the archive"},
+        416: {"description": "Range not satisfiable"},
+    },
+)
+async def export_analysis(
+    analysis_id: str,
+    format: ExportFormat = ExportFormat.ZIP,  # noqa: A002
+    range: Optional[str] = Header(default=None),  # noqa: A002
+    if_range: Optional[str] = Header(default=None),
+    service: ResearchAnalysisService = Depends(),
+):
+    """
+    Export Analysis Artifacts
+
+    Download the findings report, affinity map, cleaned transcripts and a
+    manifest as a zip or tar archive, streamed as it is built. A `Range`
+    header resumes an interrupted download. Send the returned `ETag` as
+    `If-Range` to get the whole archive instead if the analysis changed.
+    """
+    archive = await service.export_analysis(analysis_id, format)
+    byte_range = None
+    if if_range_matches(if_range, archive.etag):
+        byte_range = parse_range(range, archive.size)
+    return export_response(archive, byte_range)
+
+
+@router.get(
+    "/{analysis_id}/profile",
+    dependencies=[Depends(require_profiling_admin)],
+    include_in_schema=False,
+)
+async def get_analysis_profile(
+    analysis_id: str, service: ResearchAnalysisService = Depends()
+):
+    """
+    Retrieve Workflow Profile
+
+    Get the profile of the latest workflow run started with `"profile": true`,
+    in the folded stack format read by flamegraph tools.
+    """
+    profile = await service.get_profile(analysis_id)
+    return profile_response(profile, f"analysis-{analysis_id}.folded")
 
 
 @router.patch("/{analysis_id}", response_model=AnalysisResponse)
@@ -50,6 +138,7 @@ async def update_analysis_status(
     analysis_id: str,
     request: StatusUpdateRequest,
     service: ResearchAnalysisService = Depends(),
+    x_profile_token: Optional[str] = Header(default=None),
 ):
     """
     Update Analysis Session Status (Story 1.4)
@@ -57,6 +146,8 @@ async def update_analysis_status(
     Update a session's status to trigger workflow execution.
     Operation is idempotent - repeated requests with same status are safe.
     """
+    if request.profile:
+        require_profiling_admin(x_profile_token)
     return await service.update_analysis_status(analysis_id, request)
 
 
@@ -128,3 +219,31 @@ async def list_transcripts(
     Returns file metadata without file bodies.
     """
     return await service.list_transcripts(analysis_id)
+
+
+@router.get(
+    "/{analysis_id}/transcripts/{file_id}/content",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/markdown": {}, "text/plain": {}}},
+        206: {"description": "Requested byte range of the transcript"},
+        304: {"description": "Not modified, the If-None-Match ETag matches"},
+        416: {"description": "Range not satisfiable"},
+    },
+)
+async def get_transcript_content(
+    analysis_id: str,
+    file_id: str,
+    range: Optional[str] = Header(default=None),  # noqa: A002
+    if_none_match: Optional[str] = Header(default=None),
+    service: ResearchAnalysisService = Depends(),
+):
+    """
+    Get Transcript Content
+
+    Stream the content of an uploaded transcript. Supports `Range` requests,
+    and `If-None-Match` with the returned `ETag`.
+    """
+    return await service.get_transcript_content(
+        analysis_id, file_id, range, if_none_match
+    )
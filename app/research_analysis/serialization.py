@@ -0,0 +1,65 @@
+"""
+Fast JSON encoding of analysis documents.
+
+An analysis with its full agent state can be several MB. Validating the
+MongoDB document into ResearchAnalysis, copying it into AnalysisResponse and
+serializing that through FastAPI walks the transcripts three times. The
+encoder here fills in model defaults for fields missing from older documents,
+drops fields the response model does not declare, and encodes the document
+with orjson, producing the same JSON as AnalysisResponse.
+"""
+
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+
+from app.research_analysis.models import AgentState, AnalysisStatus, NodeUsage
+
+# Pydantic serializes UTC datetimes with a Z suffix; naive ones carry no offset
+_ORJSON_OPTIONS = orjson.OPT_UTC_Z
+
+
+def _field_defaults(model: type[BaseModel]) -> dict[str, Any]:
+    return {
+        name: field.get_default(call_default_factory=True)
+        for name, field in model.model_fields.items()
+    }
+
+
+_AGENT_STATE_DEFAULTS = _field_defaults(AgentState)
+_NODE_USAGE_DEFAULTS = _field_defaults(NodeUsage)
+
+
+def _project(doc: dict, defaults: dict[str, Any]) -> dict:
+    return {name: doc.get(name, default) for name, default in defaults.items()}
+
+
+def encode_analysis(doc: dict) -> bytes:
+    """
+    Encode a research_analysis document as an AnalysisResponse JSON body.
+
+    Args:
+        doc: Document as read from the research_analysis collection
+
+    Returns:
+        UTF-8 JSON bytes matching AnalysisResponse serialized by alias
+    """
+    agent_state = doc.get("agent_state")
+    if agent_state is not None:
+        agent_state = _project(agent_state, _AGENT_STATE_DEFAULTS)
+        agent_state["usage"] = {
+            node: _project(usage, _NODE_USAGE_DEFAULTS)
+            for node, usage in agent_state["usage"].items()
+        }
+
+    return orjson.dumps(
+        {
+            "_id": str(doc["_id"]),
+            "created_at": doc["created_at"],
+            "status": doc.get("status", AnalysisStatus.INIT),
+            "error_message": doc.get("error_message"),
+            "agent_state": agent_state,
+        },
+        option=_ORJSON_OPTIONS,
+    )
@@ -1,26 +1,54 @@
 import asyncio
 from logging import getLogger
+from typing import Optional
 
+from botocore.exceptions import ClientError
 from bson import ObjectId
-from fastapi import Depends, UploadFile
+from fastapi import Depends, Response, UploadFile
+from fastapi.responses import StreamingResponse
 
 from app.common.exceptions import (
+    ConflictError,
     InvalidStatusError,
+    NotFoundError,
     UnsupportedFileTypeError,
     ValidationError,
 )
-from app.common.s3 import delete_file, get_s3_client, upload_file
+from app.common.http_range import content_range, etag_matches, parse_range
+from app.common.profiling import load_profile, workflow_profile_key
+from app.common.s3 import (
+    delete_file,
+    get_s3_client,
+    head_file,
+    iter_file_chunks,
+    open_file,
+    upload_file,
+)
+from app.common.tracing import ctx_trace_id
+from app.config import config
+from app.research_analysis.export import ExportArchive, build_export
+from app.research_analysis.llm.response_cache import get_response_cache
 from app.research_analysis.models import (
     AnalysisFile,
     AnalysisListResponse,
     AnalysisResponse,
     AnalysisStatus,
+    ExportFormat,
     FileResponse,
+    NodeUsage,
     ResearchAnalysis,
     StatusUpdateRequest,
+    TimelineResponse,
+    UsageResponse,
+    UsageTotal,
 )
 from app.research_analysis.repository import ResearchAnalysisRepository
-from app.research_analysis.workflow import start_analysis_workflow
+from app.research_analysis.serialization import encode_analysis
+from app.research_analysis.timeline import build_timeline
+from app.research_analysis.workflow import (
+    cancel_analysis_workflow,
+    start_analysis_workflow,
+)
 
 logger = getLogger(__name__)
 
@@ -77,6 +105,45 @@ class ResearchAnalysisService:
             agent_state=analysis.agent_state,
         )
 
+    async def get_analysis_json(self, analysis_id: str) -> bytes:
+        """Get a research analysis as AnalysisResponse JSON, encoded directly."""
+        doc = await self.repository.get_analysis_document(analysis_id)
+        return encode_analysis(doc)
+
+    async def export_analysis(
+        self, analysis_id: str, export_format: ExportFormat
+    ) -> ExportArchive:
+        """Lay out the artifact export archive of an analysis for streaming."""
+        return await build_export(self.repository, analysis_id, export_format)
+
+    async def get_usage(self, analysis_id: str) -> UsageResponse:
+        """Get LLM usage per workflow node and in total for an analysis."""
+        analysis = await self.repository.get_analysis(analysis_id)
+        nodes = analysis.agent_state.usage if analysis.agent_state else {}
+
+        total = UsageTotal()
+        for usage in nodes.values():
+            for field in NodeUsage.model_fields:
+                total_field = "node_seconds" if field == "wall_seconds" else field
+                setattr(
+                    total,
+                    total_field,
+                    getattr(total, total_field) + getattr(usage, field),
+                )
+
+        return UsageResponse(analysis_id=analysis_id, nodes=nodes, total=total)
+
+    async def get_timeline(self, analysis_id: str) -> TimelineResponse:
+        """Get the tracing span tree of the latest workflow run of an analysis."""
+        await self.repository.get_analysis(analysis_id)
+        spans = await self.repository.list_spans(analysis_id)
+        return build_timeline(analysis_id, spans)
+
+    async def get_profile(self, analysis_id: str) -> str:
+        """Get the stored profile of the latest profiled workflow run."""
+        await self.repository.get_analysis(analysis_id)
+        return await asyncio.to_thread(load_profile, workflow_profile_key(analysis_id))
+
     async def update_analysis_status(
         self, analysis_id: str, request: StatusUpdateRequest
     ) -> AnalysisResponse:
@@ -114,10 +181,35 @@ class ResearchAnalysisService:
             )
             await self.repository.update_agent_state(analysis_id, agent_state.dict())
 
+            # Small analyses jump the LLM queue ahead of large studies
+            files = await self.repository.list_files(analysis_id)
+            priority = (
+                request.priority or len(files) <= config.llm_priority_max_transcripts
+            )
+
             # Start background workflow
-            asyncio.create_task(start_analysis_workflow(analysis_id, self.repository))
+            asyncio.create_task(
+                start_analysis_workflow(
+                    analysis_id,
+                    self.repository,
+                    bypass_llm_cache=request.bypass_llm_cache,
+                    priority=priority,
+                    trace_id=ctx_trace_id.get(None),
+                    profile=request.profile,
+                )
+            )
             logger.info("Started background workflow for analysis %s", analysis_id)
 
+        # Stop the workflow; replicas running it pick up the persisted status
+        elif request.status == AnalysisStatus.CANCELLED:
+            from app.research_analysis.models import AgentStatus
+
+            await self.repository.update_agent_state_fields(
+                analysis_id, {"status": AgentStatus.CANCELLED}
+            )
+            if cancel_analysis_workflow(analysis_id):
+                logger.info("Cancelled workflow for analysis %s", analysis_id)
+
         return await self.get_analysis(analysis_id)
 
     async def delete_analysis(self, analysis_id: str):
@@ -133,7 +225,17 @@ class ResearchAnalysisService:
                 logger.error("Failed to delete S3 file %s: %s", s3_key, e)
                 # Continue with deletion despite S3 errors
 
-        # Delete analysis record
+        # Delete the workflow profile, if one was recorded
+        try:
+            delete_file(workflow_profile_key(analysis_id), self.s3_client)
+        except Exception as e:
+            logger.error("Failed to delete profile of %s: %s", analysis_id, e)
+
+        # LLM responses generated from its transcripts must not outlive it
+        await get_response_cache().purge_analysis(analysis_id)
+
+        # Delete analysis record and its workflow spans
+        await self.repository.delete_spans_by_analysis(analysis_id)
         await self.repository.delete_analysis(analysis_id)
         logger.info("Deleted analysis %s and %d files", analysis_id, len(s3_keys))
 
@@ -213,6 +315,58 @@ class ResearchAnalysisService:
             for file in files
         ]
 
+    async def get_transcript_content(
+        self,
+        analysis_id: str,
+        file_id: str,
+        range_header: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+    ) -> Response:
+        """
+        Stream the content of an uploaded transcript from S3.
+
+        The S3 ETag answers If-None-Match with a 304, and a Range header is
+        served as a 206 of that byte range. The body is relayed chunk by chunk
+        and never held in full.
+        """
+        file = await self.repository.get_file(analysis_id, file_id)
+        try:
+            head = await asyncio.to_thread(head_file, file.s3_key, self.s3_client)
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("NoSuchKey", "404"):
+                msg = f"Content of file {file_id} not found"
+                raise NotFoundError(msg) from e
+            raise
+
+        etag, size = head["ETag"], head["ContentLength"]
+        headers = {"ETag": etag, "Accept-Ranges": "bytes"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        byte_range = parse_range(range_header, size)
+        start, end = byte_range or (0, size - 1)
+        try:
+            # IfMatch keeps the range and length consistent with the HEAD
+            body = await asyncio.to_thread(
+                open_file, file.s3_key, self.s3_client, byte_range, etag
+            )
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("PreconditionFailed", "412"):
+                msg = f"Content of file {file_id} changed, retry the request"
+                raise ConflictError(msg) from e
+            raise
+
+        headers["Content-Length"] = str(end - start + 1)
+        if byte_range is not None:
+            headers["Content-Range"] = content_range(start, end, size)
+        media_type = "text/markdown" if file.s3_key.endswith(".md") else "text/plain"
+        return StreamingResponse(
+            iter_file_chunks(body),
+            status_code=206 if byte_range is not None else 200,
+            media_type=f"{media_type}; charset=utf-8",
+            headers=headers,
+        )
+
     def _validate_file(self, file: UploadFile):
         """Validate uploaded file type."""
         if not file.filename:
@@ -241,9 +395,11 @@ class ResearchAnalysisService:
                 AnalysisStatus.RUNNING,
                 AnalysisStatus.COMPLETED,
                 AnalysisStatus.ERROR,
+                AnalysisStatus.CANCELLED,
             ],
             AnalysisStatus.COMPLETED: [],
             AnalysisStatus.ERROR: [],
+            AnalysisStatus.CANCELLED: [AnalysisStatus.CANCELLED],
         }
 
         return new in valid_transitions.get(current, [])
@@ -0,0 +1,199 @@
+"""Tests for streaming analysis exports."""
+
+import io
+import json
+import tarfile
+import zipfile
+from collections import Counter
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.common.errors import ErrorHandlerMiddleware
+from app.common.s3 import get_s3_client
+from app.research_analysis.models import AnalysisFile
+from app.research_analysis.repository import ResearchAnalysisRepository
+from app.research_analysis.router import router
+
+ANALYSIS_ID = "665f1c2e8f1b2c3d4e5f6a7b"
+
+AGENT_STATE = {
+    "findings_report": "# Findings\n\nRenewals time out — often.\n",
+    "affinity_map": "## Theme: timeouts\n" * 50,
+    "transcripts_pii_cleaned": ["Participant: [NAME] renews online.\n" * 2000, "Hi"],
+}
+
+
+class FakeRepository:
+    """Serves the export queries from an in-memory agent state."""
+
+    def __init__(self):
+        self.reads = Counter()
+        self.updated_at = datetime(2024, 5, 1, 10, 0)  # noqa: DTZ001
+
+    async def get_export_sizes(self, _analysis_id):
+        return {
+            "created_at": datetime(2024, 5, 1, 9, 30),  # noqa: DTZ001
+            "updated_at": self.updated_at,
+            "status": "COMPLETED",
+            "findings_report": len(AGENT_STATE["findings_report"].encode()),
+            "affinity_map": len(AGENT_STATE["affinity_map"].encode()),
+            "transcripts_pii_cleaned": [
+                len(t.encode()) for t in AGENT_STATE["transcripts_pii_cleaned"]
+            ],
+        }
+
+    async def list_files(self, _analysis_id):
+        return [
+            AnalysisFile(
+                analysis_id=ObjectId(ANALYSIS_ID),
+                s3_key=f"research/{ANALYSIS_ID}/0f8fad5b-d9cb-469f-a165-70867728950e-{name}",
+            )
+            for name in ("interview-1.md", "interview-2.md")
+        ]
+
+    async def get_agent_state_field(self, _analysis_id, field, index=None):
+        self.reads[(field, index)] += 1
+        value = AGENT_STATE[field]
+        return value[index] if index is not None else value
+
+
+@pytest.fixture
+def repository():
+    return FakeRepository()
+
+
+@pytest.fixture
+def client(repository):
+    app = FastAPI()
+    app.add_middleware(ErrorHandlerMiddleware)
+    app.include_router(router)
+    app.dependency_overrides[ResearchAnalysisRepository] = lambda: repository
+    app.dependency_overrides[get_s3_client] = lambda: MagicMock()
+    return TestClient(app)
+
+
+def export(client, export_format, **headers):
+    return client.get(
+        f"/api/v1/research-analyses/{ANALYSIS_ID}/export",
+        params={"format": export_format},
+        headers=headers,
+    )
+
+
+# Test Cases - Archives
+def test_zip_export_contains_artifacts_and_manifest(client, repository):
+    # When
+    response = export(client, "zip")
+
+    # Then
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert int(response.headers["content-length"]) == len(response.content)
+    archive = zipfile.ZipFile(io.BytesIO(response.content))
+    assert archive.testzip() is None
+    assert archive.namelist() == [
+        "manifest.json",
+        "findings_report.md",
+        "affinity_map.md",
+        "transcripts/01-interview-1.md",
+        "transcripts/02-interview-2.md",
+    ]
+    assert archive.read("findings_report.md").decode() == AGENT_STATE["findings_report"]
+    manifest = json.loads(archive.read("manifest.json"))
+    assert manifest["status"] == "COMPLETED"
+    assert len(manifest["files"]) == 4
+    # Each artifact is read once, on its own
+    assert set(repository.reads.values()) == {1}
+
+
+def test_tar_export_contains_artifacts(client):
+    # When
+    response = export(client, "tar")
+
+    # Then
+    assert response.headers["content-type"] == "application/x-tar"
+    assert int(response.headers["content-length"]) == len(response.content)
+    with tarfile.open(fileobj=io.BytesIO(response.content)) as archive:
+        member = archive.extractfile("transcripts/01-interview-1.md")
+        transcript = member.read().decode()
+    assert transcript == AGENT_STATE["transcripts_pii_cleaned"][0]
+
+
+# Test Cases - Ranges
+@pytest.mark.parametrize("export_format", ["zip", "tar"])
+@pytest.mark.parametrize(
+    ("byte_range", "start", "stop"),
+    [
+        ("bytes=0-99", 0, 100),
+        ("bytes=1000-40000", 1000, 40001),
+        ("bytes=50000-", 50000, None),
+        ("bytes=-200", -200, None),
+    ],
+)
+def test_range_resumes_the_same_bytes(client, export_format, byte_range, start, stop):
+    # Given
+    full = export(client, export_format).content
+    first, last = range(len(full))[start:stop][0], range(len(full))[start:stop][-1]
+
+    # When
+    response = export(client, export_format, Range=byte_range)
+
+    # Then
+    assert response.status_code == 206
+    assert response.content == full[start:stop]
+    assert response.headers["content-range"] == f"bytes {first}-{last}/{len(full)}"
+    assert int(response.headers["content-length"]) == len(response.content)
+
+
+def test_range_beyond_archive_is_not_satisfiable(client):
+    # Given
+    size = len(export(client, "zip").content)
+
+    # When
+    response = export(client, "zip", Range=f"bytes={size}-")
+
+    # Then
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{size}"
+
+
+# Test Cases - Validators
+def test_if_range_with_current_etag_resumes(client):
+    # Given
+    full = export(client, "zip")
+
+    # When
+    response = export(
+        client, "zip", Range="bytes=100-", **{"If-Range": full.headers["etag"]}
+    )
+
+    # Then
+    assert response.status_code == 206
+    assert response.headers["etag"] == full.headers["etag"]
+    assert response.content == full.content[100:]
+
+
+def test_if_range_after_analysis_changed_sends_whole_archive(client, repository):
+    # Given: an update that leaves every artifact size unchanged
+    etag = export(client, "zip").headers["etag"]
+    repository.updated_at = datetime(2024, 5, 1, 11, 0)  # noqa: DTZ001
+
+    # When
+    response = export(client, "zip", Range="bytes=100-", **{"If-Range": etag})
+
+    # Then
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert "content-range" not in response.headers
+    assert zipfile.ZipFile(io.BytesIO(response.content)).testzip() is None
+
+
+def test_etag_differs_per_format(client):
+    assert (
+        export(client, "zip").headers["etag"] != export(client, "tar").headers["etag"]
+    )
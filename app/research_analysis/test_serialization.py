@@ -0,0 +1,71 @@
+"""Tests for the fast analysis JSON encoder."""
+
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.main import app
+from app.research_analysis.models import AnalysisResponse, ResearchAnalysis
+from app.research_analysis.serialization import encode_analysis
+
+ANALYSIS_ID = ObjectId("665f1c2e8f1b2c3d4e5f6a7b")
+
+
+def pydantic_json(doc: dict) -> bytes:
+    """The previous response path: validate, copy, serialize by alias."""
+    analysis = ResearchAnalysis(**doc)
+    return AnalysisResponse(
+        id=str(analysis.id),
+        created_at=analysis.created_at,
+        status=analysis.status,
+        error_message=analysis.error_message,
+        agent_state=analysis.agent_state,
+    ).model_dump_json(by_alias=True)
+
+
+# Test Cases - Encoding
+@pytest.mark.parametrize(
+    "doc",
+    [
+        {
+            "_id": ANALYSIS_ID,
+            # MongoDB returns naive datetimes
+            "created_at": datetime(2024, 5, 1, 9, 30, 0, 123000),  # noqa: DTZ001
+            "status": "RUNNING",
+            "error_message": None,
+            "agent_state": {
+                "process_start_date": datetime(2024, 5, 1, 9, 31, tzinfo=timezone.utc),
+                "transcripts": ["Participant: it times out — again"],
+                "transcripts_pii_cleaned": ["Participant: it times out"],
+                "affinity_map": "## Theme",
+                "findings_sections": {"key_insights": "- insight"},
+                "status": "GENERATING_FINDINGS",
+                "usage": {"remove_pii": {"llm_calls": 2, "llm_seconds": 1.5}},
+                "timed_out_nodes": {"findings_next_steps": 1800.0},
+                "findings_section_errors": {},
+            },
+        },
+        {
+            "_id": ANALYSIS_ID,
+            "created_at": datetime(2024, 5, 1, 9, 30),  # noqa: DTZ001
+            "status": "INIT",
+        },
+    ],
+    ids=["full agent state", "new analysis"],
+)
+def test_encoding_matches_the_response_model(doc):
+    # When
+    encoded = encode_analysis(doc)
+
+    # Then: same JSON, with defaults filled in and undeclared fields dropped
+    assert encoded.decode() == pydantic_json(doc)
+
+
+def test_openapi_still_documents_the_response_model():
+    # When
+    operation = app.openapi()["paths"]["/api/v1/research-analyses/{analysis_id}"]
+
+    # Then
+    schema = operation["get"]["responses"]["200"]["content"]["application/json"]
+    assert schema["schema"]["$ref"].endswith("/AnalysisResponse")
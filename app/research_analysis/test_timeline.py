@@ -0,0 +1,73 @@
+"""Tests for analysis span timelines."""
+
+from app.research_analysis.timeline import build_timeline
+
+ANALYSIS_ID = "665f1c2e8f1b2c3d4e5f6a7b"
+MS = 1_000_000
+
+
+def span(name, span_id, parent=None, start=0, end=None, trace_id="trace-2"):
+    return {
+        "name": name,
+        "trace_id": trace_id,
+        "span_id": span_id,
+        "parent_span_id": parent,
+        "start_time_unix_nano": start * MS,
+        "end_time_unix_nano": end * MS if end is not None else None,
+        "attributes": {},
+        "status": "UNSET",
+    }
+
+
+# Test Cases - Timeline
+def test_timeline_nests_spans_with_durations():
+    # Given
+    spans = [
+        span("analysis", "a", start=1000, end=5000),
+        span("remove_pii", "b", parent="a", start=1100, end=3000),
+        span("llm.chat", "c", parent="b", start=1200, end=2900),
+    ]
+
+    # When
+    timeline = build_timeline(ANALYSIS_ID, spans)
+
+    # Then
+    (root,) = timeline.spans
+    assert root.duration_ms == 4000
+    node = root.children[0]
+    assert (node.name, node.offset_ms, node.duration_ms) == ("remove_pii", 100, 1900)
+    assert node.children[0].name == "llm.chat"
+
+
+def test_timeline_of_running_workflow_shows_finished_nodes():
+    # Given: the root span has not finished yet
+    spans = [
+        span("transcript_loader", "b", parent="a", start=1000, end=1200),
+        span("remove_pii", "c", parent="a", start=1200, end=2000),
+    ]
+
+    # When
+    timeline = build_timeline(ANALYSIS_ID, spans)
+
+    # Then
+    assert [node.name for node in timeline.spans] == ["transcript_loader", "remove_pii"]
+
+
+def test_timeline_shows_latest_run_only():
+    # Given
+    spans = [
+        span("analysis", "old", start=0, end=500, trace_id="trace-1"),
+        span("analysis", "new", start=1000, end=1500),
+    ]
+
+    # When
+    timeline = build_timeline(ANALYSIS_ID, spans)
+
+    # Then
+    assert timeline.trace_id == "trace-2"
+    assert [node.span_id for node in timeline.spans] == ["new"]
+
+
+def test_timeline_without_spans_is_empty():
+    # Given / When / Then
+    assert build_timeline(ANALYSIS_ID, []).spans == []
@@ -0,0 +1,148 @@
+"""Tests for streaming transcript content from S3."""
+
+import io
+from unittest.mock import MagicMock
+
+import pytest
+from botocore.exceptions import ClientError
+from botocore.response import StreamingBody
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.common.errors import ErrorHandlerMiddleware
+from app.common.exceptions import NotFoundError
+from app.common.s3 import get_s3_client
+from app.main import app as main_app
+from app.research_analysis.models import AnalysisFile
+from app.research_analysis.repository import ResearchAnalysisRepository
+from app.research_analysis.router import router
+
+ANALYSIS_ID = "665f1c2e8f1b2c3d4e5f6a7b"
+FILE_ID = "665f1c2e8f1b2c3d4e5f6a7c"
+CONTENT = ("Interviewer: How do you brew?\nParticipant: Loose leaf. " * 5000).encode()
+ETAG = '"9b2cf535f27731c974343645a3985328"'
+URL = f"/api/v1/research-analyses/{ANALYSIS_ID}/transcripts/{FILE_ID}/content"
+
+
+class FakeRepository:
+    async def get_file(self, analysis_id, file_id):
+        if file_id != FILE_ID:
+            msg = f"File {file_id} not found in analysis {analysis_id}"
+            raise NotFoundError(msg)
+        return AnalysisFile(
+            id=ObjectId(FILE_ID),
+            analysis_id=ObjectId(ANALYSIS_ID),
+            s3_key=f"research/{ANALYSIS_ID}/uuid-interview.md",
+        )
+
+
+def get_object(Range=None, **_):  # noqa: N803
+    body = CONTENT
+    if Range:
+        start, end = map(int, Range.removeprefix("bytes=").split("-"))
+        body = CONTENT[start : end + 1]
+    return {"Body": StreamingBody(io.BytesIO(body), len(body))}
+
+
+@pytest.fixture
+def s3_client():
+    client = MagicMock()
+    client.head_object.return_value = {"ContentLength": len(CONTENT), "ETag": ETAG}
+    client.get_object.side_effect = get_object
+    return client
+
+
+@pytest.fixture
+def client(s3_client):
+    app = FastAPI()
+    app.add_middleware(ErrorHandlerMiddleware)
+    app.include_router(router)
+    app.dependency_overrides[ResearchAnalysisRepository] = FakeRepository
+    app.dependency_overrides[get_s3_client] = lambda: s3_client
+    return TestClient(app)
+
+
+@pytest.fixture
+def main_client(s3_client):
+    """Client of the application with its full middleware stack."""
+    main_app.dependency_overrides[ResearchAnalysisRepository] = FakeRepository
+    main_app.dependency_overrides[get_s3_client] = lambda: s3_client
+    yield TestClient(main_app)
+    main_app.dependency_overrides.clear()
+
+
+# Test Cases - Content
+def test_streams_whole_transcript_with_etag(client):
+    # When
+    response = client.get(URL)
+
+    # Then
+    assert response.status_code == 200
+    assert response.content == CONTENT
+    assert response.headers["etag"] == ETAG
+    assert response.headers["content-length"] == str(len(CONTENT))
+    assert response.headers["content-type"] == "text/markdown; charset=utf-8"
+
+
+def test_streams_requested_range_of_the_same_version(client, s3_client):
+    # When
+    response = client.get(URL, headers={"Range": "bytes=100-4195"})
+
+    # Then
+    assert response.status_code == 206
+    assert response.content == CONTENT[100:4196]
+    assert response.headers["content-range"] == f"bytes 100-4195/{len(CONTENT)}"
+    assert s3_client.get_object.call_args.kwargs["Range"] == "bytes=100-4195"
+    assert s3_client.get_object.call_args.kwargs["IfMatch"] == ETAG
+
+
+def test_matching_if_none_match_is_not_modified(client, s3_client):
+    # When
+    response = client.get(URL, headers={"If-None-Match": f'"other", W/{ETAG}'})
+
+    # Then: the body is never fetched
+    assert response.status_code == 304
+    assert response.headers["etag"] == ETAG
+    s3_client.get_object.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("file_id", "head_error", "status_code"),
+    [
+        ("665f1c2e8f1b2c3d4e5f6a7d", None, 404),
+        (FILE_ID, "404", 404),
+    ],
+    ids=["file of another analysis", "object missing from S3"],
+)
+def test_missing_transcript_is_not_found(
+    client, s3_client, file_id, head_error, status_code
+):
+    # Given
+    if head_error:
+        s3_client.head_object.side_effect = ClientError(
+            {"Error": {"Code": head_error}}, "HeadObject"
+        )
+
+    # When
+    response = client.get(URL.replace(FILE_ID, file_id))
+
+    # Then
+    assert response.status_code == status_code
+
+
+# Test Cases - Compression
+def test_transcript_is_sent_unencoded_under_its_etag(main_client):
+    # When: the client accepts gzip, then resumes with a range
+    full = main_client.get(URL, headers={"Accept-Encoding": "gzip"})
+    resumed = main_client.get(
+        URL, headers={"Accept-Encoding": "gzip", "Range": "bytes=1000-"}
+    )
+
+    # Then: both carry bytes of the one representation the ETag names
+    assert "content-encoding" not in full.headers
+    assert full.headers["content-length"] == str(len(CONTENT))
+    assert full.headers["etag"] == ETAG
+    assert resumed.status_code == 206
+    assert "content-encoding" not in resumed.headers
+    assert full.content[1000:] == resumed.content
@@ -0,0 +1,38 @@
+"""Tests for the LLM usage summary of an analysis."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.research_analysis.models import AgentState, NodeUsage, ResearchAnalysis
+from app.research_analysis.service import ResearchAnalysisService
+
+ANALYSIS_ID = "665f1c2e8f1b2c3d4e5f6a7b"
+
+
+# Test Cases - Totals
+@pytest.mark.asyncio
+async def test_total_sums_node_seconds_of_parallel_sections():
+    # Given: two findings sections ran side by side for 2s each
+    usage = {
+        "remove_pii": NodeUsage(llm_calls=1, input_tokens=100, wall_seconds=1.0),
+        "findings_key_insights": NodeUsage(llm_calls=1, wall_seconds=2.0),
+        "findings_next_steps": NodeUsage(llm_calls=1, wall_seconds=2.0),
+    }
+    repository = MagicMock()
+    repository.get_analysis = AsyncMock(
+        return_value=ResearchAnalysis(agent_state=AgentState(usage=usage))
+    )
+
+    # When
+    response = await ResearchAnalysisService(repository, MagicMock()).get_usage(
+        ANALYSIS_ID
+    )
+
+    # Then: the sum is reported as node-seconds, not as wall time
+    total = response.total.model_dump()
+    assert total["llm_calls"] == 3
+    assert total["input_tokens"] == 100
+    assert total["node_seconds"] == 5.0
+    assert "wall_seconds" not in total
+    assert response.nodes["findings_next_steps"].wall_seconds == 2.0
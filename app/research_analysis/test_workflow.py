@@ -0,0 +1,187 @@
+"""Tests for starting and cancelling background analysis workflows."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from bson import ObjectId
+
+from app.common.tracing import ctx_trace_id
+from app.research_analysis import workflow
+from app.research_analysis.models import AgentStatus, AnalysisStatus
+from app.research_analysis.repository import ResearchAnalysisRepository
+
+ANALYSIS_ID = "665f1c2e8f1b2c3d4e5f6a7b"
+
+
+@pytest.fixture
+def repository():
+    repo = MagicMock()
+    repo.get_analysis = AsyncMock()
+    repo.get_analysis_status = AsyncMock(return_value=AnalysisStatus.RUNNING)
+    repo.update_analysis_status = AsyncMock()
+    repo.finish_running_analysis = AsyncMock(return_value=True)
+    repo.update_agent_state_fields = AsyncMock()
+    repo.add_spans = AsyncMock()
+    return repo
+
+
+class FakeAnalysisCollection:
+    """Analysis collection applying $set updates to matching documents."""
+
+    def __init__(self, doc):
+        self.doc = doc
+
+    async def update_one(self, query, update):
+        matched = all(self.doc.get(key) == value for key, value in query.items())
+        if matched:
+            self.doc.update(update["$set"])
+        return MagicMock(matched_count=int(matched))
+
+
+@pytest.fixture
+def hanging_workflow():
+    """Workflow execution that runs until cancelled."""
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def execute(_analysis_id, _repository):
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with patch.object(workflow, "execute_research_analysis_workflow", execute):
+        yield started, cancelled
+
+
+# Test Cases - Cancellation
+@pytest.mark.asyncio
+async def test_cancel_stops_local_workflow(repository, hanging_workflow):
+    # Given
+    started, cancelled = hanging_workflow
+    task = asyncio.create_task(
+        workflow.start_analysis_workflow(ANALYSIS_ID, repository)
+    )
+    await started.wait()
+
+    # When
+    assert workflow.cancel_analysis_workflow(ANALYSIS_ID)
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    # Then
+    assert cancelled.is_set()
+    assert ANALYSIS_ID not in workflow._running_workflows
+    repository.update_analysis_status.assert_awaited_once_with(
+        ANALYSIS_ID, AnalysisStatus.CANCELLED, workflow.CANCELLED_MESSAGE
+    )
+    fields = repository.update_agent_state_fields.await_args.args[1]
+    assert fields["status"] == AgentStatus.CANCELLED
+
+
+@pytest.mark.asyncio
+async def test_cancellation_from_another_replica_is_picked_up(
+    repository, hanging_workflow
+):
+    # Given: another replica marks the analysis as cancelled
+    started, cancelled = hanging_workflow
+    repository.get_analysis_status = AsyncMock(return_value=AnalysisStatus.CANCELLED)
+
+    # When
+    with patch.object(workflow.config, "workflow_cancel_poll_seconds", 0.05):
+        task = asyncio.create_task(
+            workflow.start_analysis_workflow(ANALYSIS_ID, repository)
+        )
+        await started.wait()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, timeout=1)
+
+    # Then
+    assert cancelled.is_set()
+    repository.get_analysis_status.assert_awaited_with(ANALYSIS_ID)
+
+
+@pytest.mark.asyncio
+async def test_cancel_while_workflow_finishes_keeps_cancelled_status():
+    # Given: the analysis is cancelled just as its workflow finishes
+    doc = {"_id": ObjectId(ANALYSIS_ID), "status": AnalysisStatus.RUNNING.value}
+    repository = ResearchAnalysisRepository(MagicMock())
+    repository.research_analysis_collection = FakeAnalysisCollection(doc)
+    repository.get_analysis = AsyncMock()
+    repository.get_analysis_status = AsyncMock(return_value=AnalysisStatus.RUNNING)
+    repository.add_spans = AsyncMock()
+
+    async def execute(_analysis_id, _repository):
+        doc["status"] = AnalysisStatus.CANCELLED.value
+        return {"status": AgentStatus.FINISHED}
+
+    # When
+    with patch.object(workflow, "execute_research_analysis_workflow", execute):
+        await asyncio.create_task(
+            workflow.start_analysis_workflow(ANALYSIS_ID, repository)
+        )
+
+    # Then
+    assert doc["status"] == AnalysisStatus.CANCELLED.value
+
+
+def test_cancel_without_running_workflow_is_a_no_op():
+    # Given / When / Then
+    assert not workflow.cancel_analysis_workflow(ANALYSIS_ID)
+
+
+# Test Cases - Tracing
+@pytest.mark.asyncio
+async def test_request_trace_id_is_carried_into_workflow(repository):
+    # Given
+    request_id = "0f8fad5b-d9cb-469f-a165-70867728950e"
+    seen = {}
+
+    async def execute(_analysis_id, _repository):
+        seen["trace_id"] = ctx_trace_id.get(None)
+        return {"status": AgentStatus.FINISHED}
+
+    # When
+    with patch.object(workflow, "execute_research_analysis_workflow", execute):
+        await asyncio.create_task(
+            workflow.start_analysis_workflow(
+                ANALYSIS_ID, repository, trace_id=request_id
+            )
+        )
+
+    # Then: the analysis span continues the request's trace and is stored
+    assert seen["trace_id"] == request_id
+    (stored,) = repository.add_spans.await_args.args[1]
+    assert stored["name"] == "analysis"
+    assert stored["trace_id"] == "0f8fad5bd9cb469fa16570867728950e"
+    assert stored["attributes"] == {
+        "analysis.id": ANALYSIS_ID,
+        "request.id": request_id,
+    }
+
+
+# Test Cases - Profiling
+@pytest.mark.asyncio
+async def test_profiled_workflow_stores_profile_under_analysis_prefix(repository):
+    # Given
+    async def execute(_analysis_id, _repository):
+        end = time.monotonic() + 0.1
+        while time.monotonic() < end:
+            pass
+        return {"status": AgentStatus.FINISHED}
+
+    # When
+    with (
+        patch.object(workflow, "execute_research_analysis_workflow", execute),
+        patch.object(workflow, "save_profile") as save_profile,
+    ):
+        await workflow.start_analysis_workflow(ANALYSIS_ID, repository, profile=True)
+
+    # Then
+    key, profiler = save_profile.call_args.args
+    assert key == f"research/{ANALYSIS_ID}/profile.folded"
+    assert "test_workflow:test_profiled_workflow" in profiler.folded()
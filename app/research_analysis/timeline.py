@@ -0,0 +1,104 @@
+"""Tracing span timelines of analysis workflows."""
+
+from datetime import datetime, timezone
+from logging import getLogger
+from typing import Optional
+
+from app.common.spans import InMemorySpanExporter, add_span_exporter, ctx_span
+from app.config import config
+from app.research_analysis.models import TimelineResponse, TimelineSpan
+from app.research_analysis.repository import ResearchAnalysisRepository
+
+logger = getLogger(__name__)
+
+_span_buffer: Optional[InMemorySpanExporter] = None
+
+
+def get_span_buffer() -> InMemorySpanExporter:
+    """Get the exporter buffering finished spans until they are stored."""
+    global _span_buffer
+    if _span_buffer is None:
+        _span_buffer = InMemorySpanExporter(max_spans=config.span_buffer_max_spans)
+        add_span_exporter(_span_buffer)
+    return _span_buffer
+
+
+async def store_spans(
+    repository: ResearchAnalysisRepository,
+    analysis_id: str,
+    trace_id: Optional[str] = None,
+):
+    """
+    Store the buffered finished spans of an analysis workflow trace.
+
+    Failures are logged rather than raised, so tracing never fails a workflow.
+
+    Args:
+        repository: Repository for database operations
+        analysis_id: ID of the analysis
+        trace_id: Trace to store, by default the trace of the current span
+    """
+    if trace_id is None:
+        current = ctx_span.get()
+        if current is None:
+            return
+        trace_id = current.trace_id
+
+    spans = get_span_buffer().pop_spans(trace_id)
+    if not spans:
+        return
+    try:
+        await repository.add_spans(analysis_id, [span.to_dict() for span in spans])
+    except Exception as e:
+        logger.error("Failed to store spans for analysis %s: %s", analysis_id, e)
+
+
+def build_timeline(analysis_id: str, spans: list[dict]) -> TimelineResponse:
+    """
+    Build the span tree of the latest workflow run of an analysis.
+
+    Spans whose parent has not finished yet, such as the nodes of a running
+    workflow, are shown at the top level.
+
+    Args:
+        analysis_id: ID of the analysis
+        spans: Stored spans of the analysis, see Span.to_dict
+
+    Returns:
+        Timeline of the most recently started trace
+    """
+    if not spans:
+        return TimelineResponse(analysis_id=analysis_id)
+
+    latest = max(spans, key=lambda span: span["start_time_unix_nano"])
+    trace_id = latest["trace_id"]
+    trace = sorted(
+        (span for span in spans if span["trace_id"] == trace_id),
+        key=lambda span: span["start_time_unix_nano"],
+    )
+    trace_start = trace[0]["start_time_unix_nano"]
+
+    nodes = {span["span_id"]: _timeline_span(span, trace_start) for span in trace}
+    roots = []
+    for span in trace:
+        parent = nodes.get(span.get("parent_span_id"))
+        if parent is None:
+            roots.append(nodes[span["span_id"]])
+        else:
+            parent.children.append(nodes[span["span_id"]])
+
+    return TimelineResponse(analysis_id=analysis_id, trace_id=trace_id, spans=roots)
+
+
+def _timeline_span(span: dict, trace_start: int) -> TimelineSpan:
+    start, end = span["start_time_unix_nano"], span.get("end_time_unix_nano")
+    return TimelineSpan(
+        name=span["name"],
+        span_id=span["span_id"],
+        start_time=datetime.fromtimestamp(start / 1e9, tz=timezone.utc),
+        offset_ms=(start - trace_start) / 1e6,
+        duration_ms=(end - start) / 1e6 if end is not None else None,
+        status=span["status"],
+        status_message=span.get("status_message"),
+        attributes=span.get("attributes") or {},
+    )
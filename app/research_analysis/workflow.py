@@ -1,27 +1,86 @@
+import asyncio
+import contextlib
 from logging import getLogger
+from typing import Optional
 
+from app.common.profiling import (
+    SamplingProfiler,
+    save_profile,
+    workflow_profile_key,
+)
+from app.common.spans import start_span, to_trace_id
+from app.common.tracing import ctx_trace_id
+from app.config import config
+from app.research_analysis.agents.progress import PauseReporter
 from app.research_analysis.agents.workflow import execute_research_analysis_workflow
-from app.research_analysis.models import AnalysisStatus
+from app.research_analysis.llm.context import (
+    ctx_llm_cache_bypass,
+    ctx_llm_pause_listener,
+    ctx_llm_schedule,
+)
+from app.research_analysis.llm.scheduler import SchedulingClass
+from app.research_analysis.models import AgentStatus, AnalysisStatus
 from app.research_analysis.repository import ResearchAnalysisRepository
+from app.research_analysis.timeline import get_span_buffer, store_spans
 
 logger = getLogger(__name__)
 
-# Global registry of running workflows to prevent duplicates
-_running_workflows = set()
+# Global registry of running workflow tasks to prevent duplicates
+_running_workflows: dict[str, asyncio.Task] = {}
 
+CANCELLED_MESSAGE = "Analysis cancelled"
 
-async def start_analysis_workflow(
-    analysis_id: str, repository: ResearchAnalysisRepository
-):
+
+def cancel_analysis_workflow(analysis_id: str) -> bool:
     """
-    Start the LangGraph analysis workflow for the given analysis ID.
+    Cancel the workflow of an analysis if it runs in this process.
+
+    Returns:
+        True if a running workflow was cancelled
     """
-    if analysis_id in _running_workflows:
-        logger.info("Workflow already running for analysis %s", analysis_id)
-        return
+    task = _running_workflows.get(analysis_id)
+    if task is None or task.done():
+        return False
+    task.cancel()
+    return True
+
+
+async def _watch_for_cancellation(
+    analysis_id: str, repository: ResearchAnalysisRepository, task: asyncio.Task
+):
+    """Cancel the workflow task once the analysis is cancelled elsewhere."""
+    while True:
+        await asyncio.sleep(config.workflow_cancel_poll_seconds)
+        try:
+            status = await repository.get_analysis_status(analysis_id)
+        except Exception as e:
+            logger.warning(
+                "Failed to check cancellation for analysis %s: %s", analysis_id, e
+            )
+            continue
+        if status == AnalysisStatus.CANCELLED:
+            logger.info("Analysis %s was cancelled, stopping workflow", analysis_id)
+            task.cancel()
+            return
 
-    _running_workflows.add(analysis_id)
 
+async def _record_cancellation(
+    analysis_id: str, repository: ResearchAnalysisRepository
+):
+    try:
+        await repository.update_analysis_status(
+            analysis_id, AnalysisStatus.CANCELLED, CANCELLED_MESSAGE
+        )
+        await repository.update_agent_state_fields(
+            analysis_id,
+            {"status": AgentStatus.CANCELLED, "error_message": CANCELLED_MESSAGE},
+        )
+    except Exception as e:
+        logger.error("Failed to record cancellation of %s: %s", analysis_id, e)
+
+
+async def _run_workflow(analysis_id: str, repository: ResearchAnalysisRepository):
+    """Run the workflow and record its outcome on the analysis."""
     try:
         # Verify analysis exists
         await repository.get_analysis(analysis_id)
@@ -30,16 +89,18 @@ async def start_analysis_workflow(
         # Execute the LangGraph workflow
         final_state = await execute_research_analysis_workflow(analysis_id, repository)
 
-        # Update main analysis status based on workflow result
+        # Update main analysis status based on workflow result, unless the
+        # analysis was cancelled while the workflow was finishing
         if final_state["status"].value == "FINISHED":
-            await repository.update_analysis_status(
+            if await repository.finish_running_analysis(
                 analysis_id, AnalysisStatus.COMPLETED
-            )
-            logger.info(
-                "LangGraph workflow completed successfully for analysis %s", analysis_id
-            )
+            ):
+                logger.info(
+                    "LangGraph workflow completed successfully for analysis %s",
+                    analysis_id,
+                )
         else:
-            await repository.update_analysis_status(
+            await repository.finish_running_analysis(
                 analysis_id, AnalysisStatus.ERROR, final_state.get("error_message")
             )
             logger.error(
@@ -48,11 +109,89 @@ async def start_analysis_workflow(
                 final_state.get("error_message"),
             )
 
+    except asyncio.CancelledError:
+        logger.info("Workflow cancelled for analysis %s", analysis_id)
+        await _record_cancellation(analysis_id, repository)
+        raise
+
     except Exception as e:
         error_msg = f"Workflow execution failed: {str(e)}"
         logger.error("Workflow failed for analysis %s: %s", analysis_id, e)
-        await repository.update_analysis_status(
+        await repository.finish_running_analysis(
             analysis_id, AnalysisStatus.ERROR, error_msg
         )
+
+
+async def _store_profile(analysis_id: str, profiler: SamplingProfiler):
+    profiler.stop()
+    try:
+        await asyncio.to_thread(
+            save_profile, workflow_profile_key(analysis_id), profiler
+        )
+    except Exception as e:
+        logger.error("Failed to store profile of analysis %s: %s", analysis_id, e)
+
+
+async def start_analysis_workflow(
+    analysis_id: str,
+    repository: ResearchAnalysisRepository,
+    bypass_llm_cache: bool = False,
+    priority: bool = False,
+    trace_id: Optional[str] = None,
+    profile: bool = False,
+):
+    """
+    Start the LangGraph analysis workflow for the given analysis ID.
+
+    Set bypass_llm_cache to force fresh LLM responses for this analysis, and
+    priority to schedule its LLM calls in the priority lane.
+
+    The workflow stops when cancelled through cancel_analysis_workflow, or
+    when the analysis status is set to CANCELLED by another replica.
+    Cancellation interrupts in-flight LLM streams and S3 reads.
+
+    The workflow runs in an "analysis" tracing span, continuing the trace of
+    the request that started it when its trace_id is a UUID. Spans are stored
+    as nodes finish, for the analysis timeline.
+
+    With profile set, the run is sampled by SamplingProfiler and the profile
+    stored under the analysis prefix in S3.
+    """
+    if analysis_id in _running_workflows:
+        logger.info("Workflow already running for analysis %s", analysis_id)
+        return
+
+    task = asyncio.current_task()
+    _running_workflows[analysis_id] = task
+    if trace_id:
+        ctx_trace_id.set(trace_id)
+    ctx_llm_cache_bypass.set(bypass_llm_cache)
+    ctx_llm_pause_listener.set(PauseReporter(repository, analysis_id))
+    ctx_llm_schedule.set(SchedulingClass(analysis_id, priority=priority))
+    watcher = asyncio.create_task(
+        _watch_for_cancellation(analysis_id, repository, task)
+    )
+    get_span_buffer()
+    span_trace_id = to_trace_id(trace_id)
+    attributes = {"analysis.id": analysis_id}
+    if trace_id:
+        attributes["request.id"] = trace_id
+
+    profiler = None
+    if profile:
+        # Only samples taken while the workflow's tasks run on the loop count
+        profiler = SamplingProfiler()
+        profiler.follow_current_task()
+        profiler.start()
+
+    try:
+        with start_span("analysis", trace_id=span_trace_id, **attributes):
+            await _run_workflow(analysis_id, repository)
     finally:
-        _running_workflows.discard(analysis_id)
+        watcher.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await watcher
+        _running_workflows.pop(analysis_id, None)
+        await store_spans(repository, analysis_id, span_trace_id)
+        if profiler:
+            await _store_profile(analysis_id, profiler)
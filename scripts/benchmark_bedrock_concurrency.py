@@ -0,0 +1,113 @@
+"""Concurrency benchmark for Bedrock calls against a local stub endpoint.
+
+Starts a threaded HTTP server that mimics the Bedrock InvokeModel API with a
+fixed latency, then fires concurrent chat calls through:
+
+- the previous path: ``ChatBedrock.ainvoke`` with botocore's default pool and
+  the event loop's default executor
+- the sized ``BedrockTransport`` used by ``chat_with_bedrock``
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_bedrock_concurrency.py [--calls 64]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+
+from langchain_aws import ChatBedrock  # noqa: E402
+
+from app.config import config  # noqa: E402
+from app.research_analysis.llm import bedrock_client  # noqa: E402
+from app.research_analysis.llm.transport import get_bedrock_transport  # noqa: E402
+
+RESPONSE = json.dumps(
+    {
+        "id": "stub",
+        "type": "message",
+        "role": "assistant",
+        "content": [{"type": "text", "text": "PII_FOUND: NO"}],
+        "stop_reason": "end_turn",
+        "usage": {"input_tokens": 10, "output_tokens": 4},
+    }
+).encode()
+
+
+def start_stub_server(latency: float) -> ThreadingHTTPServer:
+    class StubBedrockHandler(BaseHTTPRequestHandler):
+        def do_POST(self):  # noqa: N802
+            self.rfile.read(int(self.headers.get("content-length", 0)))
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("content-type", "application/json")
+            self.send_header("content-length", str(len(RESPONSE)))
+            self.end_headers()
+            self.wfile.write(RESPONSE)
+
+        def log_message(self, *_):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubBedrockHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def run_default(calls: int) -> float:
+    llm = ChatBedrock(
+        model_id=config.bedrock_model_id,
+        region_name=config.bedrock_region,
+        endpoint_url=config.bedrock_endpoint_url,
+        temperature=0,
+        max_tokens=4000,
+    )
+    start = time.perf_counter()
+    await asyncio.gather(*[llm.ainvoke(f"prompt {i}") for i in range(calls)])
+    return time.perf_counter() - start
+
+
+async def run_transport(calls: int) -> float:
+    get_bedrock_transport().start()
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[
+            bedrock_client.chat_with_bedrock("system", f"prompt {i}")
+            for i in range(calls)
+        ]
+    )
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--latency", type=float, default=0.5)
+    args = parser.parse_args()
+
+    server = start_stub_server(args.latency)
+    config.bedrock_endpoint_url = f"http://127.0.0.1:{server.server_port}"
+    config.llm_cache_enabled = False
+
+    default = asyncio.run(run_default(args.calls))
+    transport = asyncio.run(run_transport(args.calls))
+    get_bedrock_transport().close()
+
+    ideal = args.latency
+    print(f"{args.calls} concurrent calls, {args.latency:.2f}s stub latency")  # noqa: T201
+    print(f"default executor/pool  {default:7.2f}s")  # noqa: T201
+    print(  # noqa: T201
+        f"sized transport        {transport:7.2f}s  "
+        f"({default / transport:.1f}x faster, ideal {ideal:.2f}s)"
+    )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
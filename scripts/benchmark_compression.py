@@ -0,0 +1,115 @@
+"""Bandwidth and latency of compressed analysis responses.
+
+Builds a completed analysis from the example transcripts (raw and
+PII-cleaned copies, as stored in ``agent_state``), encodes it like
+``GET /api/v1/research-analyses/{id}`` and serves it through
+``CompressionMiddleware`` once per encoding. For each encoding it reports the
+bytes on the wire, server time per response, client decode time, and the
+total latency over a link of the given bandwidth.
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_compression.py [--mbps 20] [--requests 50]
+"""
+
+import argparse
+import asyncio
+import gzip
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+
+import httpx  # noqa: E402
+from bson import ObjectId  # noqa: E402
+from fastapi import FastAPI, Response  # noqa: E402
+
+from app.common.compression import CompressionMiddleware, zstd  # noqa: E402
+from app.config import config  # noqa: E402
+from app.research_analysis.serialization import encode_analysis  # noqa: E402
+
+TRANSCRIPTS_DIR = Path(__file__).parent.parent / "example-transcripts"
+DECODERS = {"identity": bytes, "gzip": gzip.decompress, "zstd": zstd.decompress}
+
+
+def analysis_body() -> bytes:
+    transcripts = [path.read_text() for path in sorted(TRANSCRIPTS_DIR.glob("*.md"))]
+    return encode_analysis(
+        {
+            "_id": ObjectId(),
+            "created_at": datetime.now(timezone.utc),
+            "status": "COMPLETED",
+            "agent_state": {
+                "transcripts": transcripts,
+                "transcripts_pii_cleaned": transcripts,
+                "status": "FINISHED",
+            },
+        }
+    )
+
+
+def build_app(body: bytes) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(
+        CompressionMiddleware,
+        path_prefix="/api",
+        minimum_size=config.compression_minimum_size,
+    )
+
+    @app.get("/api/analysis")
+    async def analysis():
+        return Response(body, media_type="application/json")
+
+    return app
+
+
+async def measure(app: FastAPI, encoding: str, requests: int) -> tuple[bytes, float]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        headers = {"Accept-Encoding": encoding}
+        start = time.perf_counter()
+        for _ in range(requests):
+            async with c.stream("GET", "/api/analysis", headers=headers) as response:
+                wire = b"".join([chunk async for chunk in response.aiter_raw()])
+        server = (time.perf_counter() - start) / requests
+    return wire, server
+
+
+async def run(mbps: float, requests: int):
+    body = analysis_body()
+    app = build_app(body)
+    transcripts = len(list(TRANSCRIPTS_DIR.glob("*.md")))
+    print(  # noqa: T201
+        f"{transcripts} example transcripts, {len(body) / 1024:.0f} KiB JSON, "
+        f"{mbps:g} Mbit/s link"
+    )
+    print(  # noqa: T201
+        f"{'encoding':<9} {'wire KiB':>9} {'ratio':>6} {'server':>8} "
+        f"{'decode':>8} {'transfer':>9} {'total':>9}"
+    )
+    for encoding in ("identity", "gzip", "zstd"):
+        wire, server = await measure(app, encoding, requests)
+        start = time.perf_counter()
+        assert DECODERS[encoding](wire) == body  # noqa: S101
+        decode = time.perf_counter() - start
+        transfer = len(wire) * 8 / (mbps * 1e6)
+        total = server + decode + transfer
+        print(  # noqa: T201
+            f"{encoding:<9} {len(wire) / 1024:9.1f} {len(body) / len(wire):5.1f}x "
+            f"{server * 1000:6.2f}ms {decode * 1000:6.2f}ms "
+            f"{transfer * 1000:7.1f}ms {total * 1000:7.1f}ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mbps", type=float, default=20)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(run(args.mbps, args.requests))
+
+
+if __name__ == "__main__":
+    main()
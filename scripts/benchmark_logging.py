@@ -0,0 +1,164 @@
+"""Logging cost per workflow on the calling thread, before and after.
+
+Replays the log calls of one analysis workflow (node start/end records,
+debug state dumps and per LLM call records) against:
+
+- the previous pipeline: eager state dicts in ``logger.debug``, the previous
+  ``ExtraFieldsFilter`` (reproduced below) and a ``StreamHandler`` writing
+  ECS JSON on the calling thread
+- the pipeline in ``logging.json``: ``StateSummary``, the cached
+  ``ExtraFieldsFilter`` and a ``QueueStreamHandler`` writing from a listener
+  thread
+
+The time reported is what the event loop would spend per workflow; the
+listener thread's writes are drained before each run ends but not counted.
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_logging.py [--workflows 200] [--output PATH]
+"""
+
+import argparse
+import logging
+import os
+import time
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+
+import ecs_logging  # noqa: E402
+
+from app.common.log_utils import (  # noqa: E402
+    ExtraFieldsFilter,
+    QueueStreamHandler,
+    StateSummary,
+)
+from app.common.tracing import ctx_request, ctx_response, ctx_trace_id  # noqa: E402
+
+NODES = ["transcript_loader", "remove_pii", "validate_pii", "affinity_mapping"]
+LLM_CALLS_PER_WORKFLOW = 40
+
+logger = logging.getLogger("benchmark.workflow")
+
+
+class LegacyExtraFieldsFilter(logging.Filter):
+    def filter(self, record):
+        trace_id = ctx_trace_id.get("")
+        req = ctx_request.get(None)
+        resp = ctx_response.get(None)
+
+        if trace_id:
+            record.trace = {"id": trace_id}
+
+        http = {}
+        if req:
+            record.url = {"full": req.get("url", None)}
+            http["request"] = {"method": req.get("method", None)}
+        if resp:
+            http["response"] = resp
+        if http:
+            record.http = http
+        return True
+
+
+def workflow_state() -> dict:
+    transcript = "Participant: I usually renew online, but the form times out. " * 300
+    return {
+        "analysis_id": "507f1f77bcf86cd799439011",
+        "transcripts": [transcript] * 12,
+        "transcripts_pii_cleaned": [transcript] * 12,
+        "affinity_map": "## Theme\n- insight\n" * 500,
+        "findings_sections": {},
+        "status": "GENERATING_AFFINITY_MAP",
+        "error_message": None,
+    }
+
+
+def run_workflow_legacy(state: dict):
+    for node in NODES:
+        logger.info("Starting %s for analysis %s", node, state["analysis_id"])
+        logger.debug(
+            "Input state: %s",
+            {
+                k: v
+                for k, v in state.items()
+                if k != "transcripts" and k != "transcripts_pii_cleaned"
+            },
+        )
+        logger.debug(
+            "Output state: %s",
+            {
+                k: v
+                for k, v in state.items()
+                if k != "transcripts" and k != "transcripts_pii_cleaned"
+            },
+        )
+    for call in range(LLM_CALLS_PER_WORKFLOW):
+        logger.info("LLM call %d finished in %.0fms", call, 1234.5)
+
+
+def run_workflow(state: dict):
+    for node in NODES:
+        logger.info("Starting %s for analysis %s", node, state["analysis_id"])
+        logger.debug("Input state: %s", StateSummary(state))
+        logger.debug("Output state: %s", StateSummary(state))
+    for call in range(LLM_CALLS_PER_WORKFLOW):
+        logger.info("LLM call %d finished in %.0fms", call, 1234.5)
+
+
+def configure(handler: logging.Handler, log_filter: logging.Filter, level: int):
+    handler.setFormatter(ecs_logging.StdlibFormatter(exclude_fields=["color_message"]))
+    handler.addFilter(log_filter)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(level)
+
+
+def measure(workflow, handler, log_filter, level, workflows: int) -> float:
+    configure(handler, log_filter, level)
+    state = workflow_state()
+    start = time.perf_counter()
+    for _ in range(workflows):
+        workflow(state)
+    elapsed = time.perf_counter() - start
+    handler.close()
+    return elapsed / workflows * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workflows", type=int, default=200)
+    parser.add_argument("--output", default=os.devnull)
+    args = parser.parse_args()
+
+    ctx_trace_id.set("benchmark")
+    ctx_request.set(
+        {"url": "http://localhost/api/v1/research-analyses", "method": "PATCH"}
+    )
+
+    records = len(NODES) + LLM_CALLS_PER_WORKFLOW
+    print(f"{args.workflows} workflows, {records} INFO records each")  # noqa: T201
+    print(f"{'level':<6} {'before':>12} {'after':>12}")  # noqa: T201
+    for level in (logging.INFO, logging.DEBUG):
+        with open(args.output, "w") as before_out, open(args.output, "w") as after_out:
+            before = measure(
+                run_workflow_legacy,
+                logging.StreamHandler(before_out),
+                LegacyExtraFieldsFilter(),
+                level,
+                args.workflows,
+            )
+            after = measure(
+                run_workflow,
+                QueueStreamHandler(after_out),
+                ExtraFieldsFilter(),
+                level,
+                args.workflows,
+            )
+        print(  # noqa: T201
+            f"{logging.getLevelName(level):<6} {before:9.0f}us {after:9.0f}us  "
+            f"({before / after:.1f}x less on the calling thread)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""Requests per second through the app middleware stack, before and after.
+
+Builds the app routers twice:
+
+- with the previous ``BaseHTTPMiddleware`` versions of the error handler and
+  trace ID middleware, reproduced below
+- with the pure ASGI middleware used by ``app.main``
+
+and sends sequential requests to ``/health`` and
+``GET /api/v1/research-analyses/{id}`` through an in-process ASGI transport.
+The analysis service is replaced by a stub, so the numbers measure the
+framework and middleware rather than MongoDB.
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_middleware.py [--requests 5000]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "test")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "test")
+
+import httpx  # noqa: E402
+from fastapi import FastAPI, HTTPException, Request  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.common.errors import ErrorHandlerMiddleware, ErrorResponse  # noqa: E402
+from app.common.exceptions import AppError  # noqa: E402
+from app.common.tracing import (  # noqa: E402
+    TraceIdMiddleware,
+    ctx_request,
+    ctx_response,
+    ctx_trace_id,
+)
+from app.config import config  # noqa: E402
+from app.health.router import router as health_router  # noqa: E402
+from app.research_analysis.models import (  # noqa: E402
+    AgentState,
+    AgentStatus,
+    AnalysisResponse,
+    AnalysisStatus,
+)
+from app.research_analysis.router import (  # noqa: E402
+    router as research_analysis_router,
+)
+from app.research_analysis.service import ResearchAnalysisService  # noqa: E402
+
+ANALYSIS_ID = "507f1f77bcf86cd799439011"
+
+
+class LegacyErrorHandlerMiddleware(BaseHTTPMiddleware):
+    _get_status_code = ErrorHandlerMiddleware._get_status_code
+
+    async def dispatch(self, request: Request, call_next):
+        try:
+            return await call_next(request)
+        except AppError as e:
+            status_code = self._get_status_code(e)
+            error_response = ErrorResponse(e.message, e.code)
+            return JSONResponse(
+                status_code=status_code, content=error_response.to_dict()
+            )
+        except HTTPException:
+            raise
+        except Exception:
+            error_response = ErrorResponse("Internal server error")
+            return JSONResponse(status_code=500, content=error_response.to_dict())
+
+
+class LegacyTraceIdMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request: Request, call_next):
+        req_trace_id = request.headers.get(config.tracing_header, None)
+        if req_trace_id:
+            ctx_trace_id.set(req_trace_id)
+
+        ctx_request.set({"url": str(request.url), "method": request.method})
+
+        response = await call_next(request)
+        ctx_response.set({"status_code": response.status_code})
+        return response
+
+
+class StubResearchAnalysisService:
+    async def get_analysis(self, analysis_id: str) -> AnalysisResponse:
+        return AnalysisResponse(
+            id=analysis_id,
+            created_at=datetime.now(timezone.utc),
+            status=AnalysisStatus.RUNNING,
+            agent_state=AgentState(
+                status=AgentStatus.GENERATING_FINDINGS,
+                transcripts=["Interviewer: How did it go?"] * 5,
+            ),
+        )
+
+
+def build_app(error_middleware, trace_middleware) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(error_middleware)
+    app.add_middleware(trace_middleware)
+    app.include_router(health_router)
+    app.include_router(research_analysis_router)
+    app.dependency_overrides[ResearchAnalysisService] = StubResearchAnalysisService
+    return app
+
+
+async def requests_per_second(app: FastAPI, path: str, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+        headers = {config.tracing_header: "benchmark"}
+        for _ in range(requests // 10):
+            (await c.get(path, headers=headers)).raise_for_status()
+        start = time.perf_counter()
+        for _ in range(requests):
+            (await c.get(path, headers=headers)).raise_for_status()
+        return requests / (time.perf_counter() - start)
+
+
+async def run(requests: int):
+    before = build_app(LegacyErrorHandlerMiddleware, LegacyTraceIdMiddleware)
+    after = build_app(ErrorHandlerMiddleware, TraceIdMiddleware)
+    paths = ["/health", f"/api/v1/research-analyses/{ANALYSIS_ID}"]
+
+    print(f"{requests} sequential requests per endpoint")  # noqa: T201
+    print(f"{'endpoint':<50} {'before':>9} {'after':>9}")  # noqa: T201
+    for path in paths:
+        rps_before = await requests_per_second(before, path, requests)
+        rps_after = await requests_per_second(after, path, requests)
+        print(  # noqa: T201
+            f"{path:<50} {rps_before:7.0f}/s {rps_after:7.0f}/s  "
+            f"({rps_after / rps_before:.2f}x)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""Throughput benchmark for the local PII pre-pass.
+
+Runs the detector over the example transcripts, replicated to a larger corpus,
+and reports MB/s for the inline path and the process pool path.
+
+Usage:
+    PYTHONPATH=. python scripts/benchmark_pii_detector.py [--copies 200]
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+from app.research_analysis.pii import detector
+
+TRANSCRIPTS_DIR = Path(__file__).resolve().parent.parent / "example-transcripts"
+
+
+def _load_transcripts() -> list[str]:
+    return [path.read_text() for path in sorted(TRANSCRIPTS_DIR.glob("*.md"))]
+
+
+def _measure(label: str, corpus: list[str], func) -> None:
+    size_mb = sum(len(text.encode()) for text in corpus) / 1_000_000
+    start = time.perf_counter()
+    func(corpus)
+    elapsed = time.perf_counter() - start
+    print(  # noqa: T201
+        f"{label:<24} {size_mb:8.2f} MB  {elapsed:8.3f} s  {size_mb / elapsed:8.2f} MB/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--copies", type=int, default=200)
+    args = parser.parse_args()
+
+    transcripts = _load_transcripts()
+    corpus = transcripts * args.copies
+
+    _measure("example transcripts", transcripts, detector.redact_transcripts)
+    detector.config.pii_prepass_pool_min_bytes = 1 << 62
+    _measure("corpus, inline", corpus, detector.redact_transcripts)
+    detector.config.pii_prepass_pool_min_bytes = 1
+    _measure("corpus, process pool", corpus, detector.redact_transcripts)
+
+
+if __name__ == "__main__":
+    main()